@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -6,12 +7,37 @@ from dotenv import load_dotenv
 load_dotenv(dotenv_path="../../.env")
 load_dotenv(dotenv_path="../../.env.local", override=True)
 
-from routers import question, quality, summary, overview, avatar, transcribe, avatar_selection, participant_selection, aggregate, realtime_interview, realtime_interview_simple
+from routers import question, quality, summary, overview, avatar, transcribe, avatar_selection, participant_selection, aggregate, report_jobs, realtime_interview, realtime_interview_simple
+from services.llm_gateway import get_llm_gateway
+from services.model_router import get_model_router
+from services.speculation import get_speculation_stats
+from services.task_pool import get_task_pool_stats
+from services.database import get_database
+from services.wordware_client import close_wordware_client
+from services.summary_queue import get_summary_queue
+from services.interview_logging import start_interview_logging, stop_interview_logging, get_interview_log_stats
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Interview routers log through a background writer thread
+    start_interview_logging()
+    # Connect up front so missing Supabase config fails at startup, not on the first request
+    await get_database().client()
+    # Summarize finished interviews in the background
+    get_summary_queue().start()
+    yield
+    await get_summary_queue().stop()
+    # Release the shared OpenAI, Supabase and Wordware connection pools
+    await get_llm_gateway().close()
+    await get_database().close()
+    await close_wordware_client()
+    stop_interview_logging()
 
 app = FastAPI(
     title="Chorus Agents API",
     description="AI agents for interview question generation, quality scoring, and summarization",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -33,6 +59,7 @@ app.include_router(transcribe.router, prefix="/api/agents", tags=["Transcription
 app.include_router(avatar_selection.router, prefix="/api/agents", tags=["Avatar Selection"])
 app.include_router(participant_selection.router, prefix="/api/agents", tags=["Participant Selection"])
 app.include_router(aggregate.router, prefix="/api/agents", tags=["Aggregate Summary Agent"])
+app.include_router(report_jobs.router, prefix="/api/agents", tags=["Report Jobs"])
 app.include_router(realtime_interview.router, prefix="/api/agents", tags=["Realtime Interview (Legacy)"])
 app.include_router(realtime_interview_simple.router, prefix="/api/agents", tags=["Simple Interview"])
 
@@ -48,5 +75,17 @@ async def root():
 async def health():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "llm": get_llm_gateway().get_stats(),
+        "model_routing": get_model_router().get_stats(),
+        "speculation": get_speculation_stats(),
+        "background_tasks": get_task_pool_stats(),
+        "database": get_database().get_stats(),
+        "summary_queue": await get_summary_queue().get_stats(),
+        "interview_events": get_interview_log_stats(),
+    }
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -2,32 +2,26 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import os
-from supabase import create_client, Client
 from services.wordware_client import get_wordware_client
-from openai import OpenAI
+from services.aggregate_analyzer import analyze_transcripts, AGGREGATE_MODEL
+from services.map_reduce import MapProgress
+from services.transcripts import iter_session_transcripts
+from services import database as db
+from services.report_jobs import ReportJob, start_report_job
+from routers.report_jobs import ReportJobResponse, report_job_response
 import json
+import logging
 from datetime import datetime
 
 router = APIRouter()
-
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-supabase_key = (
-    os.getenv("SUPABASE_SERVICE_KEY")
-    or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    or os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-)
-if not supabase_url:
-    raise ValueError("Supabase URL is missing. Set SUPABASE_URL or NEXT_PUBLIC_SUPABASE_URL.")
-if not supabase_key:
-    raise ValueError(
-        "Supabase key is missing. Set SUPABASE_SERVICE_KEY or SUPABASE_SERVICE_ROLE_KEY."
-    )
-supabase: Client = create_client(supabase_url, supabase_key)
+logger = logging.getLogger(__name__)
 
 class AggregateSummaryRequest(BaseModel):
     research_question_id: str
+    # Ignore the saved summary and reanalyze every session
     recompute: bool = False
+    # When the saved summary is stale, analyze only the sessions completed since
+    incremental: bool = True
 
 class StatisticItem(BaseModel):
     percentage: str
@@ -40,102 +34,133 @@ class AggregateSummaryResponse(BaseModel):
     cons: List[str]
     total_responses_analyzed: int
     generated_at: str
+    # "fresh" (saved summary still covers every completed session), "incremental" or "full"
+    cache_status: Optional[str] = None
 
-@router.post("/aggregate-summary", response_model=AggregateSummaryResponse)
-async def generate_aggregate_summary(
-    request: AggregateSummaryRequest
-):
+def session_fingerprint(sessions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Count and latest completion time of the completed sessions"""
+    completed = [s["completed_at"] for s in sessions if s.get("completed_at")]
+    return {
+        "session_count": len(sessions),
+        "last_session_completed_at": max(completed, key=parse_timestamp) if completed else None
+    }
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+def is_fresh(item: Dict[str, Any], fingerprint: Dict[str, Any], session_ids: List[str]) -> bool:
+    """Whether a saved summary was generated from exactly the current completed sessions"""
+    return (
+        set(item.get("session_ids") or []) == set(session_ids)
+        and item.get("session_count") == fingerprint["session_count"]
+        and parse_timestamp(item.get("last_session_completed_at"))
+        == parse_timestamp(fingerprint["last_session_completed_at"])
+    )
+
+def saved_response(item: Dict[str, Any], cache_status: str) -> AggregateSummaryResponse:
+    return AggregateSummaryResponse(
+        research_question_id=item["research_question_id"],
+        statistics=[StatisticItem(**s) for s in item["statistics"]],
+        pros=item["pros"],
+        cons=item["cons"],
+        total_responses_analyzed=item["total_responses_analyzed"],
+        generated_at=item["generated_at"],
+        cache_status=cache_status
+    )
+
+async def build_aggregate_summary(
+    request: AggregateSummaryRequest,
+    job: Optional[ReportJob] = None
+) -> AggregateSummaryResponse:
     """
-    Aggregate Summary Agent: Analyze multiple interview sessions for a research question
-    to generate percentages, statistics, and pros/cons using Wordware AI.
+    Analyze multiple interview sessions for a research question to generate
+    percentages, statistics, and pros/cons using Wordware AI.
+
+    The saved summary is served while it still covers every completed session (same
+    session ids, count and latest completed_at); sessions of failed chunks are not covered. When it is stale, only the new sessions are
+    analyzed and merged with the saved per-chunk counts (OpenAI path), or everything is
+    reanalyzed with `recompute` / `incremental=False` / Wordware.
     """
     try:
-        # 1. Check if we already have a recent summary
+        # 1. Latest saved summary
+        item = None
         if not request.recompute:
-            existing = supabase.table("research_question_aggregate_summaries") \
-                .select("*") \
-                .eq("research_question_id", request.research_question_id) \
-                .order("generated_at", desc=True) \
-                .limit(1) \
-                .execute()
-
-            if existing.data:
-                item = existing.data[0]
-                return AggregateSummaryResponse(
-                    research_question_id=item["research_question_id"],
-                    statistics=[StatisticItem(**s) for s in item["statistics"]],
-                    pros=item["pros"],
-                    cons=item["cons"],
-                    total_responses_analyzed=item["total_responses_analyzed"],
-                    generated_at=item["generated_at"]
-                )
+            item = await db.get_latest_aggregate_summary(request.research_question_id)
+
+        # 2. Fetch all completed sessions for this research question
+        # Sessions are resolved to the research question server-side (directly or via assignment)
+        sessions = await db.list_research_question_sessions(request.research_question_id, status="completed")
+        if not sessions:
+            raise HTTPException(status_code=400, detail="No completed sessions found for this research question")
+        session_ids = [s["session_id"] for s in sessions]
+        fingerprint = session_fingerprint(sessions)
 
-        # 2. Fetch the research question details
-        rq_res = supabase.table("research_questions").select("*").eq("id", request.research_question_id).single().execute()
-        if not rq_res.data:
+        if item and is_fresh(item, fingerprint, session_ids):
+            return saved_response(item, "fresh")
+
+        # 3. Fetch the research question details
+        research_question = await db.get_research_question(request.research_question_id)
+        if not research_question:
             raise HTTPException(status_code=404, detail="Research question not found")
 
-        research_question_text = rq_res.data.get("root_question", "General research study")
-
-        # 3. Fetch all completed sessions for this research question
-        # We need to find assignments -> sessions
-        assignments = supabase.table("research_question_assignments") \
-            .select("id") \
-            .eq("research_question_id", request.research_question_id) \
-            .execute()
-
-        assignment_ids = [a["id"] for a in assignments.data]
-        if not assignment_ids:
-            return AggregateSummaryResponse(
-                research_question_id=request.research_question_id,
-                statistics=[],
-                pros=[],
-                cons=[],
-                total_responses_analyzed=0,
-                generated_at=datetime.now().isoformat()
-            )
+        research_question_text = research_question.get("root_question", "General research study")
+        if job:
+            await job.update(phase="load")
+
+        app_id = os.getenv("WORDWARE_AGGREGATE_APP_ID")
+        wordware_api_key = os.getenv("WORDWARE_API_KEY")
+        use_wordware = bool(app_id and wordware_api_key)
 
-        # Fetch sessions for these assignments (Wait, the schema in initial showed sessions linked to assignment_id)
-        # Note: 001_initial has interview_sessions(assignment_id)
-        sessions = supabase.table("interview_sessions") \
-            .select("id") \
-            .in_("assignment_id", assignment_ids) \
-            .eq("status", "completed") \
-            .execute()
+        # Incremental merge needs the saved chunk counts and no session may have dropped out
+        previous_ids = set((item or {}).get("session_ids") or [])
+        incremental = (
+            request.incremental
+            and not use_wordware
+            and bool(item and item.get("chunk_results"))
+            and previous_ids <= set(session_ids)
+        )
+        target_ids = [sid for sid in session_ids if sid not in previous_ids] if incremental else session_ids
+        if incremental:
+            logger.info(
+                "Aggregate summary for %s is stale: merging %d new sessions",
+                request.research_question_id, len(target_ids)
+            )
 
-        session_ids = [s["id"] for s in sessions.data]
-        if not session_ids:
-            raise HTTPException(status_code=400, detail="No completed sessions found for this research question")
+        # 4. Stream the transcripts of these sessions, assembled server-side
+        # When every target session has a completion time, only sessions completed since
+        # the earliest of them are read
+        target_set = set(target_ids)
+        target_completed = [s.get("completed_at") for s in sessions if s["session_id"] in target_set]
+        completed_since = (
+            min(target_completed, key=parse_timestamp)
+            if target_completed and all(target_completed) and incremental
+            else None
+        )
 
-        # 4. Fetch all QA turns for these sessions
-        qa_turns = supabase.table("qa_turns") \
-            .select("session_id, question_text, answer_transcript") \
-            .in_("session_id", session_ids) \
-            .order("session_id") \
-            .order("turn_index") \
-            .execute()
-
-        # 5. Group by session to build transcripts
-        session_transcripts = {}
-        for turn in qa_turns.data:
-            sid = turn["session_id"]
-            if sid not in session_transcripts:
-                session_transcripts[sid] = []
-
-            q = turn.get("question_text", "")
-            a = turn.get("answer_transcript", "") or "[No response]"
-            session_transcripts[sid].append(f"Q: {q}\nA: {a}")
+        # 5. Keep the transcripts of the target sessions
+        session_transcripts: Dict[str, str] = {}
+        async for transcript in iter_session_transcripts(
+            research_question_id=request.research_question_id,
+            completed_only=True,
+            completed_since=completed_since
+        ):
+            if transcript.session_id in target_set:
+                session_transcripts[transcript.session_id] = transcript.transcript
 
         transcripts_data = [
-            {"content": "\n".join(turns)}
-            for sid, turns in session_transcripts.items()
+            {"content": content}
+            for content in session_transcripts.values()
         ]
 
+        if job:
+            await job.update(phase="analyze", sessions=len(target_ids), transcripts=len(transcripts_data))
+
         # 6. Call Wordware AI if configured, otherwise use OpenAI fallback
-        app_id = os.getenv("WORDWARE_AGGREGATE_APP_ID")
-        wordware_api_key = os.getenv("WORDWARE_API_KEY")
         wordware_response = None
-        if app_id and wordware_api_key:
+        responses_analyzed = len(session_ids)
+        included_ids = session_ids
+        chunk_results = []
+        if use_wordware:
             wordware = get_wordware_client()
             wordware_response = await wordware.generate_aggregate_summary(
                 app_id=app_id,
@@ -151,7 +176,7 @@ async def generate_aggregate_summary(
             #   "model_version": "gpt-4"
             # }
 
-            # Wordware client _collect_streaming_response returns the last chunk
+            # Wordware client run_wordapp returns the last stream event
             # Let's extract the actual data from Wordware's output format
             # Wordware typically puts the output in an 'output' or 'value' field depending on how it's set up
 
@@ -173,59 +198,100 @@ async def generate_aggregate_summary(
                     status_code=500,
                     detail="OPENAI_API_KEY is required for aggregate summaries when Wordware is disabled",
                 )
-            openai_client = OpenAI(api_key=openai_api_key)
-            prompt = f"""You are a research analyst. Summarize interview transcripts for the research question:
-"{research_question_text}"
-
-Return JSON only with:
-{{"statistics":[{{"percentage":"<percent>%","description":"<stat>"}}], "pros":[...], "cons":[...]}}
-
-Use 3-6 statistics. Percentages should be whole numbers. Pros and cons should be concise bullet phrases.
-Transcripts:
-{json.dumps(transcripts_data)[:12000]}
-"""
-
-            response = openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "Return JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=800,
-                response_format={"type": "json_object"}
-            )
 
-            output = json.loads(response.choices[0].message.content)
+            async def report(progress: MapProgress):
+                if job:
+                    await job.update(chunks=progress.total, chunks_done=progress.done, chunks_failed=progress.failed)
+
+            # Every session is analyzed: whole transcripts are packed into token-budgeted
+            # chunks, analyzed concurrently and merged with session-weighted percentages
+            output = await analyze_transcripts(
+                research_question_text,
+                session_transcripts,
+                previous_chunks=item["chunk_results"] if incremental else None,
+                on_progress=report
+            )
             stats = output.get("statistics", [])
             pros = output.get("pros", [])
             cons = output.get("cons", [])
-            model_version = "openai:gpt-4o-mini"
+            responses_analyzed = output["sessions_analyzed"]
+            # Sessions without answered turns count as covered; sessions of failed chunks do not,
+            # so the next request sees the summary as stale and retries them
+            empty_ids = [sid for sid in target_ids if sid not in session_transcripts]
+            analyzed_ids = output["session_ids"] + empty_ids
+            included_ids = sorted(previous_ids) + analyzed_ids if incremental else analyzed_ids
+            chunk_results = output["chunks"]
+            model_version = f"openai:{AGGREGATE_MODEL}"
 
         # 7. Save to database
+        if job:
+            await job.update(phase="save")
+        # Fingerprint of the sessions actually covered, so a partial summary is never fresh
+        covered = set(included_ids)
+        covered_fingerprint = session_fingerprint([s for s in sessions if s["session_id"] in covered])
         summary_data = {
             "research_question_id": request.research_question_id,
             "statistics": stats,
             "pros": pros,
             "cons": cons,
-            "total_responses_analyzed": len(session_ids),
+            "total_responses_analyzed": responses_analyzed,
             "generated_at": datetime.now().isoformat(),
             "wordware_model_version": model_version,
-            "raw_response": wordware_response
+            "raw_response": wordware_response,
+            **covered_fingerprint,
+            "session_ids": included_ids,
+            "chunk_results": chunk_results
         }
 
-        supabase.table("research_question_aggregate_summaries").insert(summary_data).execute()
+        await db.insert_aggregate_summary(summary_data)
 
         return AggregateSummaryResponse(
             research_question_id=request.research_question_id,
             statistics=[StatisticItem(**s) for s in stats],
             pros=pros,
             cons=cons,
-            total_responses_analyzed=len(session_ids),
-            generated_at=summary_data["generated_at"]
+            total_responses_analyzed=responses_analyzed,
+            generated_at=summary_data["generated_at"],
+            cache_status="incremental" if incremental else "full"
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Aggregate summary generation failed for %s", request.research_question_id)
         raise HTTPException(status_code=500, detail=f"Aggregate summary generation failed: {str(e)}")
+
+
+@router.post("/aggregate-summary", response_model=AggregateSummaryResponse)
+async def generate_aggregate_summary(
+    request: AggregateSummaryRequest
+):
+    """
+    Aggregate Summary Agent: Analyze multiple interview sessions for a research question
+    to generate percentages, statistics, and pros/cons using Wordware AI.
+
+    Runs inside the request; use POST /aggregate-summary/jobs to run it in the background.
+    """
+    return await build_aggregate_summary(request)
+
+
+@router.post("/aggregate-summary/jobs", response_model=ReportJobResponse, status_code=202)
+async def start_aggregate_summary_job(
+    request: AggregateSummaryRequest
+):
+    """
+    Aggregate Summary Agent as a background job: returns immediately with a job id.
+    Poll GET /jobs/{jobId} or subscribe to GET /jobs/{jobId}/events.
+    """
+    async def run(job: ReportJob):
+        response = await build_aggregate_summary(request, job)
+        result = response.model_dump()
+        return result, {"report_data": result, "interviews_included": response.total_responses_analyzed}
+
+    try:
+        job = await start_report_job(
+            "aggregate", run, research_question_id=request.research_question_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not start aggregate summary job: {str(e)}")
+    return report_job_response(job)
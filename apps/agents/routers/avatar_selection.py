@@ -1,12 +1,11 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-import os
-from openai import OpenAI
+from services.llm_gateway import get_llm_gateway
 import json
 
 router = APIRouter()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+llm = get_llm_gateway()
 
 class AvatarSelectionRequest(BaseModel):
     participantDemographics: Dict[str, Any]
@@ -66,7 +65,7 @@ Available Avatars:
 
 Which avatar should be selected?"""
 
-        response = client.chat.completions.create(
+        response = await llm.chat_completion(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": system_prompt},
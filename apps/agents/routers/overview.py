@@ -1,28 +1,26 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-import os
-from openai import OpenAI
-from supabase import create_client, Client
+from typing import List, Dict, Any, Optional, Tuple
+from services.llm_gateway import get_llm_gateway
+from services.rate_limiter import Priority
+from services.summarizer import summarize_transcript, summary_row
+from services.map_reduce import run_map, MapProgress
+from services.transcripts import iter_session_transcripts
+from services.report_reducer import reduce_blocks, render_summary_block
+from services.overview_state import OverviewState
+from services.report_jobs import ReportJob, start_report_job
+from routers.report_jobs import ReportJobResponse, report_job_response
+from services import database as db
 import json
+import logging
+from datetime import datetime
 
 router = APIRouter()
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-supabase_key = (
-    os.getenv("SUPABASE_SERVICE_KEY")
-    or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    or os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-)
-if not supabase_url:
-    raise ValueError("Supabase URL is missing. Set SUPABASE_URL or NEXT_PUBLIC_SUPABASE_URL.")
-if not supabase_key:
-    raise ValueError(
-        "Supabase key is missing. Set SUPABASE_SERVICE_KEY or SUPABASE_SERVICE_ROLE_KEY."
-    )
-supabase: Client = create_client(supabase_url, supabase_key)
+llm = get_llm_gateway()
+logger = logging.getLogger(__name__)
+
+# Most frequent themes listed with exact counts in the final report prompt
+THEME_TALLY_LIMIT = 100
 
 class OverviewRequest(BaseModel):
     studyId: str
@@ -39,116 +37,178 @@ class OverviewResponse(BaseModel):
     negative_pain_points: List[str]
     metadata: Optional[Dict[str, Any]] = None
 
-@router.post("/overview", response_model=OverviewResponse)
-async def generate_study_report(request: OverviewRequest):
+async def summarize_sessions(study_id: str, session_ids: List[str], job: Optional[ReportJob] = None) -> List[Dict[str, Any]]:
     """
-    Overview Agent: Generate a comprehensive study-level report using GPT-4.
+    Map step: load saved interview summaries and generate the missing ones concurrently.
+    Each new summary is saved as soon as it completes, so a rerun after a crash only
+    summarizes the sessions that were not finished. When run as a job, every new summary
+    is also published as a partial result.
+    """
+    summaries = await db.list_interview_summaries(session_ids)
+    summarized = {s["session_id"] for s in summaries}
+    missing = [sid for sid in session_ids if sid not in summarized]
+
+    if job:
+        await job.update(
+            phase="map",
+            sessions=len(session_ids),
+            already_summarized=len(summarized),
+            **MapProgress(total=0).to_dict()
+        )
+
+    if not missing:
+        return summaries
+
+    # Transcripts of the study's unsummarized sessions, assembled server-side
+    missing_ids = set(missing)
+    transcripts: Dict[str, str] = {}
+    async for transcript in iter_session_transcripts(study_id=study_id, completed_only=True, unsummarized_only=True):
+        if transcript.session_id in missing_ids:
+            transcripts[transcript.session_id] = transcript.transcript
+
+    logger.info("Summarizing %d of %d sessions (%d already saved)", len(transcripts), len(session_ids), len(summarized))
+
+    async def summarize(session_id: str, transcript: str) -> Dict[str, Any]:
+        return await summarize_transcript(transcript, priority=Priority.BATCH)
+
+    async def save(session_id: str, summary: Dict[str, Any]):
+        try:
+            await db.upsert_interview_summary(summary_row(session_id, summary))
+        except Exception as e:
+            logger.warning("Could not save summary for session %s: %s", session_id, e)
+        if job:
+            job.partial("interview_summary", {**summary, "session_id": session_id})
+
+    async def report(map_progress: MapProgress):
+        if job:
+            await job.update(**map_progress.to_dict())
+        if map_progress.done % 10 == 0 or map_progress.done == map_progress.total:
+            logger.info(
+                "Overview map progress for study %s: %d/%d (%d failed)",
+                study_id, map_progress.done, map_progress.total, map_progress.failed
+            )
+
+    results = await run_map(
+        transcripts,
+        summarize,
+        on_result=save,
+        on_progress=report
+    )
+
+    return summaries + [{**summary, "session_id": sid} for sid, summary in results.items()]
+
+
+def overview_response(study_id: str, report: Dict[str, Any], state: OverviewState, metadata: Dict[str, Any]) -> OverviewResponse:
+    return OverviewResponse(
+        study_id=study_id,
+        executive_summary=report.get("executive_summary", ""),
+        key_findings=report.get("key_findings", []),
+        themes=report.get("themes", []),
+        sentiment_distribution=state.sentiment_counts,
+        recommendations=report.get("recommendations", []),
+        participant_quotes=report.get("participant_quotes", []),
+        positive_highlights=report.get("positive_highlights", []),
+        negative_pain_points=report.get("negative_pain_points", []),
+        metadata={**state.totals(), **metadata}
+    )
+
+
+async def save_overview_report(study_id: str, report_data: Dict[str, Any], interviews: int, started_at: str) -> Optional[int]:
+    """
+    Store the report with its incremental state as a new study_reports version.
+    The next run starts from this state and only folds in new or changed sessions.
     """
     try:
-        # Fetch all session summaries for this study
-        # Accept both completed and in_progress sessions for testing/development
-        sessions = supabase.table("interview_sessions").select("id").eq("study_id", request.studyId).execute()
-
-        if not sessions.data:
-            raise HTTPException(status_code=404, detail="No sessions found for this study")
-
-        session_ids = [s["id"] for s in sessions.data]
-
-        # Try to fetch summaries from database first
-        summaries = supabase.table("interview_summaries").select("*").in_("session_id", session_ids).execute()
-
-        # If no summaries found in database, generate them inline
-        if not summaries.data:
-            print(f"No saved summaries found. Generating summaries inline for {len(session_ids)} sessions...")
-            summaries_list = []
-
-            for session_id in session_ids:
-                try:
-                    # Fetch Q&A turns for this session
-                    qa_turns = supabase.table("qa_turns").select("*").eq("session_id", session_id).order("turn_index").execute()
-
-                    if not qa_turns.data:
-                        continue
-
-                    # Build conversation
-                    conversation = "\n\n".join([
-                        f"Q: {turn['question_text']}\nA: {turn['answer_transcript']}"
-                        for turn in qa_turns.data
-                        if turn.get('answer_transcript') and turn['answer_transcript'] != '[SKIPPED]'
-                    ])
-
-                    # Generate summary using GPT-4o
-                    system_prompt = """You are an expert at analyzing qualitative research interviews.
-Analyze the following interview and provide:
-
-1. Key Insights: 3-5 most important takeaways
-2. Sentiment: Overall participant sentiment (positive, neutral, negative, mixed)
-3. Themes: Main topics/themes discussed
-4. Notable Quotes: 2-3 most interesting or revealing quotes
-5. Positive Feedback: Things the participant liked, praised, or expressed satisfaction about
-6. Negative Feedback: Things the participant disliked, complained about, or expressed frustration with
-7. Summary: A concise paragraph summarizing the interview
-
-Return your analysis as JSON with this structure:
-{
-  "key_insights": [<list of insights>],
-  "sentiment": "<sentiment>",
-  "themes": [<list of themes>],
-  "notable_quotes": [<list of quotes>],
-  "positive_feedback": [<list of positive points>],
-  "negative_feedback": [<list of negative points>],
-  "summary_text": "<summary paragraph>"
-}"""
+        row = await db.insert_next_study_report({
+            "study_id": study_id,
+            "report_type": "overview",
+            "status": "completed",
+            "report_data": report_data,
+            "interviews_included": interviews,
+            "agent_model_version": "gpt-4o",
+            "generation_started_at": started_at,
+            "generation_completed_at": datetime.now().isoformat()
+        })
+        return row["version"] if row else None
+    except Exception as e:
+        logger.warning("Could not save overview state for study %s: %s", study_id, e)
+        return None
 
-                    response = openai_client.chat.completions.create(
-                        model="gpt-4o",
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": f"Interview:\n\n{conversation}"}
-                        ],
-                        temperature=0.5,
-                        max_tokens=1000,
-                        response_format={"type": "json_object"}
-                    )
-
-                    result = json.loads(response.choices[0].message.content)
-                    result['session_id'] = session_id
-                    summaries_list.append(result)
-
-                except Exception as e:
-                    print(f"Warning: Could not generate summary for session {session_id}: {e}")
-
-            if not summaries_list:
-                raise HTTPException(status_code=404, detail="No interview data available")
-
-            # Convert to the format expected by the rest of the code
-            class FakeSummariesData:
-                def __init__(self, data):
-                    self.data = data
-            summaries = FakeSummariesData(summaries_list)
-
-        # Aggregate data
-        all_insights = []
-        all_themes = []
-        all_quotes = []
-        all_positive_feedback = []
-        all_negative_feedback = []
-        sentiment_counts = {"positive": 0, "neutral": 0, "negative": 0, "mixed": 0}
-
-        for summary in summaries.data:
-            all_insights.extend(summary.get("key_insights", []))
-            all_themes.extend(summary.get("themes", []))
-            all_quotes.extend(summary.get("notable_quotes", []))
-            all_positive_feedback.extend(summary.get("positive_feedback", []))
-            all_negative_feedback.extend(summary.get("negative_feedback", []))
-            sentiment = summary.get("sentiment", "neutral")
-            if sentiment in sentiment_counts:
-                sentiment_counts[sentiment] += 1
+
+async def build_study_report(study_id: str, job: Optional[ReportJob] = None) -> Tuple[OverviewResponse, Dict[str, Any]]:
+    """
+    Generate the overview for a study.
+
+    Incremental: the aggregates of the previous report are loaded from study_reports and
+    only sessions that are new or whose summary changed are folded in. If nothing changed
+    the previous report is returned without any LLM calls.
+
+    Returns:
+        The response and the report_data to store (report fields plus incremental state)
+    """
+    request = OverviewRequest(studyId=study_id)
+    try:
+        # Only completed sessions: saved summaries are never regenerated, so summarizing
+        # an in_progress session would freeze a partial transcript into the report
+        session_ids = await db.list_study_session_ids(request.studyId, status="completed")
+
+        if not session_ids:
+            raise HTTPException(status_code=404, detail="No completed sessions found for this study")
+
+        # Map: summarize every session that doesn't have a saved summary yet
+        summaries = await summarize_sessions(request.studyId, session_ids, job)
+
+        if not summaries:
+            raise HTTPException(status_code=404, detail="No interview data available")
+
+        # Reduce
+        previous = await db.get_latest_overview_report(request.studyId)
+        state = OverviewState.from_report_data(previous["report_data"] if previous else None)
+        by_session = {summary["session_id"]: summary for summary in summaries}
+        added, changed, removed = state.diff(by_session)
+        if job:
+            await job.update(phase="reduce", added=len(added), changed=len(changed), removed=len(removed))
+
+        if previous and not (added or changed or removed):
+            logger.info("Overview for study %s is up to date (version %s)", request.studyId, previous["version"])
+            response = overview_response(request.studyId, previous["report_data"], state, {
+                "report_version": previous["version"],
+                "incremental": {"added": 0, "changed": 0, "removed": 0, "reused": True}
+            })
+            return response, previous["report_data"]
+
+        logger.info(
+            "Folding %d new, %d changed, %d removed sessions into the overview",
+            len(added), len(changed), len(removed)
+        )
+        for session_id in changed + removed:
+            state.remove(session_id)
+        for session_id in added + changed:
+            state.add(session_id, by_session[session_id])
+
+        # Hierarchically reduce the per-interview findings until they fit one prompt.
+        # Synthesized findings can't have a session taken back out, so a changed or removed
+        # session rebuilds them from every summary; otherwise only new sessions are folded in.
+        if changed or removed or not state.findings:
+            blocks = [render_summary_block(summary) for summary in summaries]
+        else:
+            blocks = state.findings + [render_summary_block(by_session[sid]) for sid in added]
+        if job:
+            job.partial("aggregates", {
+                "sentiment_distribution": state.sentiment_counts,
+                "themes": dict(state.top_themes(THEME_TALLY_LIMIT)),
+                **state.totals()
+            })
+        state.findings = await reduce_blocks(blocks)
+        if job:
+            await job.update(phase="report")
+        findings_text = "\n\n---\n\n".join(state.findings)
+        sentiment_counts = state.sentiment_counts
 
         # Build context for GPT-4
         context = f"""Study Analysis Context:
 
-Total Interviews: {len(summaries.data)}
+Total Interviews: {len(state.sessions)}
 
 Sentiment Distribution:
 - Positive: {sentiment_counts['positive']}
@@ -156,20 +216,15 @@ Sentiment Distribution:
 - Negative: {sentiment_counts['negative']}
 - Mixed: {sentiment_counts['mixed']}
 
-All Insights:
-{chr(10).join(f"- {insight}" for insight in all_insights[:50])}
-
-All Themes:
-{chr(10).join(f"- {theme}" for theme in set(all_themes))}
+Theme Mentions (interviews):
+{chr(10).join(f"- {theme}: {count}" for theme, count in state.top_themes(THEME_TALLY_LIMIT))}
 
-Positive Feedback from Participants:
-{chr(10).join(f"+ {item}" for item in all_positive_feedback[:30])}
+Selected Quotes:
+{chr(10).join(f'- "{q["quote"]}"' for q in state.quotes)}
 
-Negative Feedback from Participants:
-{chr(10).join(f"- {item}" for item in all_negative_feedback[:30])}
+Findings (each block covers the number of interviews shown):
 
-Sample Quotes:
-{chr(10).join(f'- "{quote}"' for quote in all_quotes[:10])}
+{findings_text}
 """
 
         # Generate comprehensive report
@@ -195,7 +250,7 @@ Return as JSON:
   "participant_quotes": [{"quote": "<quote>", "context": "<context>"}]
 }"""
 
-        response = openai_client.chat.completions.create(
+        response = await llm.chat_completion(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -203,29 +258,64 @@ Return as JSON:
             ],
             temperature=0.5,
             max_tokens=2000,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            cache=True,
+            priority=Priority.BATCH,
+            endpoint="analysis"
         )
 
         result = json.loads(response.choices[0].message.content)
 
-        return OverviewResponse(
-            study_id=request.studyId,
-            executive_summary=result.get("executive_summary", ""),
-            key_findings=result.get("key_findings", []),
-            themes=result.get("themes", []),
-            sentiment_distribution=sentiment_counts,
-            recommendations=result.get("recommendations", []),
-            participant_quotes=result.get("participant_quotes", []),
-            positive_highlights=result.get("positive_highlights", []),
-            negative_pain_points=result.get("negative_pain_points", []),
-            metadata={
-                "total_interviews": len(summaries.data),
-                "total_insights": len(all_insights),
-                "unique_themes": len(set(all_themes)),
-                "total_positive_feedback": len(all_positive_feedback),
-                "total_negative_feedback": len(all_negative_feedback)
+        response = overview_response(request.studyId, result, state, {
+            "incremental": {
+                "added": len(added),
+                "changed": len(changed),
+                "removed": len(removed),
+                "reused": False
             }
-        )
+        })
+        return response, {**result, **state.to_report_data()}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Overview generation failed: {str(e)}")
+
+
+@router.post("/overview", response_model=OverviewResponse)
+async def generate_study_report(request: OverviewRequest):
+    """
+    Overview Agent: Generate a comprehensive study-level report using GPT-4.
+
+    Runs inside the request; use POST /overview/jobs for large studies.
+    """
+    started_at = datetime.now().isoformat()
+    response, report_data = await build_study_report(request.studyId)
+
+    if not response.metadata["incremental"]["reused"]:
+        response.metadata["report_version"] = await save_overview_report(
+            request.studyId, report_data, response.metadata["total_interviews"], started_at
+        )
+    return response
+
+
+@router.post("/overview/jobs", response_model=ReportJobResponse, status_code=202)
+async def start_study_report_job(request: OverviewRequest):
+    """
+    Overview Agent as a background job: returns immediately with a job id.
+    Poll GET /jobs/{jobId} or subscribe to GET /jobs/{jobId}/events.
+    """
+    async def run(job: ReportJob):
+        response, report_data = await build_study_report(request.studyId, job)
+        row = {
+            "report_data": report_data,
+            "interviews_included": response.metadata["total_interviews"],
+            "agent_model_version": "gpt-4o"
+        }
+        return response.model_dump(), row
+
+    try:
+        job = await start_report_job("overview", run, study_id=request.studyId)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not start overview job: {str(e)}")
+    return report_job_response(job)
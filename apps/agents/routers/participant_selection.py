@@ -1,28 +1,12 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-import os
-from openai import OpenAI
+from services.llm_gateway import get_llm_gateway
+from services import database as db
 import json
-from supabase import create_client
 
 router = APIRouter()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
-supabase_key = (
-    os.getenv("SUPABASE_SERVICE_KEY")
-    or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-    or os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-)
-if not supabase_url:
-    raise ValueError("Supabase URL is missing. Set SUPABASE_URL or NEXT_PUBLIC_SUPABASE_URL.")
-if not supabase_key:
-    raise ValueError(
-        "Supabase key is missing. Set SUPABASE_SERVICE_KEY or SUPABASE_SERVICE_ROLE_KEY."
-    )
-supabase = create_client(supabase_url, supabase_key)
+llm = get_llm_gateway()
 
 class ParticipantSelectionRequest(BaseModel):
     studyId: str
@@ -47,23 +31,21 @@ async def select_participants(request: ParticipantSelectionRequest):
     """
     try:
         # 1. Get study details
-        study_response = supabase.table("studies").select("*").eq("id", request.studyId).single().execute()
-        if not study_response.data:
+        study = await db.get_study(request.studyId)
+        if not study:
             raise HTTPException(status_code=404, detail="Study not found")
 
-        study = study_response.data
         organization_id = study["organization_id"]
 
         # 2. Get all active participants for this organization
-        participants_response = supabase.table("participants").select(
-            "id, email, full_name, age, gender, country, city, tags, metadata"
-        ).eq("organization_id", organization_id).eq("status", "active").execute()
+        participants = await db.list_active_participants(
+            organization_id,
+            columns="id, email, full_name, age, gender, country, city, tags, metadata"
+        )
 
-        if not participants_response.data or len(participants_response.data) == 0:
+        if not participants:
             raise HTTPException(status_code=400, detail="No active participants found for this organization")
 
-        participants = participants_response.data
-
         # 3. Use LLM to score and select participants
         selected = await score_participants_with_llm(
             participants=participants,
@@ -73,8 +55,7 @@ async def select_participants(request: ParticipantSelectionRequest):
         )
 
         # 4. Get available avatars for assignment
-        avatars_response = supabase.table("avatars").select("*").eq("is_active", True).execute()
-        avatars = avatars_response.data if avatars_response.data else []
+        avatars = await db.list_active_avatars()
 
         if not avatars:
             raise HTTPException(status_code=400, detail="No active avatars available")
@@ -99,7 +80,7 @@ async def select_participants(request: ParticipantSelectionRequest):
             }
 
             # Insert assignment (ignore conflicts if already assigned)
-            supabase.table("study_participant_assignments").insert(assignment_data).execute()
+            await db.insert_study_participant_assignment(assignment_data)
 
         return ParticipantSelectionResponse(
             selectedParticipants=selected,
@@ -166,7 +147,7 @@ Available Participants:
 Select the {target_count} best-fitting participants and explain why."""
 
     try:
-        response = client.chat.completions.create(
+        response = await llm.chat_completion(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": system_prompt},
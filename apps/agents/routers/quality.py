@@ -1,23 +1,13 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-import os
-from openai import OpenAI
+from services.llm_gateway import get_llm_gateway
+from services import database as db
 import json
-from supabase import create_client, Client
 from datetime import datetime
 
 router = APIRouter()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-# Initialize Supabase Client
-url: str = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-
-if not url or not key:
-    raise ValueError("Supabase credentials missing. Check .env")
-
-supabase: Client = create_client(url, key)
+llm = get_llm_gateway()
 
 class ConversationTurn(BaseModel):
     question: str
@@ -30,6 +20,7 @@ class QualityRequest(BaseModel):
     answerText: str
     participantContext: Optional[Dict[str, Any]] = None
     conversationHistory: List[ConversationTurn] = []
+    qaTurnId: Optional[str] = None  # Existing turn to attach the score to; a new turn is inserted when omitted
 
 class QualityResponse(BaseModel):
     overall_score: float
@@ -84,7 +75,7 @@ A: {request.answerText}
 
 Task: Score this specific Q&A pair."""
 
-        response = client.chat.completions.create(
+        response = await llm.chat_completion(
             model="gpt-4o-mini",  # Changed from gpt-4 to gpt-4o-mini which supports JSON mode
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -92,7 +83,8 @@ Task: Score this specific Q&A pair."""
             ],
             temperature=0.3,
             max_tokens=400,
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            cache=True
         )
 
         result = json.loads(response.choices[0].message.content)
@@ -110,8 +102,11 @@ Task: Score this specific Q&A pair."""
         }
 
         try:
-            turn_res = supabase.table("qa_turns").insert(qa_turn_data).execute()
-            qa_turn_id = turn_res.data[0]['id']
+            if request.qaTurnId:
+                qa_turn_id = request.qaTurnId
+            else:
+                turn_row = await db.insert_turn(qa_turn_data)
+                qa_turn_id = turn_row['id']
 
             # 3. DB Persistence (qa_quality_labels)
             label_data = {
@@ -128,8 +123,8 @@ Task: Score this specific Q&A pair."""
                 "agent_model_version": "gpt-4-quality-v1"
             }
 
-            label_res = supabase.table("qa_quality_labels").insert(label_data).execute()
-            quality_label_id = label_res.data[0]['id']
+            label_row = await db.insert_quality_label(label_data)
+            quality_label_id = label_row['id']
 
         except Exception as db_e:
             print(f"DB Save Error: {db_e}")
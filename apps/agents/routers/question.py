@@ -1,26 +1,15 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-import os
-from openai import OpenAI
-
-
-from supabase import create_client, Client
+from typing import List, Dict, Any, Optional, AsyncIterator
+import time
+from services.llm_gateway import get_llm_gateway
+from services.rate_limiter import Priority
+from services.model_router import get_model_router
+from services.interview_context import InterviewContext
+from services import database as db
 
 router = APIRouter()
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
-# Initialize Supabase Client
-# Initialize Supabase Client
-url: str = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-
-if not url:
-    raise ValueError("Supabase URL is missing. Please set SUPABASE_URL or NEXT_PUBLIC_SUPABASE_URL.")
-if not key:
-    raise ValueError("Supabase Key is missing. Please set SUPABASE_SERVICE_ROLE_KEY.")
-
-supabase: Client = create_client(url, key)
+llm = get_llm_gateway()
 
 class ConversationTurn(BaseModel):
     question: str
@@ -35,140 +24,149 @@ class QuestionRequest(BaseModel):
     participantContext: Optional[Dict[str, Any]] = None # Deprecated, preferred to fetch from DB
     goodQuestions: List[str] = []
     badQuestions: List[str] = []
+    lastTurnQuality: Optional[Dict[str, Any]] = None # Quality agent output for the last turn, drives model routing
 
 class QuestionResponse(BaseModel):
     id: str
     text: str
     type: str = "dynamic"
     rationale: Optional[str] = None
+    modelTier: Optional[str] = None
 
-@router.post("/question", response_model=QuestionResponse)
-async def get_next_question(request: QuestionRequest):
+class PreparedQuestion(BaseModel):
+    seed: Optional[QuestionResponse] = None  # Set when the root question is asked verbatim
+    messages: List[Dict[str, Any]] = []
+    tier: Optional[str] = None
+    model: Optional[str] = None
+    route_reason: Optional[str] = None
+
+async def prepare_question(request: QuestionRequest, context: Optional[InterviewContext] = None) -> PreparedQuestion:
     """
-    Question Agent: Generate the next question based on conversation history,
-    background QID data, and participant data fetched from DB.
+    Fetch the background data for a question request, build the prompt and pick the model tier.
+    Live interviews pass their session context so nothing is re-read from the DB per turn.
     """
-    try:
-        # 1. Fetch Question Data from Supabase
-        question_data = None
-        if request.questionId:
-            try:
-                response = supabase.table("research_questions").select("*").eq("id", request.questionId).single().execute()
-                question_data = response.data
-            except Exception as e:
-                print(f"Error fetching question data: {e}")
-
-        # 2. Fetch Participant Data from Supabase
-        participant_data = None
-        if request.participantId:
-            try:
-                response = supabase.table("participants").select("*").eq("id", request.participantId).single().execute()
-                participant_data = response.data
-            except Exception as e:
-                print(f"Error fetching participant data: {e}")
-
-        # Build context for GPT-4
-        context_parts = []
+    # 1. Fetch Question Data from Supabase
+    question_data = None
+    if context is not None:
+        question_data = context.research_question or None
+    elif request.questionId:
+        try:
+            question_data = await db.get_research_question(request.questionId)
+        except Exception as e:
+            print(f"Error fetching question data: {e}")
+
+    # 2. Fetch Participant Data from Supabase
+    participant_data = None
+    if context is not None:
+        participant_data = context.participant or None
+    elif request.participantId:
+        try:
+            participant_data = await db.get_participant(request.participantId)
+        except Exception as e:
+            print(f"Error fetching participant data: {e}")
+
+    # Build context for GPT-4
+    context_parts = []
+    
+    # A. ROOT RESEARCH QUESTIONS (from DB)
+    if question_data:
+        # Format DB fields into context
+        fields_to_include = {
+            "Root Question": question_data.get("root_question"),
+            "Specific Product": question_data.get("specific_product"),
+            "Target Demographics": question_data.get("demographics"),
+            "Selected Dataset": question_data.get("selected_dataset"),
+            "Other Information": question_data.get("other_info"),
+            "Related Questions": question_data.get("other_questions")
+        }
+        # Filter distinct None/Empty values
+        context_str = "\n".join([f"{k}: {v}" for k, v in fields_to_include.items() if v])
+        context_parts.append(f"ROOT RESEARCH QUESTIONS & BACKGROUND DATA:\n{context_str}")
+    else:
+        context_parts.append(f"ROOT RESEARCH QUESTIONS:\n(No background data found for ID: {request.questionId})")
+
+    # B. GUIDELINES
+    if request.goodQuestions:
+        context_parts.append("STRATEGY - EMULATE THESE QUESTION TYPES:\n" + "\n".join(f"- {q}" for q in request.goodQuestions))
+    
+    if request.badQuestions:
+        context_parts.append("STRATEGY - AVOID THESE QUESTION TYPES:\n" + "\n".join(f"- {q}" for q in request.badQuestions))
+
+    # C. PARTICIPANT PROFILE (From DB)
+    if participant_data:
+        # Construct profile string from available fields
+        profile_parts = []
         
-        # A. ROOT RESEARCH QUESTIONS (from DB)
-        if question_data:
-            # Format DB fields into context
-            fields_to_include = {
-                "Root Question": question_data.get("root_question"),
-                "Specific Product": question_data.get("specific_product"),
-                "Target Demographics": question_data.get("demographics"),
-                "Selected Dataset": question_data.get("selected_dataset"),
-                "Other Information": question_data.get("other_info"),
-                "Related Questions": question_data.get("other_questions")
-            }
-            # Filter distinct None/Empty values
-            context_str = "\n".join([f"{k}: {v}" for k, v in fields_to_include.items() if v])
-            context_parts.append(f"ROOT RESEARCH QUESTIONS & BACKGROUND DATA:\n{context_str}")
-        else:
-            context_parts.append(f"ROOT RESEARCH QUESTIONS:\n(No background data found for ID: {request.questionId})")
-
-        # B. GUIDELINES
-        if request.goodQuestions:
-            context_parts.append("STRATEGY - EMULATE THESE QUESTION TYPES:\n" + "\n".join(f"- {q}" for q in request.goodQuestions))
+        # 1. Identity
+        if participant_data.get("full_name"):
+            profile_parts.append(f"Name: {participant_data.get('full_name')}")
         
-        if request.badQuestions:
-            context_parts.append("STRATEGY - AVOID THESE QUESTION TYPES:\n" + "\n".join(f"- {q}" for q in request.badQuestions))
+        # 2. Core Demographics
+        demos = []
+        if participant_data.get("age"):
+            demos.append(f"Age: {participant_data.get('age')}")
+        if participant_data.get("gender"):
+            demos.append(f"Gender: {participant_data.get('gender')}")
+        if participant_data.get("city") or participant_data.get("country"):
+            loc_parts = [p for p in [participant_data.get("city"), participant_data.get("country")] if p]
+            demos.append(f"Location: {', '.join(loc_parts)}")
+        if participant_data.get("language"):
+            demos.append(f"Language: {participant_data.get('language')}")
+        if participant_data.get("timezone"):
+            demos.append(f"Timezone: {participant_data.get('timezone')}")
+        
+        if demos:
+            profile_parts.append("Demographics:\n- " + "\n- ".join(demos))
 
-        # C. PARTICIPANT PROFILE (From DB)
-        if participant_data:
-            # Construct profile string from available fields
-            profile_parts = []
-            
-            # 1. Identity
-            if participant_data.get("full_name"):
-                profile_parts.append(f"Name: {participant_data.get('full_name')}")
-            
-            # 2. Core Demographics
-            demos = []
-            if participant_data.get("age"):
-                demos.append(f"Age: {participant_data.get('age')}")
-            if participant_data.get("gender"):
-                demos.append(f"Gender: {participant_data.get('gender')}")
-            if participant_data.get("city") or participant_data.get("country"):
-                loc_parts = [p for p in [participant_data.get("city"), participant_data.get("country")] if p]
-                demos.append(f"Location: {', '.join(loc_parts)}")
-            if participant_data.get("language"):
-                demos.append(f"Language: {participant_data.get('language')}")
-            if participant_data.get("timezone"):
-                demos.append(f"Timezone: {participant_data.get('timezone')}")
+        # 3. Tags
+        if participant_data.get("tags"):
+            tags_str = ", ".join(participant_data.get("tags"))
+            profile_parts.append(f"Tags: {tags_str}")
+        
+        # 4. Detailed Metadata
+        # Iterate through all metadata fields
+        meta = participant_data.get("metadata", {})
+        if meta:
+            meta_points = []
+            for k, v in meta.items():
+                # Format key to be readable (e.g., "job_title" -> "Job Title")
+                readable_key = k.replace("_", " ").title()
+                meta_points.append(f"{readable_key}: {v}")
             
-            if demos:
-                profile_parts.append("Demographics:\n- " + "\n- ".join(demos))
+            if meta_points:
+                profile_parts.append("Additional Background:\n- " + "\n- ".join(meta_points))
+        
+        context_parts.append("PARTICIPANT PROFILE:\n" + "\n".join(profile_parts))
+    
+    # Fallback to request context if DB fetch failed but context provided
+    elif request.participantContext:
+        demo = request.participantContext.get("demographics", {})
+        metadata = request.participantContext.get("metadata", {})
+        context_parts.append(f"PARTICIPANT PROFILE (Fallback):\nDemographics: {demo}\nMetadata: {metadata}")
 
-            # 3. Tags
-            if participant_data.get("tags"):
-                tags_str = ", ".join(participant_data.get("tags"))
-                profile_parts.append(f"Tags: {tags_str}")
-            
-            # 4. Detailed Metadata
-            # Iterate through all metadata fields
-            meta = participant_data.get("metadata", {})
-            if meta:
-                meta_points = []
-                for k, v in meta.items():
-                    # Format key to be readable (e.g., "job_title" -> "Job Title")
-                    readable_key = k.replace("_", " ").title()
-                    meta_points.append(f"{readable_key}: {v}")
-                
-                if meta_points:
-                    profile_parts.append("Additional Background:\n- " + "\n- ".join(meta_points))
-            
-            context_parts.append("PARTICIPANT PROFILE:\n" + "\n".join(profile_parts))
+    # 4. Conversation History
+    history_text = ""
+    last_turn_text = ""
+    
+    if request.conversationHistory:
+        # Separate the last turn if history exists
+        past_turns = request.conversationHistory[:-1]
+        last_turn = request.conversationHistory[-1]
         
-        # Fallback to request context if DB fetch failed but context provided
-        elif request.participantContext:
-            demo = request.participantContext.get("demographics", {})
-            metadata = request.participantContext.get("metadata", {})
-            context_parts.append(f"PARTICIPANT PROFILE (Fallback):\nDemographics: {demo}\nMetadata: {metadata}")
-
-        # 4. Conversation History
-        history_text = ""
-        last_turn_text = ""
+        if past_turns:
+            history_str = "\n".join([
+                f"Q: {turn.question}\nA: {turn.answer}"
+                for turn in past_turns
+            ])
+            history_text = f"CONVERSATION HISTORY:\n{history_str}"
+            context_parts.append(history_text)
         
-        if request.conversationHistory:
-            # Separate the last turn if history exists
-            past_turns = request.conversationHistory[:-1]
-            last_turn = request.conversationHistory[-1]
-            
-            if past_turns:
-                history_str = "\n".join([
-                    f"Q: {turn.question}\nA: {turn.answer}"
-                    for turn in past_turns
-                ])
-                history_text = f"CONVERSATION HISTORY:\n{history_str}"
-                context_parts.append(history_text)
-            
-            # 5. Review the immediate context
-            last_turn_text = f"IMMEDIATE CONTEXT (Last Turn):\nAgent Asked: {last_turn.question}\nParticipant Responded: {last_turn.answer}"
-            context_parts.append(last_turn_text)
+        # 5. Review the immediate context
+        last_turn_text = f"IMMEDIATE CONTEXT (Last Turn):\nAgent Asked: {last_turn.question}\nParticipant Responded: {last_turn.answer}"
+        context_parts.append(last_turn_text)
 
-        # Create the High-Fidelity System Prompt
-        system_prompt = """You are an elite Qualitative Researcher and Ethnographer (e.g., equivalent to a Senior UX Researcher at a top firm).
+    # Create the High-Fidelity System Prompt
+    system_prompt = """You are an elite Qualitative Researcher and Ethnographer (e.g., equivalent to a Senior UX Researcher at a top firm).
 Your specific mission is to conduct a semi-structured interview to gather deep, rich data that answers the ROOT RESEARCH QUESTIONS provided in the context.
 
 ## YOUR OBJECTIVES
@@ -190,27 +188,76 @@ Your specific mission is to conduct a semi-structured interview to gather deep,
 - Use the "Good/Bad" question examples as a style guide for tone and structure.
 """
 
-        user_prompt = "\n\n====================\n\n".join(context_parts) + "\n\n====================\n\nTASK: Based on the ROOT RESEARCH QUESTIONS and the IMMEDIATE CONTEXT above, generate the single most high-value follow-up question now."
-        
-        if not request.conversationHistory:
-            # First question - use the root question directly from the looked-up data
-            if question_data and "root_question" in question_data:
-                return QuestionResponse(
-                    id=request.questionId,
-                    text=question_data["root_question"],
-                    type="seed"
-                )
-
-        # Call GPT-4
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+    user_prompt = "\n\n====================\n\n".join(context_parts) + "\n\n====================\n\nTASK: Based on the ROOT RESEARCH QUESTIONS and the IMMEDIATE CONTEXT above, generate the single most high-value follow-up question now."
+    
+    if not request.conversationHistory:
+        # First question - use the root question directly from the looked-up data
+        if question_data and "root_question" in question_data:
+            return PreparedQuestion(seed=QuestionResponse(
+                id=request.questionId,
+                text=question_data["root_question"],
+                type="seed"
+            ))
+
+    # 6. Pick the model tier (fast by default, large when the last turn was flagged)
+    interview_config = None
+    if context is not None:
+        interview_config = context.interview_config
+    else:
+        try:
+            interview_config = await db.get_interview_config(request.studyId)
+        except Exception as e:
+            print(f"Error fetching interview config: {e}")
+
+    model_router = get_model_router()
+    routing_config = model_router.resolve_config(interview_config)
+    tier, model, route_reason = model_router.choose(routing_config, request.lastTurnQuality)
+
+    return PreparedQuestion(
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        tier=tier,
+        model=model,
+        route_reason=route_reason
+    )
+
+
+@router.post("/question", response_model=QuestionResponse)
+async def get_next_question(request: QuestionRequest):
+    """
+    Question Agent: Generate the next question based on conversation history,
+    background QID data, and participant data fetched from DB.
+    """
+    return await generate_question(request)
+
+
+async def generate_question(
+    request: QuestionRequest,
+    context: Optional[InterviewContext] = None,
+    priority: Priority = Priority.REALTIME
+) -> QuestionResponse:
+    """
+    Generate the next question, using the session context instead of DB lookups when given.
+    Speculative generation passes a lower priority so it never delays a live turn.
+    """
+    try:
+        prepared = await prepare_question(request, context)
+        if prepared.seed:
+            return prepared.seed
+
+        model_router = get_model_router()
+        started = time.perf_counter()
+        response = await llm.chat_completion(
+            model=prepared.model,
+            messages=prepared.messages,
             temperature=0.7,
-            max_tokens=150
+            max_tokens=150,
+            priority=priority,
+            endpoint="question"
         )
+        model_router.record(prepared.tier, prepared.model, (time.perf_counter() - started) * 1000, response.usage)
 
         question_text = response.choices[0].message.content.strip()
 
@@ -221,8 +268,36 @@ Your specific mission is to conduct a semi-structured interview to gather deep,
             id=f"dynamic-{request.sessionId}-{len(request.conversationHistory)}",
             text=question_text,
             type="dynamic",
-            rationale="Generated based on conversation flow"
+            rationale=f"Generated based on conversation flow ({prepared.tier} tier: {prepared.route_reason})",
+            modelTier=prepared.tier
         )
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Question generation failed: {str(e)}")
+
+
+async def stream_next_question(request: QuestionRequest, context: Optional[InterviewContext] = None) -> AsyncIterator[str]:
+    """
+    Question Agent (streaming): Yield the next question as text deltas as the model produces them,
+    so speech synthesis can start before the full question is generated.
+    """
+    prepared = await prepare_question(request, context)
+    if prepared.seed:
+        yield prepared.seed.text
+        return
+
+    model_router = get_model_router()
+    started = time.perf_counter()
+    usage = None
+    async for delta, chunk_usage in llm.stream_chat_completion(
+        model=prepared.model,
+        messages=prepared.messages,
+        temperature=0.7,
+        max_tokens=150,
+        priority=Priority.REALTIME,
+        endpoint="question"
+    ):
+        usage = chunk_usage or usage
+        if delta:
+            yield delta
+    model_router.record(prepared.tier, prepared.model, (time.perf_counter() - started) * 1000, usage)
@@ -3,43 +3,61 @@ from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import os
 import json
+import base64
 import asyncio
 import websockets
-from openai import AsyncOpenAI
-from supabase import create_client, Client
+from services.interview_context import InterviewContext, load_interview_context
+from services.task_pool import get_task_pool
+from services.summary_queue import get_summary_queue
+from services.audio_frames import AudioChannel, FrameKind
+from services.interview_logging import InterviewLog
+from services import database as db
 
 router = APIRouter()
-client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
-# Initialize Supabase Client
-url: str = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+# Audio delivery to the client: "complete" sends one audio_complete message per utterance,
+# as existing clients expect; "stream" (opt-in) forwards each Realtime API audio delta as
+# it arrives, for clients that play PCM incrementally. Clients can override with ?audio=...
+AUDIO_MODES = ("complete", "stream")
+DEFAULT_AUDIO_MODE = os.getenv("REALTIME_AUDIO_MODE", "complete").lower()
 
-if not url:
-    raise ValueError("Supabase URL is missing. Please set SUPABASE_URL or NEXT_PUBLIC_SUPABASE_URL.")
-if not key:
-    raise ValueError("Supabase Key is missing. Please set SUPABASE_SERVICE_ROLE_KEY.")
+# Playback buffer the client should hold before starting a streamed utterance
+JITTER_BUFFER_MS = int(os.getenv("REALTIME_JITTER_BUFFER_MS", "200"))
 
-supabase: Client = create_client(url, key)
+# Output format configured in configure_session (pcm16, 24kHz mono)
+OUTPUT_SAMPLE_RATE = 24000
+
+# Silence after which the Realtime API's server VAD ends the participant's turn
+SILENCE_DURATION_MS = int(os.getenv("REALTIME_SILENCE_DURATION_MS", "800"))
 
 class RealtimeInterviewSession:
     """Manages a single realtime interview session"""
 
-    def __init__(self, session_id: str, study_id: str, question_id: str, participant_id: str):
-        self.session_id = session_id
-        self.study_id = study_id
-        self.question_id = question_id
-        self.participant_id = participant_id
+    def __init__(self, context: InterviewContext, audio_mode: str = DEFAULT_AUDIO_MODE):
+        self.context = context  # Loaded once at connect, reused every turn
+        self.session_id = context.session_id
+        self.study_id = context.study_id
+        self.question_id = context.question_id
+        self.participant_id = context.participant_id
+        self.log = InterviewLog("realtime", self.session_id)
         self.conversation_history = []
         self.current_question = None
         self.openai_ws = None
         self.client_ws = None
+        self.channel: Optional[AudioChannel] = None  # Audio in the negotiated framing
         self.turn_index = 0
-        self.audio_buffer = []  # Buffer to collect audio chunks
-
-    async def start(self, client_ws: WebSocket):
+        self.last_quality = None  # Latest quality agent result, used for model routing
+        self.last_quality_turn = 0  # Turn index last_quality belongs to
+        self.quality_tasks = []  # Background quality scoring for this session
+        self.audio_mode = audio_mode if audio_mode in AUDIO_MODES else "complete"
+        self.audio_buffer = []  # Buffered mode: audio chunks of the current utterance
+        self.audio_response_id = None  # Streaming mode: response currently being streamed
+        self.audio_seq = 0  # Streaming mode: sequence number of the last delta sent
+
+    async def start(self, client_ws: WebSocket, channel: Optional[AudioChannel] = None):
         """Initialize the interview session"""
         self.client_ws = client_ws
+        self.channel = channel or AudioChannel(client_ws)
 
         # Connect to OpenAI Realtime API
         openai_api_key = os.environ.get("OPENAI_API_KEY")
@@ -61,7 +79,7 @@ class RealtimeInterviewSession:
             await self.get_and_speak_next_question()
 
         except Exception as e:
-            print(f"Error connecting to OpenAI Realtime API: {e}")
+            self.log.error("Error connecting to OpenAI Realtime API", error=str(e))
             raise
 
     async def configure_session(self):
@@ -81,7 +99,7 @@ class RealtimeInterviewSession:
                     "type": "server_vad",
                     "threshold": 0.5,
                     "prefix_padding_ms": 300,
-                    "silence_duration_ms": 3000
+                    "silence_duration_ms": SILENCE_DURATION_MS
                 },
                 "temperature": 0.8
             }
@@ -92,14 +110,6 @@ class RealtimeInterviewSession:
     async def get_and_speak_next_question(self):
         """Get next question from question agent and instruct voice model to speak it"""
 
-        # Fetch participant data
-        participant_response = supabase.table("participants").select("*").eq("id", self.participant_id).single().execute()
-        participant_data = participant_response.data if participant_response.data else {}
-
-        # Fetch question data
-        question_response = supabase.table("research_questions").select("*").eq("id", self.question_id).single().execute()
-        question_data = question_response.data if question_response.data else {}
-
         # Build conversation history for question agent
         conversation_turns = []
         for turn in self.conversation_history:
@@ -111,10 +121,10 @@ class RealtimeInterviewSession:
         # Determine the question text
         if len(self.conversation_history) == 0:
             # First question - use root question
-            question_text = question_data.get("root_question", "Tell me about your experience.")
+            question_text = self.context.research_question.get("root_question", "Tell me about your experience.")
         else:
             # Call question agent to generate next question
-            from routers.question import get_next_question, QuestionRequest, ConversationTurn
+            from routers.question import generate_question, QuestionRequest, ConversationTurn
 
             request = QuestionRequest(
                 sessionId=self.session_id,
@@ -124,14 +134,16 @@ class RealtimeInterviewSession:
                 conversationHistory=[ConversationTurn(**turn) for turn in conversation_turns],
                 participantContext=None,
                 goodQuestions=[],
-                badQuestions=[]
+                badQuestions=[],
+                lastTurnQuality=self.last_quality
             )
 
-            question_response = await get_next_question(request)
+            question_response = await generate_question(request, self.context)
             question_text = question_response.text
 
         self.current_question = question_text
         self.audio_buffer = []  # Clear audio buffer for new question
+        self.audio_response_id = None
 
         # Send to client for display
         await self.client_ws.send_json({
@@ -164,8 +176,8 @@ class RealtimeInterviewSession:
         }
 
         # Save to database
-        db_response = supabase.table("qa_turns").insert(qa_turn).execute()
-        qa_turn_id = db_response.data[0]["id"] if db_response.data else None
+        turn_row = await db.insert_turn(qa_turn)
+        qa_turn_id = turn_row["id"] if turn_row else None
 
         # Add to conversation history
         self.conversation_history.append(qa_turn)
@@ -176,8 +188,8 @@ class RealtimeInterviewSession:
             "text": transcript
         })
 
-        # Call quality agent to score the Q&A
-        await self.score_qa(qa_turn_id, transcript)
+        # Score the Q&A in the background; the next question doesn't wait for it
+        self.submit_quality_scoring(qa_turn_id, transcript)
 
         # Check if interview should end
         if await self.should_end_interview():
@@ -186,58 +198,76 @@ class RealtimeInterviewSession:
             # Get and speak next question
             await self.get_and_speak_next_question()
 
-    async def score_qa(self, qa_turn_id: str, answer_text: str):
-        """Score the Q&A pair using quality agent"""
-        try:
-            from routers.quality import score_qa, QualityRequest, ConversationTurn
+    def submit_quality_scoring(self, qa_turn_id: str, answer_text: str):
+        """Queue quality scoring for the turn just recorded"""
+        from routers.quality import QualityRequest, ConversationTurn
 
-            # Build conversation history
-            conversation_turns = []
-            for turn in self.conversation_history[:-1]:  # Exclude current turn
-                conversation_turns.append(ConversationTurn(
-                    question=turn.get("question_text", ""),
-                    answer=turn.get("answer_text", "")
-                ))
+        # Snapshot the turn now; current_question moves on before the score lands
+        conversation_turns = []
+        for turn in self.conversation_history[:-1]:  # Exclude current turn
+            conversation_turns.append(ConversationTurn(
+                question=turn.get("question_text", ""),
+                answer=turn.get("answer_text", "")
+            ))
+
+        request = QualityRequest(
+            sessionId=self.session_id,
+            questionId=self.question_id,
+            questionText=self.current_question,
+            answerText=answer_text,
+            participantContext=None,
+            conversationHistory=conversation_turns,
+            qaTurnId=qa_turn_id
+        )
 
-            request = QualityRequest(
-                sessionId=self.session_id,
-                questionId=None,
-                questionText=self.current_question,
-                answerText=answer_text,
-                participantContext=None,
-                conversationHistory=conversation_turns
-            )
+        self.quality_tasks = [t for t in self.quality_tasks if not t.done()]
+        self.quality_tasks.append(get_task_pool("quality_scoring").submit(self.score_qa(request, self.turn_index)))
+
+    async def score_qa(self, request, turn_index: int):
+        """Score the Q&A pair using quality agent and attach the result to the turn"""
+        try:
+            from routers.quality import score_qa
 
+            # The quality agent saves the label against the turn we already stored
             quality_response = await score_qa(request)
 
-            # The quality agent already saves to DB, so we don't need to duplicate that
+            # Scores can land out of order; routing should use the most recent turn's
+            if turn_index >= self.last_quality_turn:
+                self.last_quality = quality_response.dict()
+                self.last_quality_turn = turn_index
+
+            await self.client_ws.send_json({
+                "type": "quality",
+                "turnIndex": turn_index,
+                "qaTurnId": quality_response.qaTurnId,
+                "overallScore": quality_response.overall_score,
+                "flags": quality_response.flags
+            })
 
         except Exception as e:
-            print(f"Error scoring Q&A: {e}")
+            self.log.error("Error scoring Q&A", turn_index=turn_index, error=str(e))
 
     async def should_end_interview(self) -> bool:
         """Check if interview should end"""
-        # Fetch study config
-        study_response = supabase.table("studies").select("interview_config").eq("id", self.study_id).single().execute()
-        study_data = study_response.data if study_response.data else {}
-
-        max_questions = study_data.get("interview_config", {}).get("max_questions", 10)
-
-        return len(self.conversation_history) >= max_questions
+        return len(self.conversation_history) >= self.context.max_questions
 
     async def end_interview(self):
         """End the interview session"""
         # Update session status
-        supabase.table("interview_sessions").update({
-            "status": "completed",
-            "completed_at": "now()"
-        }).eq("id", self.session_id).execute()
+        await db.complete_session(self.session_id)
+
+        # Summarize the session in the background so reports don't have to. Queued before
+        # the client is told, since it closes the socket as soon as it hears the interview ended
+        await get_summary_queue().enqueue(self.session_id)
 
         # Send completion message to client
         await self.client_ws.send_json({
             "type": "interview_complete"
         })
 
+        # Let in-flight scoring for this session finish
+        await get_task_pool("quality_scoring").drain(self.quality_tasks, timeout=30.0)
+
         # Close OpenAI connection
         if self.openai_ws:
             await self.openai_ws.close()
@@ -246,26 +276,23 @@ class RealtimeInterviewSession:
         """Handle messages from OpenAI Realtime API"""
         msg_type = message.get("type")
 
-        # Log all events for debugging (excluding audio deltas to reduce noise)
-        if msg_type != "response.audio.delta":
-            print(f"[OpenAI Event] {msg_type}: {json.dumps(message, indent=2)}")
+        # Count every event; payloads (never audio) are only traced for sampled sessions
+        self.log.event(msg_type, None if msg_type == "response.audio.delta" else message)
 
         if msg_type == "conversation.item.input_audio_transcription.completed":
             # Participant's response has been transcribed
             transcript = message.get("transcript", "")
-            print(f"[Transcript] {transcript}")
+            self.log.debug("Transcript received", transcript=transcript)
             await self.handle_transcript(transcript)
 
         elif msg_type == "input_audio_buffer.speech_started":
             # User started speaking
-            print("[VAD] Speech started")
             await self.client_ws.send_json({
                 "type": "speech_started"
             })
 
         elif msg_type == "input_audio_buffer.speech_stopped":
             # User stopped speaking - commit the buffer
-            print("[VAD] Speech stopped - committing audio buffer")
             await self.client_ws.send_json({
                 "type": "speech_stopped"
             })
@@ -273,19 +300,9 @@ class RealtimeInterviewSession:
                 "type": "input_audio_buffer.commit"
             }))
 
-        elif msg_type == "input_audio_buffer.committed":
-            # Buffer committed - with server_vad, response is auto-created
-            print("[VAD] Audio buffer committed")
-
-        elif msg_type == "conversation.item.created":
-            # Conversation item created (user or assistant message)
-            item = message.get("item", {})
-            print(f"[Conversation] Item created: {item.get('type')}")
-
         elif msg_type == "response.done":
             # Response generation complete - extract transcript from user input
             response = message.get("response", {})
-            print(f"[Response] Done: {response}")
 
             # Look for the user's transcript in the output
             output = response.get("output", [])
@@ -296,49 +313,82 @@ class RealtimeInterviewSession:
                         if content_part.get("type") == "input_audio":
                             transcript = content_part.get("transcript")
                             if transcript:
-                                print(f"[Transcript from response.done] {transcript}")
+                                self.log.debug("Transcript from response.done", transcript=transcript)
                                 await self.handle_transcript(transcript)
 
         elif msg_type == "response.audio.delta":
-            # Buffer audio chunk instead of streaming
             audio_data = message.get("delta", "")
-            if audio_data:
+            if not audio_data:
+                return
+            if self.audio_mode == "stream":
+                await self.stream_audio_delta(message.get("response_id"), audio_data)
+            else:
+                # Buffer audio chunk until the utterance is complete
                 self.audio_buffer.append(audio_data)
-                if len(self.audio_buffer) % 10 == 0:
-                    print(f"[Audio] Buffered {len(self.audio_buffer)} chunks")
+
+        elif msg_type == "response.audio.done" and self.audio_mode == "stream":
+            # Every delta has already been forwarded; tell the client the utterance ended
+            if self.audio_response_id is not None:
+                await self.client_ws.send_json({
+                    "type": "audio_done",
+                    "responseId": self.audio_response_id,
+                    "seq": self.audio_seq
+                })
+                self.log.debug("Streamed response audio", response_id=self.audio_response_id, chunks=self.audio_seq)
+            self.audio_response_id = None
 
         elif msg_type == "response.audio.done":
             # Send complete audio to client
-            print(f"[Audio] Audio generation complete. Sending {len(self.audio_buffer)} buffered chunks as one")
-
-            # Concatenate all audio chunks
-            complete_audio = "".join(self.audio_buffer)
+            # Concatenate all audio chunks (decoded: base64 deltas do not concatenate cleanly)
+            complete_audio = b"".join(base64.b64decode(chunk) for chunk in self.audio_buffer)
 
             # Send complete audio to client
-            await self.client_ws.send_json({
-                "type": "audio_complete",
-                "data": complete_audio
-            })
+            await self.channel.send_audio(FrameKind.AUDIO_COMPLETE, complete_audio)
 
-            print(f"[Audio] Sent complete audio ({len(complete_audio)} bytes base64)")
+            self.log.debug("Sent buffered response audio", chunks=len(self.audio_buffer), bytes=len(complete_audio))
 
             # Clear buffer
             self.audio_buffer = []
 
         elif msg_type == "error":
             error_msg = message.get("error", {})
-            print(f"OpenAI error: {error_msg}")
+            self.log.error("OpenAI Realtime API error", error=str(error_msg))
             await self.client_ws.send_json({
                 "type": "error",
                 "message": str(error_msg)
             })
 
+    async def stream_audio_delta(self, response_id: Optional[str], audio_data: str):
+        """
+        Forward one audio delta to the client as it arrives
+
+        The first delta of a response is preceded by audio_start, which carries the PCM
+        format and a jitter-buffer hint: the client should queue that much audio before
+        starting playback. Deltas carry a per-response sequence number starting at 1 so
+        the client can detect gaps and drop chunks of an interrupted response.
+        """
+        if self.audio_response_id is None or response_id != self.audio_response_id:
+            self.audio_response_id = response_id
+            self.audio_seq = 0
+            await self.client_ws.send_json({
+                "type": "audio_start",
+                "responseId": response_id,
+                "format": "pcm16",
+                "sampleRate": OUTPUT_SAMPLE_RATE,
+                "jitterBufferMs": JITTER_BUFFER_MS
+            })
+
+        self.audio_seq += 1
+        await self.channel.send_audio_base64(
+            FrameKind.AUDIO_DELTA, audio_data, seq=self.audio_seq, responseId=response_id
+        )
+
     async def forward_audio_to_openai(self, audio_data: str):
         """Forward audio from client to OpenAI"""
         # Log first time we receive audio
         if not hasattr(self, '_audio_received'):
             self._audio_received = True
-            print(f"[Audio] First audio chunk received, length: {len(audio_data)} bytes")
+            self.log.debug("First audio chunk received", length=len(audio_data))
 
         audio_message = {
             "type": "input_audio_buffer.append",
@@ -349,64 +399,75 @@ class RealtimeInterviewSession:
 
 
 @router.websocket("/realtime-interview/{session_id}")
-async def realtime_interview_websocket(websocket: WebSocket, session_id: str):
-    """WebSocket endpoint for realtime interview"""
+async def realtime_interview_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    audio: Optional[str] = None,
+    framing: Optional[str] = None
+):
+    """
+    WebSocket endpoint for realtime interview
+
+    `?audio=complete` (default, see REALTIME_AUDIO_MODE) sends a single audio_complete per
+    utterance; `?audio=stream` sends audio_start, audio_delta and audio_done messages.
+    `?framing=binary` moves audio in both directions as binary frames instead of base64
+    JSON (see services/audio_frames.py); the server confirms it with a "framing" message.
+    """
 
     await websocket.accept()
+    channel = AudioChannel(websocket, framing)
+    await channel.announce()
+
+    log = InterviewLog("realtime", session_id)
+    interview = None
 
     try:
         # Get session details
-        session_response = supabase.table("interview_sessions").select("""
-            *,
-            study:studies(*),
-            participant:participants(*)
-        """).eq("id", session_id).single().execute()
+        session_data = await db.get_session_details(session_id)
 
-        if not session_response.data:
+        if not session_data:
             await websocket.send_json({"type": "error", "message": "Session not found"})
             await websocket.close()
             return
 
-        session_data = session_response.data
-
         # Get research question from the session
         question_id = session_data.get("research_question_id")
 
         # Fallback: if session doesn't have research_question_id, try to find it via participant's assignment
         if not question_id:
-            assignment_response = supabase.table("research_question_assignments").select("research_question_id").eq("participant_id", session_data["participant_id"]).limit(1).execute()
+            question_id = await db.find_assigned_research_question(session_data["participant_id"])
 
-            if assignment_response.data and len(assignment_response.data) > 0:
-                question_id = assignment_response.data[0]["research_question_id"]
+            if question_id:
                 # Update the session with the research_question_id for future use
-                supabase.table("interview_sessions").update({"research_question_id": question_id}).eq("id", session_id).execute()
+                await db.set_session_research_question(session_id, question_id)
             else:
                 await websocket.send_json({"type": "error", "message": "No research question found for this participant"})
                 await websocket.close()
                 return
 
         # Create interview session
+        # Load everything the interview needs per turn once, up front
         interview = RealtimeInterviewSession(
-            session_id=session_id,
-            study_id=session_data["study_id"],
-            question_id=question_id,
-            participant_id=session_data["participant_id"]
+            await load_interview_context(session_data, question_id),
+            audio_mode=(audio or DEFAULT_AUDIO_MODE).lower()
         )
 
         # Start the interview
-        await interview.start(websocket)
+        await interview.start(websocket, channel)
 
         # Create tasks for bidirectional communication
         async def client_to_openai():
             """Forward messages from client to OpenAI"""
             try:
                 while True:
-                    message = await websocket.receive_json()
+                    # The Realtime API takes base64 audio, so JSON audio is forwarded undecoded
+                    message = await channel.receive(base64_audio=True)
                     msg_type = message.get("type")
+                    log.event(f"client.{msg_type}")
 
                     if msg_type == "audio":
                         # Forward audio data to OpenAI
-                        await interview.forward_audio_to_openai(message.get("data"))
+                        await interview.forward_audio_to_openai(message["audio"])
 
                     elif msg_type == "end":
                         # Client requested to end interview
@@ -414,7 +475,7 @@ async def realtime_interview_websocket(websocket: WebSocket, session_id: str):
                         break
 
             except WebSocketDisconnect:
-                print(f"Client disconnected from session {session_id}")
+                log.info("Client disconnected")
 
         async def openai_to_client():
             """Forward messages from OpenAI to client"""
@@ -425,7 +486,7 @@ async def realtime_interview_websocket(websocket: WebSocket, session_id: str):
                     await interview.handle_openai_message(data)
 
             except websockets.exceptions.ConnectionClosed:
-                print(f"OpenAI connection closed for session {session_id}")
+                log.info("OpenAI connection closed")
 
         # Run both tasks concurrently
         await asyncio.gather(
@@ -435,11 +496,11 @@ async def realtime_interview_websocket(websocket: WebSocket, session_id: str):
         )
 
     except WebSocketDisconnect:
-        print(f"WebSocket disconnected for session {session_id}")
+        log.info("WebSocket disconnected")
     except Exception as e:
-        print(f"Error in realtime interview: {e}")
+        log.error("Error in realtime interview", exc_info=True, error=str(e))
         await websocket.send_json({"type": "error", "message": str(e)})
     finally:
-        if interview.openai_ws:
+        if interview and interview.openai_ws:
             await interview.openai_ws.close()
         await websocket.close()
@@ -1,74 +1,100 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import List, Dict
+from typing import List, Dict, Any, Optional
 import os
 import json
 import asyncio
-import base64
 import io
+import time
 import wave
-from openai import AsyncOpenAI
-from supabase import create_client, Client
+from services.llm_gateway import get_llm_gateway
+from services.rate_limiter import Priority
+from services.speech_pipeline import stream_speech
+from services.speculation import SpeculativeTurn
+from services.audio_frames import AudioChannel, AudioFormat, FrameKind, SAMPLE_RATE
+from services.audio_buffer import AnswerAudioBuffer
+from services.vad import VoiceActivityDetector, SPEECH_STARTED, END_OF_TURN
+from services.interview_logging import InterviewLog
+from services.interview_context import InterviewContext, load_interview_context
+from services.task_pool import get_task_pool
+from services.summary_queue import get_summary_queue
+from services import database as db
 
 router = APIRouter()
-client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+llm = get_llm_gateway()
 
-# Initialize Supabase Client
-url: str = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-key: str = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+# Recordings shorter than this are treated as a skipped question
+MIN_ANSWER_BYTES = 75
 
-if not url:
-    raise ValueError("Supabase URL is missing.")
-if not key:
-    raise ValueError("Supabase Key is missing.")
-
-supabase: Client = create_client(url, key)
+# End answers server-side from the audio_partial stream ("server") or only on the
+# client's audio / audio_commit ("client"); clients can override with ?endpointing=...
+DEFAULT_ENDPOINTING = os.getenv("VAD_ENDPOINTING", "server").lower()
 
 
 class SimpleInterviewSession:
     """Simplified interview session using Whisper + TTS"""
 
-    def __init__(self, session_id: str, study_id: str, participant_id: str, question_id: str = None):
-        self.session_id = session_id
-        self.study_id = study_id
-        self.participant_id = participant_id
-        self.question_id = question_id
+    def __init__(self, context: InterviewContext, audio_mode: str = "complete", endpointing: str = DEFAULT_ENDPOINTING):
+        self.context = context  # Loaded once at connect, reused every turn
+        self.session_id = context.session_id
+        self.study_id = context.study_id
+        self.participant_id = context.participant_id
+        self.question_id = context.question_id
+        self.log = InterviewLog("simple", self.session_id)
         self.conversation_history = []
         self.current_question = None
         self.client_ws = None
+        self.channel: Optional[AudioChannel] = None  # Audio in the negotiated framing
         self.turn_index = 0
-        self.audio_buffer = []  # Buffer for incoming audio from user
+        self.last_quality = None  # Latest quality agent result, used for model routing
+        self.last_quality_turn = 0  # Turn index last_quality belongs to
+        self.quality_tasks = []  # Background quality scoring for this session
+        self.answer_audio = AnswerAudioBuffer()  # Answer chunks uploaded while the participant speaks
         self.is_listening = False
-
-    async def start(self, client_ws: WebSocket):
+        self.listening_turn = 0  # turn_index the answer being collected will be saved as
+        self.server_committed = False  # The server ended the last answer; its trailing client audio is stale
+        self.audio_mode = audio_mode  # "complete" (one audio_complete message) or "stream" (sentence audio_chunk messages)
+        # Server-side end-of-turn detection; adapts to this participant's pauses across turns
+        self.vad = VoiceActivityDetector() if endpointing == "server" else None
+        # Candidate follow-up prepared from partial audio while the participant is still answering
+        self.speculation = SpeculativeTurn(self._transcribe_pcm, self._generate_candidate)
+
+    async def start(self, client_ws: WebSocket, channel: Optional[AudioChannel] = None):
         """Initialize the interview session"""
         self.client_ws = client_ws
+        self.channel = channel or AudioChannel(client_ws)
 
         # Get and speak first question
         await self.get_and_speak_next_question()
 
+    def _question_request(self, conversation_turns: List[Dict]):
+        """Build the question agent request for the given Q&A history"""
+        from routers.question import QuestionRequest, ConversationTurn
+
+        return QuestionRequest(
+            sessionId=self.session_id,
+            studyId=self.study_id,
+            questionId=self.question_id,
+            participantId=self.participant_id,
+            conversationHistory=[ConversationTurn(**turn) for turn in conversation_turns],
+            participantContext=None,
+            goodQuestions=[],
+            badQuestions=[],
+            lastTurnQuality=self.last_quality
+        )
+
     async def get_and_speak_next_question(self):
         """Get next question and generate TTS audio"""
 
-        print(f"\n{'='*80}")
-        print(f"[Question Agent] Starting question generation for turn {len(self.conversation_history) + 1}")
-        print(f"{'='*80}\n")
-
-        # Fetch participant data
-        participant_response = supabase.table("participants").select("*").eq("id", self.participant_id).single().execute()
-        participant_data = participant_response.data if participant_response.data else {}
-        print(f"[Question Agent] Fetched participant data")
-
-        # Fetch question data
-        question_data = {}
-        if self.question_id:
-            question_response = supabase.table("research_questions").select("*").eq("id", self.question_id).single().execute()
-            question_data = question_response.data if question_response.data else {}
+        self.log.debug("Starting question generation", turn=len(self.conversation_history) + 1)
 
-        # Fetch simple questions if no research question ID
-        simple_questions = []
-        if not self.question_id:
-            q_response = supabase.table("questions").select("*").eq("study_id", self.study_id).order("order_index").execute()
-            simple_questions = q_response.data or []
+        if self.conversation_history:
+            # Use the speculative candidate if the final answer matches what it was built from
+            speculative = await self.speculation.resolve(self.conversation_history[-1].get("answer_transcript", ""))
+            if speculative:
+                question_text, audio_bytes = speculative
+                self.log.info("Committing speculative question", question=question_text)
+                await self.speak_prepared(question_text, audio_bytes)
+                return
 
         # Build conversation history for question agent
         conversation_turns = []
@@ -79,40 +105,33 @@ class SimpleInterviewSession:
             })
 
         # Determine the question text
+        question_stream = None
         if len(self.conversation_history) == 0:
             # First question - use root question or first simple question
-            print(f"[Question Agent] This is the FIRST question")
-            if question_data.get("root_question"):
-                question_text = question_data.get("root_question")
-                print(f"[Question Agent] Using root question: {question_text}")
-            elif simple_questions and len(simple_questions) > 0:
-                question_text = simple_questions[0]["text"]
-                print(f"[Question Agent] Using first simple question: {question_text}")
-            else:
-                question_text = "Tell me about your experience."
-                print(f"[Question Agent] Using default question: {question_text}")
+            question_text = self.context.first_question
+            self.log.debug("Using opening question", question=question_text)
         else:
             # Call question agent to generate next question
-            print(f"[Question Agent] Calling Question Agent to generate follow-up question...")
-            print(f"[Question Agent] Conversation history has {len(conversation_turns)} turns")
-
-            from routers.question import get_next_question, QuestionRequest, ConversationTurn
-
-            request = QuestionRequest(
-                sessionId=self.session_id,
-                studyId=self.study_id,
-                questionId=self.question_id,
-                participantId=self.participant_id,
-                conversationHistory=[ConversationTurn(**turn) for turn in conversation_turns],
-                participantContext=None,
-                goodQuestions=[],
-                badQuestions=[]
-            )
+            self.log.debug("Generating follow-up question", history_turns=len(conversation_turns))
+
+            from routers.question import generate_question
 
-            print(f"[Question Agent] Sending request to Question Agent...")
-            question_response = await get_next_question(request)
-            question_text = question_response.text
-            print(f"[Question Agent] ✅ Question Agent returned: {question_text}")
+            request = self._question_request(conversation_turns)
+
+            if self.audio_mode == "stream":
+                from routers.question import stream_next_question
+
+                question_stream = stream_next_question(request, self.context)
+            else:
+                question_response = await generate_question(request, self.context)
+                question_text = question_response.text
+                self.log.debug("Question Agent returned", question=question_text)
+
+        if self.audio_mode == "stream":
+            if question_stream is None:
+                question_stream = self._single_delta(question_text)
+            await self.speak_streaming(question_stream)
+            return
 
         self.current_question = question_text
 
@@ -123,119 +142,246 @@ class SimpleInterviewSession:
         })
 
         # Generate TTS audio
-        print(f"[TTS] Generating audio for: {question_text}")
-
         try:
             # Use OpenAI TTS API
-            response = await client.audio.speech.create(
-                model="tts-1",  # or "tts-1-hd" for higher quality
-                voice="alloy",
-                input=question_text,
-                response_format="opus"  # Use opus format (better compression, widely supported)
+            audio_bytes = await self._synthesize(question_text)
+
+            # Send complete audio to client
+            await self.channel.send_audio(FrameKind.AUDIO_COMPLETE, audio_bytes, AudioFormat.OPUS)
+            self.log.debug("Sent question audio", bytes=len(audio_bytes))
+
+            # Start listening for response
+            await self.start_listening()
+
+        except Exception as e:
+            self.log.error("Error generating audio", exc_info=True, error=str(e))
+            await self.client_ws.send_json({
+                "type": "error",
+                "message": f"Failed to generate audio: {str(e)}"
+            })
+
+    @staticmethod
+    async def _single_delta(text: str):
+        yield text
+
+    async def _synthesize(self, text: str, priority: Priority = Priority.REALTIME) -> bytes:
+        return await llm.speech(
+            text,
+            model="tts-1",
+            voice="alloy",
+            response_format="opus",
+            priority=priority
+        )
+
+    async def speak_prepared(self, question_text: str, audio_bytes: bytes):
+        """Send a question whose audio was already synthesized, in the session's audio mode"""
+        self.current_question = question_text
+
+        if self.audio_mode == "stream":
+            await self.client_ws.send_json({"type": "question_start"})
+            await self.channel.send_audio(
+                FrameKind.AUDIO_CHUNK, audio_bytes, AudioFormat.OPUS, seq=0, text=question_text
             )
+            await self.client_ws.send_json({"type": "question", "text": question_text})
+            await self.client_ws.send_json({"type": "audio_end", "chunks": 1, "format": "opus"})
+        else:
+            await self.client_ws.send_json({"type": "question", "text": question_text})
+            await self.channel.send_audio(FrameKind.AUDIO_COMPLETE, audio_bytes, AudioFormat.OPUS)
+
+        await self.start_listening()
+
+    @staticmethod
+    def _wav_file(pcm_bytes: bytes) -> io.BytesIO:
+        """Wrap raw 24kHz mono PCM16 audio in a WAV file for Whisper"""
+        wav_buffer = io.BytesIO()
+        with wave.open(wav_buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)  # Mono
+            wav_file.setsampwidth(2)  # 16-bit
+            wav_file.setframerate(SAMPLE_RATE)
+            wav_file.writeframes(pcm_bytes)
+
+        wav_buffer.seek(0)
+        wav_buffer.name = "audio.wav"
+        return wav_buffer
+
+    async def _transcribe_pcm(self, pcm_bytes: bytes) -> str:
+        """Transcribe partial answer audio for speculation"""
+        return await llm.transcribe(
+            file=self._wav_file(pcm_bytes),
+            model="whisper-1",
+            priority=Priority.INTERACTIVE
+        )
 
-            # Get the audio bytes
-            audio_bytes = response.content
+    async def _generate_candidate(self, partial_transcript: str):
+        """Generate the follow-up question and its audio as if the answer ended now"""
+        from routers.question import generate_question
 
-            # Convert to base64
-            audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+        conversation_turns = [
+            {"question": turn.get("question_text", ""), "answer": turn.get("answer_transcript", "")}
+            for turn in self.conversation_history
+        ]
+        conversation_turns.append({"question": self.current_question or "", "answer": partial_transcript})
 
-            print(f"[TTS] Generated {len(audio_bytes)} bytes of audio ({len(audio_base64)} base64)")
+        question_response = await generate_question(
+            self._question_request(conversation_turns), self.context, priority=Priority.INTERACTIVE
+        )
+        audio_bytes = await self._synthesize(question_response.text, priority=Priority.INTERACTIVE)
+        self.log.debug("Prepared speculative question", question=question_response.text)
+        return question_response.text, audio_bytes
+
+    async def start_listening(self):
+        """Start collecting the participant's answer and tell the client which turn it is"""
+        self.is_listening = True
+        self.listening_turn = self.turn_index + 1
+        self.answer_audio.clear()
+        if self.vad:
+            self.vad.start_turn()
+        await self.client_ws.send_json({"type": "listening", "turn": self.listening_turn})
+
+    def accepts(self, message: Dict[str, Any]) -> bool:
+        """
+        Whether a client audio message belongs to the answer being collected
+
+        Messages that carry a turn must match the listening turn. Without one, a message
+        sent for an answer the server already ended (its trailing audio_partial chunks, the
+        client's own audio_commit or full recording) is recognized by arriving before the
+        client starts a new utterance, i.e. before an audio_partial with seq 0.
+        """
+        turn = message.get("turn")
+        if turn is not None:
+            return turn == self.listening_turn
+        if not self.server_committed:
+            return True
+
+        if message.get("type") == "audio_partial" and message.get("seq", 0) == 0:
+            self.server_committed = False
+            return True
+        if message.get("type") in ("audio_commit", "audio"):
+            # The client closed the utterance the server already committed
+            self.server_committed = False
+        return False
+
+    async def handle_audio_partial(self, audio_bytes: bytes):
+        """Receive a chunk of the answer (raw PCM16) while the participant is still speaking"""
+        if not self.is_listening or not audio_bytes:
+            return
+        if self.answer_audio.append(audio_bytes):
+            with self.answer_audio.view() as answer_audio:
+                self.speculation.add_audio(answer_audio)
 
-            # Send complete audio to client
-            print(f"[TTS] Sending audio_complete message to client...")
+        if not self.vad:
+            return
+        event = self.vad.process(audio_bytes)
+        if event == SPEECH_STARTED:
+            await self.client_ws.send_json({"type": "speech_started", "turn": self.listening_turn})
+        elif event == END_OF_TURN:
+            self.log.event("vad_end_of_turn")
+            self.log.debug("End of turn", silence_ms=self.vad.silence_ms)
             await self.client_ws.send_json({
-                "type": "audio_complete",
-                "data": audio_base64,
-                "format": "opus"  # Tell client what format this is
+                "type": "speech_stopped",
+                "turn": self.listening_turn,
+                "silenceMs": self.vad.silence_ms
             })
-            print(f"[TTS] ✅ Audio_complete message sent successfully")
+            self.server_committed = True
+            await self.handle_audio_commit()
 
-            # Start listening for response
-            self.is_listening = True
-            self.audio_buffer = []
-            print(f"[TTS] ✅ Now listening for user response (is_listening={self.is_listening})")
-            print(f"\n{'='*80}")
-            print(f"[System] READY FOR USER RESPONSE - Waiting for audio from frontend...")
-            print(f"{'='*80}\n")
+    async def handle_audio_commit(self):
+        """End of answer: transcribe the chunks uploaded while the participant spoke"""
+        if not self.is_listening:
+            self.log.debug("Not listening, ignoring audio commit")
+            return
+        self.log.debug("Answer committed", seconds=round(self.answer_audio.seconds, 1))
+        with self.answer_audio.view() as answer_audio:
+            await self.handle_audio_data(answer_audio)
+
+    async def speak_streaming(self, question_stream):
+        """Stream question text through sentence-level TTS, pushing audio chunks as soon as each is ready"""
+        started = time.perf_counter()
+        chunks_sent = 0
+
+        await self.client_ws.send_json({"type": "question_start"})
+
+        async def send_chunk(seq: int, segment: str, audio_bytes: bytes):
+            nonlocal chunks_sent
+            if seq == 0:
+                self.log.info("Time to first audio", ms=round((time.perf_counter() - started) * 1000))
+            await self.channel.send_audio(
+                FrameKind.AUDIO_CHUNK, audio_bytes, AudioFormat.OPUS, seq=seq, text=segment
+            )
+            chunks_sent += 1
 
+        try:
+            question_text = await stream_speech(question_stream, self._synthesize, send_chunk)
         except Exception as e:
-            print(f"[TTS] ❌ Error generating audio: {e}")
-            import traceback
-            traceback.print_exc()
+            self.log.error("Error streaming question audio", exc_info=True, error=str(e))
             await self.client_ws.send_json({
                 "type": "error",
                 "message": f"Failed to generate audio: {str(e)}"
             })
+            return
 
-    async def handle_audio_data(self, audio_data: str):
-        """Receive complete audio recording from user"""
+        self.current_question = question_text
+        self.log.debug("Streamed question audio", chunks=chunks_sent, question=question_text)
+
+        # Full text for display, then mark the end of the audio stream
+        await self.client_ws.send_json({
+            "type": "question",
+            "text": question_text
+        })
+        await self.client_ws.send_json({
+            "type": "audio_end",
+            "chunks": chunks_sent,
+            "format": "opus"
+        })
+
+        await self.start_listening()
+
+    async def handle_audio_data(self, audio_bytes: bytes):
+        """Receive complete audio recording (raw PCM16) from user, or the committed answer buffer"""
         if not self.is_listening:
-            print("[Audio] Not listening, ignoring audio data")
+            self.log.debug("Not listening, ignoring audio data")
             return
 
-        print(f"[Audio] Received complete audio recording ({len(audio_data)} bytes base64)")
+        self.log.debug("Received answer audio", bytes=len(audio_bytes))
 
         # Stop listening immediately
         self.is_listening = False
 
         # Handle skip/empty audio
-        if not audio_data or len(audio_data) < 100:
-            print("[Audio] Empty or skip audio - moving to next question")
+        if len(audio_bytes) < MIN_ANSWER_BYTES:
+            self.log.debug("Empty or skip audio - moving to next question")
             await self.handle_transcript("[SKIPPED]")
             return
 
         try:
-            # Decode base64 audio
-            audio_bytes = base64.b64decode(audio_data)
-
-            print(f"[Whisper] Decoded {len(audio_bytes)} bytes of raw PCM audio")
-
             # Convert PCM to WAV format for Whisper
-            wav_buffer = io.BytesIO()
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(24000)  # 24kHz sample rate
-                wav_file.writeframes(audio_bytes)
-
-            # Get the WAV bytes
-            wav_bytes = wav_buffer.getvalue()
-            print(f"[Whisper] Created WAV file: {len(wav_bytes)} bytes")
-
-            # Create a file-like object for Whisper
-            audio_file = io.BytesIO(wav_bytes)
-            audio_file.name = "audio.wav"
+            audio_file = self._wav_file(audio_bytes)
 
             # Transcribe using Whisper
-            transcription = await client.audio.transcriptions.create(
-                model="whisper-1",
+            transcript = await llm.transcribe(
                 file=audio_file,
-                response_format="text"
+                model="whisper-1",
+                priority=Priority.REALTIME
             )
 
-            transcript = transcription if isinstance(transcription, str) else transcription.text
-
-            print(f"[Whisper] Transcription: {transcript}")
+            self.log.debug("Transcription", transcript=transcript)
 
             # Handle the transcript
             await self.handle_transcript(transcript)
 
         except Exception as e:
-            print(f"[Whisper] Error transcribing audio: {e}")
-            import traceback
-            traceback.print_exc()
+            self.log.error("Error transcribing audio", exc_info=True, error=str(e))
             await self.client_ws.send_json({
                 "type": "error",
                 "message": f"Failed to transcribe audio: {str(e)}"
             })
         finally:
-            self.audio_buffer = []
+            self.answer_audio.clear()
 
     async def handle_transcript(self, transcript: str):
         """Handle participant's response transcript"""
 
-        print(f"[Transcript] Received transcript: {transcript}")
+        self.log.debug("Received transcript", transcript=transcript)
 
         # Store the Q&A turn
         self.turn_index += 1
@@ -247,20 +393,16 @@ class SimpleInterviewSession:
             "turn_index": self.turn_index
         }
 
-        print(f"[Transcript] Saving Q&A turn {self.turn_index} to database")
-
         # Save to database
         try:
-            db_response = supabase.table("qa_turns").insert(qa_turn).execute()
-            qa_turn_id = db_response.data[0]["id"] if db_response.data else None
-            print(f"[Transcript] Saved Q&A turn with ID: {qa_turn_id}")
+            turn_row = await db.insert_turn(qa_turn)
+            qa_turn_id = turn_row["id"] if turn_row else None
         except Exception as e:
-            print(f"[Transcript] Error saving to database: {e}")
+            self.log.error("Error saving Q&A turn", turn_index=self.turn_index, error=str(e))
             qa_turn_id = None
 
         # Add to conversation history
         self.conversation_history.append(qa_turn)
-        print(f"[Transcript] Conversation history now has {len(self.conversation_history)} turns")
 
         # Send to client
         await self.client_ws.send_json({
@@ -268,136 +410,188 @@ class SimpleInterviewSession:
             "text": transcript
         })
 
-        # Call quality agent to score the Q&A (don't block on errors)
-        print(f"[Transcript] Scoring Q&A turn...")
-        try:
-            await self.score_qa(qa_turn_id, transcript)
-        except Exception as e:
-            print(f"[Transcript] Quality scoring failed but continuing: {e}")
+        # Score the Q&A in the background; the next question doesn't wait for it
+        self.submit_quality_scoring(qa_turn_id, transcript)
 
         # Check if interview should end
         should_end = await self.should_end_interview()
-        print(f"[Transcript] Should end interview? {should_end}")
 
         if should_end:
-            print(f"[Transcript] Interview complete after {len(self.conversation_history)} turns")
+            self.log.info("Interview complete", turns=len(self.conversation_history))
             await self.end_interview()
         else:
             # Get and speak next question
-            print(f"[Transcript] ✅ Getting next question (turn {len(self.conversation_history) + 1})...")
             await self.get_and_speak_next_question()
 
-    async def score_qa(self, qa_turn_id: str, answer_text: str):
-        """Score the Q&A pair using quality agent"""
+    def submit_quality_scoring(self, qa_turn_id: str, answer_text: str):
+        """Queue quality scoring for the turn just recorded"""
+        from routers.quality import QualityRequest, ConversationTurn
+
+        # Snapshot the turn now; current_question moves on before the score lands
+        conversation_turns = []
+        for turn in self.conversation_history[:-1]:  # Exclude current turn
+            conversation_turns.append(ConversationTurn(
+                question=turn.get("question_text", ""),
+                answer=turn.get("answer_transcript", "")
+            ))
+
+        request = QualityRequest(
+            sessionId=self.session_id,
+            questionId=self.question_id,
+            questionText=self.current_question,
+            answerText=answer_text,
+            participantContext=None,
+            conversationHistory=conversation_turns,
+            qaTurnId=qa_turn_id
+        )
+
+        self.quality_tasks = [t for t in self.quality_tasks if not t.done()]
+        self.quality_tasks.append(get_task_pool("quality_scoring").submit(self.score_qa(request, self.turn_index)))
+
+    async def score_qa(self, request, turn_index: int):
+        """Score the Q&A pair using quality agent and attach the result to the turn"""
         try:
-            print(f"[Quality] Starting quality scoring for turn {qa_turn_id}")
-            from routers.quality import score_qa, QualityRequest, ConversationTurn
-
-            # Build conversation history
-            conversation_turns = []
-            for turn in self.conversation_history[:-1]:  # Exclude current turn
-                conversation_turns.append(ConversationTurn(
-                    question=turn.get("question_text", ""),
-                    answer=turn.get("answer_transcript", "")
-                ))
-
-            request = QualityRequest(
-                sessionId=self.session_id,
-                questionId=None,
-                questionText=self.current_question,
-                answerText=answer_text,
-                participantContext=None,
-                conversationHistory=conversation_turns
-            )
+            from routers.quality import score_qa
 
             quality_response = await score_qa(request)
-            print(f"[Quality] Quality score completed")
+
+            # Scores can land out of order; routing should use the most recent turn's
+            if turn_index >= self.last_quality_turn:
+                self.last_quality = quality_response.dict()
+                self.last_quality_turn = turn_index
+
+            await self.client_ws.send_json({
+                "type": "quality",
+                "turnIndex": turn_index,
+                "qaTurnId": quality_response.qaTurnId,
+                "overallScore": quality_response.overall_score,
+                "flags": quality_response.flags
+            })
 
         except Exception as e:
-            print(f"[Quality] Error scoring Q&A: {e}")
-            import traceback
-            traceback.print_exc()
+            self.log.error("Error scoring Q&A", exc_info=True, turn_index=turn_index, error=str(e))
+
+    async def drain_quality_scoring(self, timeout: float = 30.0):
+        """Let in-flight scoring for this session finish before it shuts down"""
+        await get_task_pool("quality_scoring").drain(self.quality_tasks, timeout=timeout)
 
     async def should_end_interview(self) -> bool:
         """Check if interview should end"""
-        study_response = supabase.table("studies").select("interview_config").eq("id", self.study_id).single().execute()
-        study_data = study_response.data if study_response.data else {}
-
-        max_questions = study_data.get("interview_config", {}).get("max_questions", 10)
-
-        return len(self.conversation_history) >= max_questions
+        return len(self.conversation_history) >= self.context.max_questions
 
     async def end_interview(self):
         """End the interview session"""
+        self.speculation.reset()
+
         # Update session status
-        supabase.table("interview_sessions").update({
-            "status": "completed",
-            "completed_at": "now()"
-        }).eq("id", self.session_id).execute()
+        await db.complete_session(self.session_id)
+
+        # Summarize the session in the background so reports don't have to. Queued before
+        # the client is told, since it closes the socket as soon as it hears the interview ended
+        await get_summary_queue().enqueue(self.session_id)
 
         # Send completion message to client
         await self.client_ws.send_json({
             "type": "interview_complete"
         })
 
+        await self.drain_quality_scoring()
+
 
 @router.websocket("/simple-interview/{session_id}")
 async def simple_interview_websocket(websocket: WebSocket, session_id: str):
-    """WebSocket endpoint for simplified interview (Whisper + TTS)"""
+    """
+    WebSocket endpoint for simplified interview (Whisper + TTS)
+
+    Query params:
+        audio_mode: "complete" (default) sends one audio_complete message per question;
+            "stream" sends question_start, per-sentence audio_chunk messages, question and audio_end
+        framing: "json" (default) sends audio base64 encoded in JSON messages; "binary" sends
+            and accepts audio as binary frames (see services/audio_frames.py). The server
+            confirms the framing with a "framing" message right after connecting.
+
+    Client messages:
+        audio: the complete answer recording (PCM16, 24kHz mono)
+        audio_partial: chunks of the answer while it is being recorded. They are accumulated
+            server-side, and the next question is speculatively prepared from them and used if
+            the final answer matches
+        audio_commit: end of the answer; transcribes the accumulated audio_partial chunks, so
+            the recording does not have to be uploaded again
+        endpointing: "server" (default, see VAD_ENDPOINTING) also ends the answer when voice
+            activity detection on the audio_partial stream finds the participant is done,
+            sending speech_started / speech_stopped; "client" leaves it to the client
+        end: end the interview
+
+    Every answer has a turn: the server sends {"type": "listening", "turn": n} when it starts
+    collecting one and tags speech_started / speech_stopped with it. JSON audio messages
+    should echo it as "turn"; messages for another turn are dropped, so audio still in flight
+    when the server ended an answer is not taken for the next one.
+    """
 
     await websocket.accept()
+    channel = AudioChannel(websocket, websocket.query_params.get("framing"))
+    await channel.announce()
 
+    log = InterviewLog("simple", session_id)
     interview = None
 
     try:
         # Get session details
-        session_response = supabase.table("interview_sessions").select("""
-            *,
-            study:studies(*),
-            participant:participants(*)
-        """).eq("id", session_id).single().execute()
+        session_data = await db.get_session_details(session_id)
 
-        if not session_response.data:
+        if not session_data:
             await websocket.send_json({"type": "error", "message": "Session not found"})
             await websocket.close()
             return
 
-        session_data = session_response.data
-
         # Get research question from the session
         question_id = session_data.get("research_question_id")
 
         # Fallback: if session doesn't have research_question_id, try to find it via participant's assignment
         if not question_id:
-            assignment_response = supabase.table("research_question_assignments").select("research_question_id").eq("participant_id", session_data["participant_id"]).limit(1).execute()
+            question_id = await db.find_assigned_research_question(session_data["participant_id"])
 
-            if assignment_response.data and len(assignment_response.data) > 0:
-                question_id = assignment_response.data[0]["research_question_id"]
-                supabase.table("interview_sessions").update({"research_question_id": question_id}).eq("id", session_id).execute()
+            if question_id:
+                await db.set_session_research_question(session_id, question_id)
             else:
                 # Allow proceeding without a specific research question ID (will fallback to study questions)
-                print(f"No research question assignment found for participant {session_data['participant_id']}, proceeding with general study questions.")
+                log.info("No research question assignment found, proceeding with general study questions")
                 question_id = None
 
         # Create interview session
+        # Load everything the interview needs per turn once, up front
+        context = await load_interview_context(session_data, question_id)
+
         interview = SimpleInterviewSession(
-            session_id=session_id,
-            study_id=session_data["study_id"],
-            participant_id=session_data["participant_id"],
-            question_id=question_id
+            context=context,
+            audio_mode=websocket.query_params.get("audio_mode", "complete"),
+            endpointing=websocket.query_params.get("endpointing", DEFAULT_ENDPOINTING).lower()
         )
 
         # Start the interview
-        await interview.start(websocket)
+        await interview.start(websocket, channel)
 
         # Handle incoming messages from client
         while True:
-            message = await websocket.receive_json()
+            message = await channel.receive()
             msg_type = message.get("type")
+            log.event(f"client.{msg_type}")
+
+            if msg_type in ("audio", "audio_partial", "audio_commit") and not interview.accepts(message):
+                log.event("client.stale_audio")
+                continue
 
             if msg_type == "audio":
                 # Receive complete audio data
-                await interview.handle_audio_data(message.get("data"))
+                await interview.handle_audio_data(message["audio"])
+
+            elif msg_type == "audio_partial":
+                # Partial answer audio for speculative question generation
+                await interview.handle_audio_partial(message["audio"])
+
+            elif msg_type == "audio_commit":
+                # End-of-answer marker: transcribe what was uploaded during the answer
+                await interview.handle_audio_commit()
 
             elif msg_type == "end":
                 # Client requested to end interview
@@ -405,16 +599,16 @@ async def simple_interview_websocket(websocket: WebSocket, session_id: str):
                 break
 
     except WebSocketDisconnect:
-        print(f"Client disconnected from session {session_id}")
+        log.info("Client disconnected")
     except Exception as e:
-        print(f"Error in simple interview: {e}")
-        import traceback
-        traceback.print_exc()
+        log.error("Error in simple interview", exc_info=True, error=str(e))
         try:
             await websocket.send_json({"type": "error", "message": str(e)})
         except:
             pass
     finally:
+        if interview:
+            interview.speculation.reset()
         try:
             await websocket.close()
         except:
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import Dict, Any, Optional, AsyncIterator
+from services.report_jobs import ReportJob, get_report_job, reap_stale_job
+from services import database as db
+import asyncio
+import json
+
+router = APIRouter()
+
+# Seconds between job row reads when streaming a job running on another worker
+ROW_POLL_INTERVAL = 2.0
+
+class ReportJobResponse(BaseModel):
+    jobId: str
+    reportType: str
+    status: str
+    progress: Dict[str, Any] = {}
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    pollUrl: Optional[str] = None
+    eventsUrl: Optional[str] = None
+
+def report_job_response(job: ReportJob) -> ReportJobResponse:
+    return ReportJobResponse(
+        **job.to_dict(),
+        pollUrl=f"/api/agents/jobs/{job.id}",
+        eventsUrl=f"/api/agents/jobs/{job.id}/events"
+    )
+
+def row_job_response(row: Dict[str, Any]) -> ReportJobResponse:
+    return ReportJobResponse(
+        jobId=row["id"],
+        reportType=row.get("report_type") or "overview",
+        status=row["status"],
+        progress=row.get("progress") or {},
+        result=row.get("report_data") if row["status"] == "completed" else None,
+        error=row.get("error")
+    )
+
+def format_event(entry: Dict[str, Any]) -> str:
+    return f"id: {entry['id']}\nevent: {entry['event']}\ndata: {json.dumps(entry['data'], default=str)}\n\n"
+
+async def poll_row_events(job_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Events for a job this worker is not running, read from the job row: progress changes
+    while it is generating, then the final result or error.
+    """
+    seq = 0
+    last_progress = None
+    while True:
+        row = await db.get_study_report(job_id)
+        if not row:
+            return
+        row = await reap_stale_job(row)
+        seq += 1
+        if row["status"] == "completed":
+            yield {"id": seq, "event": "completed", "data": row.get("report_data") or {}}
+            return
+        if row["status"] == "failed":
+            yield {"id": seq, "event": "failed", "data": {"error": row.get("error")}}
+            return
+        if row.get("progress") != last_progress:
+            last_progress = row.get("progress")
+            yield {"id": seq, "event": "progress", "data": last_progress or {}}
+        await asyncio.sleep(ROW_POLL_INTERVAL)
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_job(job_id: str):
+    """
+    Status, progress and (once completed) result of a report job.
+    """
+    job = get_report_job(job_id)
+    if job is not None:
+        return report_job_response(job)
+
+    try:
+        row = await db.get_study_report(job_id)
+        if row:
+            row = await reap_stale_job(row)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Job lookup failed: {str(e)}")
+    if not row:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return row_job_response(row)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """
+    Server-sent events for a report job: `progress` updates, `partial` results (e.g. each
+    interview summary as it is generated), then a final `completed` or `failed` event.
+    """
+    job = get_report_job(job_id)
+    if job is not None:
+        events = job.subscribe()
+    else:
+        if not await db.get_study_report(job_id):
+            raise HTTPException(status_code=404, detail="Job not found")
+        events = poll_row_events(job_id)
+
+    async def stream():
+        async for entry in events:
+            yield format_event(entry)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,11 +1,10 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import os
-from openai import OpenAI
+from services.llm_gateway import get_llm_gateway
 import httpx
 
 router = APIRouter()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+llm = get_llm_gateway()
 
 class TranscribeRequest(BaseModel):
     audioUrl: str
@@ -30,22 +29,8 @@ async def transcribe_audio(request: TranscribeRequest):
 
             audio_data = response.content
 
-        # Save temporarily
-        temp_file = f"/tmp/audio_{os.urandom(8).hex()}.webm"
-        with open(temp_file, "wb") as f:
-            f.write(audio_data)
-
         # Transcribe with Whisper
-        try:
-            with open(temp_file, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    response_format="text"
-                )
-        finally:
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+        transcript = await llm.transcribe(file=("audio.webm", audio_data))
 
         return TranscribeResponse(
             text=transcript,
@@ -63,19 +48,9 @@ async def transcribe_file(file: UploadFile = File(...)):
     """
     Transcription: Transcribe an uploaded audio file directly using OpenAI Whisper API.
     """
-    temp_file = f"/tmp/upload_{os.urandom(8).hex()}_{file.filename}"
     try:
-        # Save uploaded file temporarily
-        with open(temp_file, "wb") as f:
-            f.write(await file.read())
-
-        # Transcribe
-        with open(temp_file, "rb") as audio_file:
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="text"
-            )
+        # Transcribe the upload straight from memory
+        transcript = await llm.transcribe(file=(file.filename, await file.read()))
 
         return TranscribeResponse(
             text=transcript,
@@ -85,6 +60,3 @@ async def transcribe_file(file: UploadFile = File(...)):
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
-    finally:
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
@@ -0,0 +1,101 @@
+"""
+Benchmark server CPU per interview session for JSON/base64 vs binary audio framing.
+
+Drives the real AudioChannel over a Starlette WebSocket with an in-memory ASGI transport,
+so the measured work is what the interview routers do per audio message (JSON parse,
+base64 decode/encode, frame packing, JSON serialization) without network I/O.
+
+Each simulated second of a session carries:
+    simple:   10 x 100ms PCM16 answer chunks in (audio_partial), 1 x 6KB Opus chunk out
+    realtime: 10 x 100ms PCM16 chunks in (forwarded as base64), 20 x 50ms PCM16 deltas out
+              (arriving base64 from the Realtime API)
+
+Usage (from apps/agents):
+    python scripts/benchmark_audio_framing.py --seconds 300
+"""
+
+import sys
+import json
+import time
+import base64
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from starlette.websockets import WebSocket
+from services.audio_frames import AudioChannel, AudioFormat, AudioFrame, FrameKind, encode_frame
+
+SAMPLE_RATE = 24000
+PCM_100MS = bytes(range(256)) * (SAMPLE_RATE * 2 // 10 // 256) + bytes(SAMPLE_RATE * 2 // 10 % 256)
+PCM_50MS = PCM_100MS[:len(PCM_100MS) // 2]
+OPUS_CHUNK = bytes(range(256)) * 24
+
+
+def client_message(framing: str, kind: FrameKind, audio: bytes) -> dict:
+    """ASGI receive event for one client audio message, pre-encoded as a client would"""
+    if framing == "binary":
+        return {"type": "websocket.receive", "bytes": encode_frame(AudioFrame(kind, audio))}
+    text = json.dumps({"type": kind.name.lower(), "data": base64.b64encode(audio).decode("utf-8")})
+    return {"type": "websocket.receive", "text": text}
+
+
+async def connect(framing: str, inbound: list):
+    """Accepted WebSocket whose client sends `inbound`; returns (channel, bytes sent counter)"""
+    events = [{"type": "websocket.connect"}] + inbound
+    sent = {"bytes": 0}
+
+    async def receive():
+        return events.pop(0)
+
+    async def send(message):
+        payload = message.get("bytes") or message.get("text") or b""
+        sent["bytes"] += len(payload)
+
+    websocket = WebSocket({"type": "websocket", "path": "/", "headers": []}, receive, send)
+    await websocket.accept()
+    return AudioChannel(websocket, framing), sent
+
+
+async def run_session(framing: str, scenario: str, seconds: int):
+    inbound_chunk = client_message(framing, FrameKind.AUDIO_PARTIAL, PCM_100MS)
+    channel, sent = await connect(framing, [inbound_chunk] * (10 * seconds))
+    delta = base64.b64encode(PCM_50MS).decode("utf-8")
+
+    started = time.process_time()
+    for _ in range(seconds):
+        for _ in range(10):
+            if scenario == "realtime":
+                message = await channel.receive(base64_audio=True)
+                json.dumps({"type": "input_audio_buffer.append", "audio": message["audio"]})
+            else:
+                await channel.receive()
+        if scenario == "realtime":
+            for seq in range(20):
+                await channel.send_audio_base64(FrameKind.AUDIO_DELTA, delta, seq=seq, responseId="resp_1")
+        else:
+            await channel.send_audio(FrameKind.AUDIO_CHUNK, OPUS_CHUNK, AudioFormat.OPUS, text="Sentence.")
+    cpu = time.process_time() - started
+
+    inbound_bytes = len(inbound_chunk.get("bytes") or inbound_chunk.get("text")) * 10
+    return cpu / seconds, inbound_bytes, sent["bytes"] / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--seconds", type=int, default=300, help="Simulated seconds of audio per run")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<10}{'framing':<9}{'CPU/session-s':>15}{'CPU %/session':>15}{'sessions/core':>15}{'in B/s':>10}{'out B/s':>10}")
+    for scenario in ("simple", "realtime"):
+        for framing in ("json", "binary"):
+            cpu, inbound, outbound = asyncio.run(run_session(framing, scenario, args.seconds))
+            print(
+                f"{scenario:<10}{framing:<9}{cpu * 1e6:>13.0f}us{cpu * 100:>14.3f}%"
+                f"{1 / cpu:>15.0f}{inbound:>10.0f}{outbound:>10.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Aggregate Analyzer Service
+
+Aggregate statistics and pros/cons across every completed session of a research question.
+Whole session transcripts are packed into token-budgeted chunks and analyzed concurrently;
+each chunk reports how many of its sessions support each statistic, and the chunk results
+are merged into final percentages computed from those counts, so every session is weighted
+equally no matter how many chunks the research question needs.
+"""
+
+import os
+import json
+import logging
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+from services.llm_gateway import get_llm_gateway
+from services.rate_limiter import Priority
+from services.map_reduce import run_map, MapProgress
+from services.tokens import pack_by_tokens
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_MODEL = "gpt-4o-mini"
+DEFAULT_CHUNK_TOKEN_BUDGET = 12000
+DEFAULT_CHUNK_CONCURRENCY = 4
+MAX_STATISTICS = 6
+
+CHUNK_SYSTEM_PROMPT = """You are a research analyst. You will receive a batch of interview transcripts
+for one research question. Count, for each finding, how many of the interviews in the batch support it.
+
+Return JSON only:
+{"statistics": [{"description": "<finding>", "count": <interviews supporting it>}], "pros": [...], "cons": [...]}
+
+Report 5-10 statistics. Counts are whole numbers between 0 and the number of interviews in the batch.
+Pros and cons should be concise bullet phrases."""
+
+MERGE_SYSTEM_PROMPT = """You are a research analyst merging findings from several batches of interviews
+for one research question. Each statistic has an id and the number of interviews in its batch that support it.
+
+Group statistics that describe the same finding and pick the 3-6 most important groups.
+Merge the pros and cons into concise, de-duplicated lists.
+
+Return JSON only:
+{"statistics": [{"description": "<finding>", "sources": [<ids of the statistics in this group>]}], "pros": [...], "cons": [...]}"""
+
+
+def _percentage(count: float, total: int) -> str:
+    return f"{round(100 * count / total) if total else 0}%"
+
+
+async def _analyze_chunk(research_question: str, transcripts: List[str]) -> Dict[str, Any]:
+    interviews = "\n\n".join(f"Interview {i + 1}:\n{t}" for i, t in enumerate(transcripts))
+    response = await get_llm_gateway().chat_completion(
+        model=AGGREGATE_MODEL,
+        messages=[
+            {"role": "system", "content": CHUNK_SYSTEM_PROMPT},
+            {"role": "user", "content": (
+                f'Research question: "{research_question}"\n'
+                f"Interviews in this batch: {len(transcripts)}\n\n{interviews}"
+            )}
+        ],
+        temperature=0.3,
+        max_tokens=800,
+        response_format={"type": "json_object"},
+        cache=True,
+        priority=Priority.BATCH,
+        endpoint="analysis"
+    )
+    output = json.loads(response.choices[0].message.content)
+
+    statistics = []
+    for stat in output.get("statistics", []):
+        try:
+            count = int(stat.get("count", 0))
+        except (TypeError, ValueError):
+            continue
+        statistics.append({
+            "description": str(stat.get("description", "")),
+            "count": max(0, min(count, len(transcripts)))
+        })
+
+    return {
+        "sessions": len(transcripts),
+        "statistics": statistics,
+        "pros": output.get("pros", []),
+        "cons": output.get("cons", []),
+    }
+
+
+async def _merge_chunks(research_question: str, chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+    total = sum(chunk["sessions"] for chunk in chunks)
+    counts: Dict[str, int] = {}
+    lines = []
+    for i, chunk in enumerate(chunks):
+        for j, stat in enumerate(chunk["statistics"]):
+            stat_id = f"c{i}s{j}"
+            counts[stat_id] = stat["count"]
+            lines.append(f"{stat_id}: {stat['description']} ({stat['count']}/{chunk['sessions']} interviews)")
+
+    pros = [p for chunk in chunks for p in chunk["pros"]]
+    cons = [c for chunk in chunks for c in chunk["cons"]]
+
+    response = await get_llm_gateway().chat_completion(
+        model=AGGREGATE_MODEL,
+        messages=[
+            {"role": "system", "content": MERGE_SYSTEM_PROMPT},
+            {"role": "user", "content": (
+                f'Research question: "{research_question}"\n\n'
+                "Statistics:\n" + "\n".join(lines) + "\n\n"
+                "Pros:\n" + "\n".join(f"- {p}" for p in pros) + "\n\n"
+                "Cons:\n" + "\n".join(f"- {c}" for c in cons)
+            )}
+        ],
+        temperature=0.3,
+        max_tokens=800,
+        response_format={"type": "json_object"},
+        cache=True,
+        priority=Priority.BATCH,
+        endpoint="analysis"
+    )
+    output = json.loads(response.choices[0].message.content)
+
+    # Percentages come from the reported counts, not from the model: a group's count is
+    # the sum over its source statistics, taking at most one statistic per chunk
+    statistics = []
+    for group in output.get("statistics", [])[:MAX_STATISTICS]:
+        per_chunk: Dict[str, int] = {}
+        for stat_id in group.get("sources", []):
+            stat_id = str(stat_id)
+            if stat_id in counts:
+                chunk_id = stat_id.split("s", 1)[0]
+                per_chunk[chunk_id] = max(per_chunk.get(chunk_id, 0), counts[stat_id])
+        if per_chunk:
+            statistics.append({
+                "percentage": _percentage(sum(per_chunk.values()), total),
+                "description": group.get("description", "")
+            })
+
+    return {
+        "statistics": statistics,
+        "pros": output.get("pros", pros),
+        "cons": output.get("cons", cons),
+    }
+
+
+async def analyze_transcripts(
+    research_question: str,
+    transcripts: Dict[str, str],
+    previous_chunks: Optional[List[Dict[str, Any]]] = None,
+    budget: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    on_progress: Optional[Callable[[MapProgress], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """
+    Aggregate statistics and pros/cons across session transcripts
+
+    Args:
+        research_question: Research question text
+        transcripts: Q/A transcript per session id
+        previous_chunks: Chunk results of an earlier analysis to merge with, so only
+            new sessions need to be analyzed
+        budget: Token budget per chunk of transcripts (AGGREGATE_CHUNK_TOKEN_BUDGET)
+        max_concurrency: Chunks analyzed at once (AGGREGATE_CHUNK_CONCURRENCY)
+        on_progress: Called as each chunk completes
+
+    Returns:
+        Dictionary with statistics ([{percentage, description}]), pros, cons,
+        session_ids (sessions in chunks analyzed successfully), sessions_analyzed
+        (including previous chunks) and chunks (every chunk result, for later merges)
+    """
+    budget = budget or int(os.getenv("AGGREGATE_CHUNK_TOKEN_BUDGET", DEFAULT_CHUNK_TOKEN_BUDGET))
+    session_ids = list(transcripts)
+    chunks = pack_by_tokens([transcripts[sid] for sid in session_ids], budget, model=AGGREGATE_MODEL)
+    logger.info("Aggregate analysis: %d transcripts in %d chunks", len(session_ids), len(chunks))
+
+    # Batches keep input order, so each chunk's session ids are the next len(chunk) ids
+    chunk_items: Dict[str, Any] = {}
+    offset = 0
+    for i, chunk in enumerate(chunks):
+        chunk_items[f"chunk-{i}"] = (session_ids[offset:offset + len(chunk)], chunk)
+        offset += len(chunk)
+
+    async def analyze(key: str, item) -> Dict[str, Any]:
+        return await _analyze_chunk(research_question, item[1])
+
+    results = await run_map(
+        chunk_items,
+        analyze,
+        max_concurrency=max_concurrency or int(
+            os.getenv("AGGREGATE_CHUNK_CONCURRENCY", DEFAULT_CHUNK_CONCURRENCY)
+        ),
+        on_progress=on_progress
+    )
+    if chunks and not results:
+        raise RuntimeError("Every aggregate analysis chunk failed")
+
+    keys = sorted(results, key=lambda k: int(k.split("-")[1]))
+    analyzed = list(previous_chunks or []) + [results[key] for key in keys]
+    sessions = sum(chunk["sessions"] for chunk in analyzed)
+
+    if not analyzed:
+        merged = {"statistics": [], "pros": [], "cons": []}
+    elif len(analyzed) == 1:
+        only = analyzed[0]
+        merged = {
+            "statistics": [
+                {"percentage": _percentage(stat["count"], sessions), "description": stat["description"]}
+                for stat in sorted(only["statistics"], key=lambda s: -s["count"])[:MAX_STATISTICS]
+            ],
+            "pros": only["pros"],
+            "cons": only["cons"],
+        }
+    else:
+        merged = await _merge_chunks(research_question, analyzed)
+
+    return {
+        **merged,
+        "session_ids": [sid for key in keys for sid in chunk_items[key][0]],
+        "sessions_analyzed": sessions,
+        "chunks": analyzed,
+    }
@@ -0,0 +1,80 @@
+"""
+Answer Audio Buffer Service
+
+Accumulates a participant's answer from the audio chunks uploaded while they speak, so
+transcription can start the moment the end-of-answer marker arrives instead of after a
+whole-recording upload. The buffer is preallocated for a typical answer, grows by doubling
+for long ones and keeps its allocation across turns, so appending a chunk is a single copy
+into place.
+"""
+
+import os
+import logging
+from services.audio_frames import PCM_BYTES_PER_SECOND
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_SECONDS = 60
+# Whisper accepts files up to 25MB; 480s of 24kHz PCM16 is ~23MB as WAV
+DEFAULT_MAX_SECONDS = 480
+
+
+class AnswerAudioBuffer:
+    """Preallocated PCM16 buffer for one participant answer at a time"""
+
+    def __init__(self, initial_seconds: float = None, max_seconds: float = None):
+        """
+        Initialize the buffer
+
+        Args:
+            initial_seconds: Audio preallocated up front (ANSWER_BUFFER_SECONDS)
+            max_seconds: Longest answer kept; later chunks are dropped (MAX_ANSWER_SECONDS)
+        """
+        initial_seconds = initial_seconds or float(os.getenv("ANSWER_BUFFER_SECONDS", DEFAULT_BUFFER_SECONDS))
+        max_seconds = max_seconds or float(os.getenv("MAX_ANSWER_SECONDS", DEFAULT_MAX_SECONDS))
+        self.max_bytes = int(max_seconds * PCM_BYTES_PER_SECOND)
+        self._data = bytearray(min(int(initial_seconds * PCM_BYTES_PER_SECOND), self.max_bytes))
+        self._size = 0
+        self.truncated = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def seconds(self) -> float:
+        return self._size / PCM_BYTES_PER_SECOND
+
+    def append(self, chunk: bytes) -> bool:
+        """
+        Copy a chunk of raw PCM16 audio into place
+
+        Returns:
+            False if the chunk was dropped because the answer reached max_seconds
+        """
+        end = self._size + len(chunk)
+        if end > self.max_bytes:
+            if not self.truncated:
+                logger.warning("Answer audio exceeded %.0fs; dropping the rest", self.max_bytes / PCM_BYTES_PER_SECOND)
+            self.truncated = True
+            return False
+
+        if end > len(self._data):
+            capacity = max(len(self._data), 1)
+            while capacity < end:
+                capacity *= 2
+            grown = bytearray(min(capacity, self.max_bytes))
+            grown[:self._size] = memoryview(self._data)[:self._size]
+            self._data = grown
+
+        self._data[self._size:end] = chunk
+        self._size = end
+        return True
+
+    def view(self) -> memoryview:
+        """Zero-copy view of the answer so far; release it before the next append"""
+        return memoryview(self._data)[:self._size]
+
+    def clear(self):
+        """Start the next answer, keeping the allocation"""
+        self._size = 0
+        self.truncated = False
@@ -0,0 +1,184 @@
+"""
+Audio Framing Service
+
+Moves interview audio over WebSockets either as base64 inside JSON messages (default)
+or as binary frames: an 8-byte header followed by the raw PCM/Opus payload. Binary
+framing removes the base64 inflation and the per-chunk encode, decode and JSON parse;
+JSON text messages remain the channel for control messages in both modes.
+
+The client asks for binary framing with ?framing=binary; the server confirms the
+negotiated framing with a {"type": "framing"} message before anything else is sent.
+
+Frame header (network byte order):
+    version  uint8   FRAME_VERSION
+    kind     uint8   FrameKind
+    format   uint8   AudioFormat
+    flags    uint8   reserved, 0
+    seq      uint32  chunk sequence number within an utterance (0 for whole recordings)
+"""
+
+import json
+import base64
+import struct
+from enum import IntEnum
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+from fastapi import WebSocket, WebSocketDisconnect
+
+FRAME_VERSION = 1
+FRAME_HEADER = struct.Struct("!BBBBI")
+
+FRAMINGS = ("json", "binary")
+
+# PCM16 audio is 24kHz mono in both directions -> 48000 bytes per second
+SAMPLE_RATE = 24000
+PCM_BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+
+class FrameKind(IntEnum):
+    """Audio message carried by a frame; names match the JSON message types"""
+    AUDIO = 1           # Client: complete answer recording
+    AUDIO_PARTIAL = 2   # Client: chunk of an answer still being recorded
+    AUDIO_COMPLETE = 3  # Server: whole utterance
+    AUDIO_CHUNK = 4     # Server: sentence-level chunk of a streamed question (simple interview)
+    AUDIO_DELTA = 5     # Server: Realtime API audio delta (realtime interview)
+
+
+class AudioFormat(IntEnum):
+    PCM16 = 1  # 24kHz mono
+    OPUS = 2
+
+
+MESSAGE_TYPES = {kind: kind.name.lower() for kind in FrameKind}
+KINDS_BY_TYPE = {name: kind for kind, name in MESSAGE_TYPES.items()}
+
+
+class FrameError(ValueError):
+    """Malformed binary frame"""
+
+
+@dataclass
+class AudioFrame:
+    kind: FrameKind
+    audio: bytes
+    format: AudioFormat = AudioFormat.PCM16
+    seq: int = 0
+
+
+def encode_frame(frame: AudioFrame) -> bytes:
+    return FRAME_HEADER.pack(FRAME_VERSION, frame.kind, frame.format, 0, frame.seq) + frame.audio
+
+
+def decode_frame(data: bytes) -> AudioFrame:
+    if len(data) < FRAME_HEADER.size:
+        raise FrameError(f"Frame shorter than its {FRAME_HEADER.size}-byte header")
+    version, kind, fmt, _flags, seq = FRAME_HEADER.unpack_from(data)
+    if version != FRAME_VERSION:
+        raise FrameError(f"Unsupported frame version {version}")
+    try:
+        return AudioFrame(FrameKind(kind), data[FRAME_HEADER.size:], AudioFormat(fmt), seq)
+    except ValueError as e:
+        raise FrameError(str(e))
+
+
+class AudioChannel:
+    """WebSocket wrapper that sends and receives audio in the negotiated framing"""
+
+    def __init__(self, websocket: WebSocket, framing: Optional[str] = None):
+        """
+        Initialize the channel
+
+        Args:
+            websocket: Accepted client WebSocket
+            framing: Requested framing ("json" or "binary"); anything else falls back to JSON
+        """
+        self.websocket = websocket
+        self.framing = framing if framing in FRAMINGS else "json"
+
+    @property
+    def binary(self) -> bool:
+        return self.framing == "binary"
+
+    async def announce(self):
+        """Tell the client which framing was negotiated"""
+        await self.websocket.send_json({
+            "type": "framing",
+            "framing": self.framing,
+            "version": FRAME_VERSION
+        })
+
+    async def send_audio(
+        self,
+        kind: FrameKind,
+        audio: bytes,
+        format: AudioFormat = AudioFormat.PCM16,
+        seq: int = 0,
+        **fields: Any
+    ):
+        """
+        Send audio to the client
+
+        Binary framing sends one frame; JSON framing sends the message type of `kind` with
+        the audio base64 encoded in "data", the format name and `fields`. Fields only
+        needed by JSON clients (e.g. sentence text) are not carried by binary frames.
+        """
+        if self.binary:
+            await self.websocket.send_bytes(encode_frame(AudioFrame(kind, audio, format, seq)))
+        else:
+            await self._send_json_audio(kind, base64.b64encode(audio).decode("utf-8"), format, seq, fields)
+
+    async def send_audio_base64(
+        self,
+        kind: FrameKind,
+        data: str,
+        format: AudioFormat = AudioFormat.PCM16,
+        seq: int = 0,
+        **fields: Any
+    ):
+        """Like send_audio for audio that is already base64 (Realtime API deltas); JSON framing forwards it as is"""
+        if self.binary:
+            await self.websocket.send_bytes(encode_frame(AudioFrame(kind, base64.b64decode(data), format, seq)))
+        else:
+            await self._send_json_audio(kind, data, format, seq, fields)
+
+    async def _send_json_audio(
+        self, kind: FrameKind, data: str, format: AudioFormat, seq: int, fields: Dict[str, Any]
+    ):
+        await self.websocket.send_json({
+            "type": MESSAGE_TYPES[kind],
+            **fields,
+            "seq": seq,
+            "data": data,
+            "format": format.name.lower()
+        })
+
+    async def receive(self, base64_audio: bool = False) -> Dict[str, Any]:
+        """
+        Receive the next client message
+
+        Audio arrives as {"type": "audio" | "audio_partial", "audio": ...} whichever framing
+        carried it; control messages are returned as sent.
+
+        Args:
+            base64_audio: Return audio base64 encoded instead of as bytes, for audio that is
+                forwarded to the Realtime API (JSON audio is then passed through undecoded)
+
+        Raises:
+            WebSocketDisconnect: The client disconnected
+            FrameError: A binary frame could not be decoded
+        """
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", 1000))
+
+        data = message.get("bytes")
+        if data is not None:
+            frame = decode_frame(data)
+            audio = base64.b64encode(frame.audio).decode("utf-8") if base64_audio else frame.audio
+            return {"type": MESSAGE_TYPES[frame.kind], "audio": audio, "seq": frame.seq}
+
+        parsed = json.loads(message.get("text") or "{}")
+        if parsed.get("type") in KINDS_BY_TYPE:
+            data = parsed.get("data") or ""
+            parsed["audio"] = data if base64_audio else base64.b64decode(data)
+        return parsed
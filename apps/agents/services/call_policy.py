@@ -0,0 +1,251 @@
+"""
+Call Policy Service
+
+Per-endpoint timeout, retry and hedging policy for LLM and speech calls. Each logical
+endpoint (question generation, TTS, transcription, analysis, ...) gets a deadline budget,
+a per-attempt timeout, jittered exponential backoff on transient errors, and optionally
+a hedged duplicate request once an attempt runs past the endpoint's observed p95 latency.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, replace, asdict
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CallPolicy:
+    """Timeout, retry and hedging settings for one endpoint"""
+    timeout: float = 60.0           # Seconds allowed for a single attempt
+    deadline: float = 120.0         # Seconds allowed for all attempts together
+    max_retries: int = 3            # Retries after the first attempt
+    backoff_base: float = 0.5       # First backoff in seconds, doubled per retry
+    backoff_max: float = 8.0        # Upper bound for a single backoff
+    hedge: bool = False             # Fire a duplicate request when an attempt is slow
+    hedge_percentile: float = 0.95  # Latency percentile that triggers the hedge
+    hedge_min_samples: int = 20     # Observations needed before hedging starts
+    hedge_min_delay: float = 0.25   # Never hedge sooner than this many seconds
+
+
+DEFAULT_POLICIES: Dict[str, CallPolicy] = {
+    "chat": CallPolicy(),
+    "question": CallPolicy(timeout=15.0, deadline=30.0, max_retries=2, hedge=True),
+    "tts": CallPolicy(timeout=15.0, deadline=30.0, max_retries=2, hedge=True),
+    "transcription": CallPolicy(timeout=30.0, deadline=60.0, max_retries=2),
+    "analysis": CallPolicy(timeout=90.0, deadline=300.0, max_retries=4, backoff_max=30.0),
+}
+
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient and worth another attempt"""
+    if isinstance(error, RETRYABLE_ERRORS):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Read the server's Retry-After hint from an API error, if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies"""
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(p * len(ordered)))
+        return ordered[index]
+
+
+class PolicyRunner:
+    """Executes calls under their endpoint's policy and counts what fired"""
+
+    def __init__(self, policies: Optional[Dict[str, CallPolicy]] = None):
+        """
+        Initialize the runner
+
+        Args:
+            policies: Policies per endpoint. Defaults to DEFAULT_POLICIES with
+                overrides from the LLM_CALL_POLICIES env var (JSON, e.g.
+                {"question": {"timeout": 10, "hedge": false}})
+        """
+        self.policies = dict(policies or DEFAULT_POLICIES)
+        if policies is None:
+            self._apply_env_overrides()
+
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _apply_env_overrides(self):
+        raw = os.getenv("LLM_CALL_POLICIES")
+        if not raw:
+            return
+        try:
+            overrides = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning("Ignoring invalid LLM_CALL_POLICIES: %s", e)
+            return
+
+        for endpoint, values in overrides.items():
+            base = self.policies.get(endpoint, self.policies["chat"])
+            self.policies[endpoint] = replace(base, **values)
+
+    def policy(self, endpoint: str) -> CallPolicy:
+        return self.policies.get(endpoint, self.policies["chat"])
+
+    def _count(self, endpoint: str, counter: str):
+        if endpoint not in self._counters:
+            self._counters[endpoint] = {
+                "calls": 0,
+                "attempts": 0,
+                "retries": 0,
+                "timeouts": 0,
+                "hedges_fired": 0,
+                "hedges_won": 0,
+                "deadline_exceeded": 0,
+                "failures": 0,
+            }
+        self._counters[endpoint][counter] += 1
+
+    def _tracker(self, endpoint: str) -> LatencyTracker:
+        if endpoint not in self._latency:
+            self._latency[endpoint] = LatencyTracker()
+        return self._latency[endpoint]
+
+    async def run(self, endpoint: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run a call with timeouts, retries and optional hedging
+
+        Args:
+            endpoint: Policy name, e.g. "question" or "tts"
+            call: Zero-argument factory returning a fresh awaitable per attempt
+
+        Returns:
+            The first successful result
+
+        Raises:
+            The last error once retries or the deadline are exhausted
+        """
+        policy = self.policy(endpoint)
+        deadline_at = time.monotonic() + policy.deadline
+        self._count(endpoint, "calls")
+
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                self._count(endpoint, "deadline_exceeded")
+                raise asyncio.TimeoutError(f"{endpoint} call exceeded its {policy.deadline}s deadline")
+
+            try:
+                return await self._attempt(endpoint, policy, call, min(policy.timeout, remaining))
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self._count(endpoint, "timeouts")
+
+                if not is_retryable(e) or attempt >= policy.max_retries:
+                    self._count(endpoint, "failures")
+                    raise
+
+                backoff = min(policy.backoff_max, policy.backoff_base * (2 ** attempt))
+                # Full jitter spreads out retries from many sessions hitting the same 429
+                delay = _retry_after(e) or random.uniform(0, backoff)
+                if time.monotonic() + delay >= deadline_at:
+                    self._count(endpoint, "deadline_exceeded")
+                    self._count(endpoint, "failures")
+                    raise
+
+                attempt += 1
+                self._count(endpoint, "retries")
+                logger.info("Retrying %s call (attempt %d) in %.2fs after: %s", endpoint, attempt + 1, delay, e)
+                await asyncio.sleep(delay)
+
+    async def _attempt(self, endpoint: str, policy: CallPolicy, call, timeout: float) -> Any:
+        """Single attempt, possibly raced against a hedged duplicate"""
+        self._count(endpoint, "attempts")
+        tracker = self._tracker(endpoint)
+        started = time.monotonic()
+
+        hedge_delay = None
+        if policy.hedge and len(tracker.samples) >= policy.hedge_min_samples:
+            hedge_delay = max(policy.hedge_min_delay, tracker.percentile(policy.hedge_percentile))
+
+        if hedge_delay is None or hedge_delay >= timeout:
+            result = await asyncio.wait_for(call(), timeout=timeout)
+            tracker.record(time.monotonic() - started)
+            return result
+
+        primary = asyncio.ensure_future(call())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                self._count(endpoint, "hedges_fired")
+                tasks.add(asyncio.ensure_future(call()))
+
+            end_at = started + timeout
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks,
+                    timeout=max(0.0, end_at - time.monotonic()),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise asyncio.TimeoutError(f"{endpoint} attempt timed out after {timeout:.1f}s")
+
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._count(endpoint, "hedges_won")
+                        tracker.record(time.monotonic() - started)
+                        return task.result()
+
+                    if not tasks:
+                        raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {}
+        for endpoint, counters in self._counters.items():
+            p95 = self._tracker(endpoint).percentile(0.95)
+            stats[endpoint] = {
+                **counters,
+                "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "policy": asdict(self.policy(endpoint)),
+            }
+        return stats
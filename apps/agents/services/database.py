@@ -0,0 +1,519 @@
+"""
+Database Service
+
+Single data-access layer for the agents service. One async Supabase (PostgREST) client
+with a pooled HTTP connection is shared by the whole process, so queries never block the
+event loop, and every query goes through typed repository functions that record
+per-query latency and errors alongside connection pool usage.
+"""
+
+import os
+import time
+import asyncio
+import httpx
+from typing import Dict, Any, Optional, List, Callable, AsyncIterator
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+from postgrest.exceptions import APIError
+
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_TIMEOUT = 30.0
+
+# Ids per `in.(...)` filter; keeps request URLs and response sizes bounded
+IN_FILTER_BATCH_SIZE = 50
+
+# Rows per keyset page; stays under PostgREST's default max-rows of 1000
+KEYSET_PAGE_SIZE = 1000
+
+# Attempts at claiming a study's next report version when concurrent inserts collide
+REPORT_VERSION_ATTEMPTS = 5
+UNIQUE_VIOLATION = "23505"
+
+Row = Dict[str, Any]
+
+
+class Database:
+    """Shared async Supabase client with a bounded connection pool and query metrics"""
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        key: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Initialize the database
+
+        Args:
+            url: Supabase URL. Defaults to SUPABASE_URL / NEXT_PUBLIC_SUPABASE_URL
+            key: Service key. Defaults to SUPABASE_SERVICE_KEY / SUPABASE_SERVICE_ROLE_KEY
+            max_connections: Size of the HTTP connection pool (SUPABASE_MAX_CONNECTIONS)
+            timeout: Per-request timeout in seconds (SUPABASE_TIMEOUT)
+        """
+        self.url = url or os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL")
+        self.key = key or (
+            os.getenv("SUPABASE_SERVICE_KEY")
+            or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+            or os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+        )
+        if not self.url:
+            raise ValueError("Supabase URL is missing. Set SUPABASE_URL or NEXT_PUBLIC_SUPABASE_URL.")
+        if not self.key:
+            raise ValueError("Supabase key is missing. Set SUPABASE_SERVICE_KEY or SUPABASE_SERVICE_ROLE_KEY.")
+
+        self.max_connections = max_connections or int(
+            os.getenv("SUPABASE_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)
+        )
+        self.timeout = timeout or float(os.getenv("SUPABASE_TIMEOUT", DEFAULT_TIMEOUT))
+
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[AsyncClient] = None
+        self._lock = asyncio.Lock()
+        self._in_flight = 0
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    async def client(self) -> AsyncClient:
+        """Get the shared client, creating it on first use"""
+        if self._client is None:
+            async with self._lock:
+                if self._client is None:
+                    self._http_client = httpx.AsyncClient(
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections
+                        ),
+                        timeout=self.timeout,
+                        follow_redirects=True,
+                        http2=True
+                    )
+                    self._client = await acreate_client(
+                        self.url,
+                        self.key,
+                        options=AsyncClientOptions(httpx_client=self._http_client)
+                    )
+        return self._client
+
+    async def execute(self, name: str, build: Callable[[AsyncClient], Any]):
+        """
+        Run one query and record its latency
+
+        Args:
+            name: Metric name, e.g. "qa_turns.list"
+            build: Builds the query from the client; `.execute()` is called here
+
+        Returns:
+            The PostgREST APIResponse
+        """
+        client = await self.client()
+        stats = self._stats.setdefault(name, {"calls": 0, "errors": 0, "total_ms": 0.0})
+
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            return await build(client).execute()
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            stats["calls"] += 1
+            stats["total_ms"] += (time.perf_counter() - started) * 1000
+
+    def _pool_stats(self) -> Dict[str, Any]:
+        pool = {"max_connections": self.max_connections, "in_flight_queries": self._in_flight}
+        # httpx does not expose pool state publicly; read it from the httpcore pool when available
+        connections = getattr(getattr(getattr(self._http_client, "_transport", None), "_pool", None), "connections", None)
+        if connections is not None:
+            pool["open_connections"] = len(connections)
+            pool["idle_connections"] = sum(1 for c in connections if c.is_idle())
+        return pool
+
+    def get_stats(self) -> Dict[str, Any]:
+        queries = {}
+        for name, stats in self._stats.items():
+            calls = stats["calls"] or 1
+            queries[name] = {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "avg_latency_ms": round(stats["total_ms"] / calls, 1),
+            }
+        return {"pool": self._pool_stats(), "queries": queries}
+
+    async def close(self):
+        """Close the shared connection pool"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._client = None
+
+
+# Singleton instance
+_database: Optional[Database] = None
+
+
+def get_database() -> Database:
+    """Get or create database singleton"""
+    global _database
+    if _database is None:
+        _database = Database()
+    return _database
+
+
+def _first(response) -> Optional[Row]:
+    return response.data[0] if response.data else None
+
+
+async def _select_in_batches(name: str, ids: List[str], build: Callable[[AsyncClient, List[str]], Any]) -> List[Row]:
+    """Run an `in.(...)` query per batch of ids concurrently and concatenate the rows in order"""
+    batches = [ids[i:i + IN_FILTER_BATCH_SIZE] for i in range(0, len(ids), IN_FILTER_BATCH_SIZE)]
+    responses = await asyncio.gather(*(
+        get_database().execute(name, lambda c, batch=batch: build(c, batch)) for batch in batches
+    ))
+    return [row for response in responses for row in response.data or []]
+
+
+def _keyset_filter(keys: List[str], after: List[Any]) -> str:
+    """PostgREST `or` filter for rows strictly after `after` in (keys...) order"""
+    clauses = []
+    for i, key in enumerate(keys):
+        equal = [f"{k}.eq.{v}" for k, v in zip(keys[:i], after[:i])]
+        condition = equal + [f"{key}.gt.{after[i]}"]
+        clauses.append(condition[0] if len(condition) == 1 else f"and({','.join(condition)})")
+    return ",".join(clauses)
+
+
+async def _select_keyset_pages(
+    name: str,
+    build: Callable[[AsyncClient], Any],
+    keys: List[str],
+    page_size: int = KEYSET_PAGE_SIZE
+) -> AsyncIterator[List[Row]]:
+    """
+    Page through a query in (keys...) order, one request per page
+
+    Keyset pagination: each page filters on the last row's keys instead of an offset, so
+    every page is an index range scan no matter how deep into the result it is.
+    """
+    after: Optional[List[Any]] = None
+    while True:
+        def query(c, after=after):
+            q = build(c)
+            for key in keys:
+                q = q.order(key)
+            if after is not None:
+                q = q.or_(_keyset_filter(keys, after))
+            return q.limit(page_size)
+
+        rows = (await get_database().execute(name, query)).data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        after = [rows[-1][key] for key in keys]
+
+
+# Studies
+
+async def get_study(study_id: str) -> Optional[Row]:
+    response = await get_database().execute(
+        "studies.get",
+        lambda c: c.table("studies").select("*").eq("id", study_id).limit(1)
+    )
+    return _first(response)
+
+
+async def get_interview_config(study_id: str) -> Optional[Row]:
+    response = await get_database().execute(
+        "studies.interview_config",
+        lambda c: c.table("studies").select("interview_config").eq("id", study_id).limit(1)
+    )
+    row = _first(response)
+    return row.get("interview_config") if row else None
+
+
+# Research questions
+
+async def get_research_question(research_question_id: str) -> Optional[Row]:
+    response = await get_database().execute(
+        "research_questions.get",
+        lambda c: c.table("research_questions").select("*").eq("id", research_question_id).limit(1)
+    )
+    return _first(response)
+
+
+async def list_study_questions(study_id: str) -> List[Row]:
+    response = await get_database().execute(
+        "questions.list",
+        lambda c: c.table("questions").select("*").eq("study_id", study_id).order("order_index")
+    )
+    return response.data or []
+
+
+async def find_assigned_research_question(participant_id: str) -> Optional[str]:
+    """Research question a participant is assigned to, if any"""
+    response = await get_database().execute(
+        "research_question_assignments.find",
+        lambda c: c.table("research_question_assignments")
+            .select("research_question_id")
+            .eq("participant_id", participant_id)
+            .limit(1)
+    )
+    row = _first(response)
+    return row["research_question_id"] if row else None
+
+
+# Participants
+
+async def get_participant(participant_id: str) -> Optional[Row]:
+    response = await get_database().execute(
+        "participants.get",
+        lambda c: c.table("participants").select("*").eq("id", participant_id).limit(1)
+    )
+    return _first(response)
+
+
+async def list_active_participants(organization_id: str, columns: str = "*") -> List[Row]:
+    response = await get_database().execute(
+        "participants.list_active",
+        lambda c: c.table("participants")
+            .select(columns)
+            .eq("organization_id", organization_id)
+            .eq("status", "active")
+    )
+    return response.data or []
+
+
+async def list_active_avatars() -> List[Row]:
+    response = await get_database().execute(
+        "avatars.list_active",
+        lambda c: c.table("avatars").select("*").eq("is_active", True)
+    )
+    return response.data or []
+
+
+async def insert_study_participant_assignment(data: Row) -> Optional[Row]:
+    response = await get_database().execute(
+        "study_participant_assignments.insert",
+        lambda c: c.table("study_participant_assignments").insert(data)
+    )
+    return _first(response)
+
+
+# Interview sessions
+
+async def get_session_details(session_id: str) -> Optional[Row]:
+    """Session row with its study and participant embedded"""
+    response = await get_database().execute(
+        "interview_sessions.get_details",
+        lambda c: c.table("interview_sessions")
+            .select("*, study:studies(*), participant:participants(*)")
+            .eq("id", session_id)
+            .limit(1)
+    )
+    return _first(response)
+
+
+async def set_session_research_question(session_id: str, research_question_id: str):
+    await get_database().execute(
+        "interview_sessions.set_research_question",
+        lambda c: c.table("interview_sessions")
+            .update({"research_question_id": research_question_id})
+            .eq("id", session_id)
+    )
+
+
+async def complete_session(session_id: str):
+    await get_database().execute(
+        "interview_sessions.complete",
+        lambda c: c.table("interview_sessions")
+            .update({"status": "completed", "completed_at": "now()"})
+            .eq("id", session_id)
+    )
+
+
+async def list_study_session_ids(study_id: str, status: Optional[str] = None) -> List[str]:
+    def build(c):
+        q = c.table("interview_sessions").select("id").eq("study_id", study_id)
+        return q.eq("status", status) if status else q
+
+    response = await get_database().execute("interview_sessions.list_by_study", build)
+    return [row["id"] for row in response.data or []]
+
+
+async def list_research_question_sessions(research_question_id: str, status: Optional[str] = None) -> List[Row]:
+    """Sessions (session_id, status, completed_at) of a research question, resolved server-side"""
+    def build(c):
+        q = c.table("research_question_sessions") \
+            .select("session_id, status, completed_at") \
+            .eq("research_question_id", research_question_id)
+        return q.eq("status", status) if status else q
+
+    rows: List[Row] = []
+    async for page in _select_keyset_pages("research_question_sessions.list", build, ["session_id"]):
+        rows.extend(page)
+    return rows
+
+
+# Q&A turns
+
+async def insert_turn(data: Row) -> Optional[Row]:
+    response = await get_database().execute(
+        "qa_turns.insert",
+        lambda c: c.table("qa_turns").insert(data)
+    )
+    return _first(response)
+
+
+async def insert_quality_label(data: Row) -> Optional[Row]:
+    response = await get_database().execute(
+        "qa_quality_labels.insert",
+        lambda c: c.table("qa_quality_labels").insert(data)
+    )
+    return _first(response)
+
+
+# Transcripts
+
+# Sessions per session_transcripts page
+TRANSCRIPT_PAGE_SIZE = 200
+
+
+async def iter_session_transcript_pages(
+    params: Dict[str, Any],
+    page_size: int = TRANSCRIPT_PAGE_SIZE
+) -> AsyncIterator[List[Row]]:
+    """
+    Pages of assembled transcripts from the session_transcripts function
+
+    Args:
+        params: Function filters, e.g. {"p_study_id": ..., "p_unsummarized_only": True}
+        page_size: Sessions per call; pages are keyed on session_id inside the function
+
+    Yields:
+        Rows of (session_id, completed_at, answered_turns, transcript), ordered by session
+    """
+    after: Optional[str] = None
+    while True:
+        page_params = {**params, "p_after_session_id": after, "p_limit": page_size}
+        response = await get_database().execute(
+            "session_transcripts.page",
+            lambda c: c.rpc("session_transcripts", page_params)
+        )
+        rows = response.data or []
+        if rows:
+            yield rows
+        if len(rows) < page_size:
+            return
+        after = rows[-1]["session_id"]
+
+
+# Summaries
+
+async def list_interview_summaries(session_ids: List[str]) -> List[Row]:
+    return await _select_in_batches(
+        "interview_summaries.list",
+        session_ids,
+        lambda c, batch: c.table("interview_summaries").select("*").in_("session_id", batch)
+    )
+
+
+async def upsert_interview_summary(data: Row) -> Optional[Row]:
+    """Insert or replace the summary for a session (one summary per session)"""
+    response = await get_database().execute(
+        "interview_summaries.upsert",
+        lambda c: c.table("interview_summaries").upsert(data, on_conflict="session_id")
+    )
+    return _first(response)
+
+
+async def get_latest_aggregate_summary(research_question_id: str) -> Optional[Row]:
+    response = await get_database().execute(
+        "research_question_aggregate_summaries.latest",
+        lambda c: c.table("research_question_aggregate_summaries")
+            .select("*")
+            .eq("research_question_id", research_question_id)
+            .order("generated_at", desc=True)
+            .limit(1)
+    )
+    return _first(response)
+
+
+async def insert_aggregate_summary(data: Row) -> Optional[Row]:
+    response = await get_database().execute(
+        "research_question_aggregate_summaries.insert",
+        lambda c: c.table("research_question_aggregate_summaries").insert(data)
+    )
+    return _first(response)
+
+
+# Study reports
+
+async def get_latest_overview_report(study_id: str) -> Optional[Row]:
+    """Latest completed overview report that carries incremental aggregates"""
+    response = await get_database().execute(
+        "study_reports.latest_overview",
+        lambda c: c.table("study_reports")
+            .select("*")
+            .eq("study_id", study_id)
+            .eq("status", "completed")
+            .not_.is_("report_data->sessions", "null")
+            .order("version", desc=True)
+            .limit(1)
+    )
+    return _first(response)
+
+
+async def get_latest_report_version(study_id: str) -> int:
+    response = await get_database().execute(
+        "study_reports.latest_version",
+        lambda c: c.table("study_reports")
+            .select("version")
+            .eq("study_id", study_id)
+            .order("version", desc=True)
+            .limit(1)
+    )
+    row = _first(response)
+    return row["version"] if row else 0
+
+
+async def insert_study_report(data: Row) -> Optional[Row]:
+    response = await get_database().execute(
+        "study_reports.insert",
+        lambda c: c.table("study_reports").insert(data)
+    )
+    return _first(response)
+
+
+async def insert_next_study_report(data: Row) -> Optional[Row]:
+    """
+    Insert a report as its study's next version. The (study_id, version) unique index
+    arbitrates concurrent generations: an insert that loses the race re-reads the latest
+    version and retries. Reports without a study (aggregate summaries) are version 1.
+    """
+    study_id = data.get("study_id")
+    if not study_id:
+        return await insert_study_report({**data, "version": 1})
+
+    for attempt in range(REPORT_VERSION_ATTEMPTS):
+        version = await get_latest_report_version(study_id) + 1
+        try:
+            return await insert_study_report({**data, "version": version})
+        except APIError as e:
+            if e.code != UNIQUE_VIOLATION or attempt == REPORT_VERSION_ATTEMPTS - 1:
+                raise
+
+
+async def get_study_report(report_id: str) -> Optional[Row]:
+    response = await get_database().execute(
+        "study_reports.get",
+        lambda c: c.table("study_reports").select("*").eq("id", report_id).limit(1)
+    )
+    return _first(response)
+
+
+async def update_study_report(report_id: str, data: Row):
+    await get_database().execute(
+        "study_reports.update",
+        lambda c: c.table("study_reports").update(data).eq("id", report_id)
+    )
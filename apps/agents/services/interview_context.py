@@ -0,0 +1,69 @@
+"""
+Interview Context Service
+
+Session-scoped data for a live interview. The participant, research question, study
+questions and interview config do not change during an interview, so they are loaded once
+when the WebSocket connects and passed to the question agent and the end-of-interview
+check instead of being re-read from Supabase on every turn.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List
+from services import database as db
+
+DEFAULT_MAX_QUESTIONS = 10
+
+
+@dataclass
+class InterviewContext:
+    """Static data for one interview session"""
+    session_id: str
+    study_id: str
+    participant_id: str
+    question_id: Optional[str] = None
+    participant: Dict[str, Any] = field(default_factory=dict)
+    research_question: Dict[str, Any] = field(default_factory=dict)
+    simple_questions: List[Dict[str, Any]] = field(default_factory=list)
+    interview_config: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def max_questions(self) -> int:
+        return self.interview_config.get("max_questions", DEFAULT_MAX_QUESTIONS)
+
+    @property
+    def first_question(self) -> str:
+        """Root research question, else the first study question, else a generic opener"""
+        if self.research_question.get("root_question"):
+            return self.research_question["root_question"]
+        if self.simple_questions:
+            return self.simple_questions[0]["text"]
+        return "Tell me about your experience."
+
+
+async def load_interview_context(session_data: Dict[str, Any], question_id: Optional[str]) -> InterviewContext:
+    """
+    Build the context for a session
+
+    Args:
+        session_data: interview_sessions row with `study` and `participant` embedded
+        question_id: Research question for the session, if any
+
+    Returns:
+        InterviewContext with everything the interview needs per turn
+    """
+    study = session_data.get("study") or {}
+    context = InterviewContext(
+        session_id=session_data["id"],
+        study_id=session_data["study_id"],
+        participant_id=session_data["participant_id"],
+        question_id=question_id,
+        participant=session_data.get("participant") or {},
+        interview_config=study.get("interview_config") or {},
+    )
+
+    if question_id:
+        context.research_question = await db.get_research_question(question_id) or {}
+    else:
+        context.simple_questions = await db.list_study_questions(context.study_id)
+
+    return context
@@ -0,0 +1,150 @@
+"""
+Interview Logging Service
+
+Structured, leveled and sampled logging for the interview WebSocket routers. Records go
+through a bounded queue to a background thread that formats them as JSON lines and writes
+them to stderr, so the event loop never formats payloads or blocks on stdout; if the queue
+is full, records are dropped and counted instead.
+
+Every Realtime API / client event is counted per interview mode (exposed in /metrics)
+rather than dumped. Event payloads are logged only at DEBUG level and only for a sampled
+fraction of sessions (INTERVIEW_LOG_SAMPLE_RATE), so a session is either traced in full
+or not at all.
+"""
+
+import os
+import sys
+import json
+import queue
+import zlib
+import logging
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Any, Optional
+
+LOGGER_NAME = "interview"
+QUEUE_SIZE = 10000
+
+DEFAULT_LEVEL = "INFO"
+DEFAULT_SAMPLE_RATE = 0.1
+
+_event_counts: Dict[str, Counter] = {}
+_stats = {"dropped": 0}
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message and the record's fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Hands records to the listener thread unformatted; drops them when the queue is full"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens in the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _stats["dropped"] += 1
+
+
+def start_interview_logging():
+    """Attach the queue handler and start the writer thread (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    records: queue.Queue = queue.Queue(QUEUE_SIZE)
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(os.getenv("INTERVIEW_LOG_LEVEL", DEFAULT_LEVEL).upper())
+    logger.addHandler(DroppingQueueHandler(records))
+    logger.propagate = False
+
+    _listener = QueueListener(records, stream)
+    _listener.start()
+
+
+def stop_interview_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, DroppingQueueHandler):
+            logger.removeHandler(handler)
+    logger.propagate = True
+    _listener = None
+
+
+def get_interview_log_stats() -> Dict[str, Any]:
+    """Event counts per interview mode and dropped log records"""
+    return {
+        "events": {mode: dict(counts) for mode, counts in _event_counts.items()},
+        "dropped_records": _stats["dropped"],
+    }
+
+
+def _sample_rate() -> float:
+    return float(os.getenv("INTERVIEW_LOG_SAMPLE_RATE", DEFAULT_SAMPLE_RATE))
+
+
+class InterviewLog:
+    """Logger for one interview session; every record carries the session id"""
+
+    def __init__(self, mode: str, session_id: str):
+        """
+        Initialize the session logger
+
+        Args:
+            mode: Interview mode ("realtime" or "simple"); names the logger and the event counters
+            session_id: Interview session id
+        """
+        self.logger = logging.getLogger(f"{LOGGER_NAME}.{mode}")
+        self.session_id = session_id
+        self.events = _event_counts.setdefault(mode, Counter())
+        # Deterministic per session, so a sampled session is traced across workers and turns
+        self.sampled = zlib.crc32(session_id.encode()) % 10000 < _sample_rate() * 10000
+
+    def event(self, event_type: str, payload: Optional[Dict[str, Any]] = None):
+        """Count an event; a payload is logged only for sampled sessions at DEBUG level"""
+        self.events[event_type] += 1
+        if payload is not None and self.sampled and self.logger.isEnabledFor(logging.DEBUG):
+            self._log(logging.DEBUG, event_type, {"event": event_type, "payload": payload})
+
+    def debug(self, message: str, **fields: Any):
+        """Trace detail; like event payloads, only logged for sampled sessions"""
+        if self.sampled and self.logger.isEnabledFor(logging.DEBUG):
+            self._log(logging.DEBUG, message, fields)
+
+    def info(self, message: str, **fields: Any):
+        if self.logger.isEnabledFor(logging.INFO):
+            self._log(logging.INFO, message, fields)
+
+    def warning(self, message: str, **fields: Any):
+        self._log(logging.WARNING, message, fields)
+
+    def error(self, message: str, exc_info: bool = False, **fields: Any):
+        self._log(logging.ERROR, message, fields, exc_info)
+
+    def _log(self, level: int, message: str, fields: Dict[str, Any], exc_info: bool = False):
+        self.logger.log(level, message, exc_info=exc_info, extra={"fields": {"session_id": self.session_id, **fields}})
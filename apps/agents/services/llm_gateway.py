@@ -0,0 +1,403 @@
+"""
+LLM Gateway Service
+
+This module provides the single async entry point every agent uses to talk to OpenAI.
+It keeps one pooled HTTP connection for the whole process and caps the number of
+in-flight requests per model, so slow completions never block the event loop.
+"""
+
+import os
+import time
+import asyncio
+import contextlib
+import httpx
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from openai.types.chat import ChatCompletion
+from openai.types import CompletionUsage
+from services.response_cache import ResponseCache, create_response_cache, make_cache_key
+from services.rate_limiter import Priority, PriorityRateLimiter, create_rate_limiter, estimate_tokens
+from services.call_policy import PolicyRunner
+
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MODEL_CONCURRENCY = 16
+
+
+def _parse_model_limits(raw: Optional[str]) -> Dict[str, int]:
+    """
+    Parse per-model concurrency limits from an env string
+
+    Args:
+        raw: Comma separated "model=limit" pairs, e.g. "gpt-4=8,gpt-4o=16"
+
+    Returns:
+        Dictionary mapping model name to its concurrency limit
+    """
+    limits: Dict[str, int] = {}
+    if not raw:
+        return limits
+
+    for pair in raw.split(","):
+        if "=" not in pair:
+            continue
+        model, limit = pair.split("=", 1)
+        try:
+            limits[model.strip()] = max(1, int(limit))
+        except ValueError:
+            continue
+
+    return limits
+
+
+class LLMGateway:
+    """Shared async OpenAI client with pooled connections and per-model concurrency limits"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_connections: Optional[int] = None,
+        model_limits: Optional[Dict[str, int]] = None,
+        default_limit: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[PriorityRateLimiter] = None,
+        policies: Optional[PolicyRunner] = None
+    ):
+        """
+        Initialize the gateway
+
+        Args:
+            api_key: OpenAI API key. If not provided, will use OPENAI_API_KEY env var
+            max_connections: Size of the shared HTTP connection pool (OPENAI_MAX_CONNECTIONS)
+            model_limits: Max in-flight requests per model (LLM_MODEL_CONCURRENCY)
+            default_limit: Limit for models not listed in model_limits (LLM_DEFAULT_CONCURRENCY)
+            cache: Response cache for deterministic calls. Built from LLM_CACHE_* env vars if omitted
+            rate_limiter: RPM/TPM limiter. Built from OPENAI_RPM/OPENAI_TPM env vars if omitted
+            policies: Timeout/retry/hedge policies per endpoint. Built from LLM_CALL_POLICIES if omitted
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+
+        max_connections = max_connections or int(
+            os.getenv("OPENAI_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)
+        )
+        self.http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        # Retries are owned by the call policies, not the SDK
+        self.client = AsyncOpenAI(api_key=self.api_key, http_client=self.http_client, max_retries=0)
+
+        self.model_limits = (
+            model_limits
+            if model_limits is not None
+            else _parse_model_limits(os.getenv("LLM_MODEL_CONCURRENCY"))
+        )
+        self.default_limit = default_limit or int(
+            os.getenv("LLM_DEFAULT_CONCURRENCY", DEFAULT_MODEL_CONCURRENCY)
+        )
+
+        self.cache = cache if cache is not None else create_response_cache()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else create_rate_limiter()
+        self.policies = policies or PolicyRunner()
+
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        """Get or create the concurrency limiter for a model"""
+        if model not in self._semaphores:
+            limit = self.model_limits.get(model, self.default_limit)
+            self._semaphores[model] = asyncio.Semaphore(limit)
+        return self._semaphores[model]
+
+    @contextlib.asynccontextmanager
+    async def _model_slot(self, model: str):
+        """Hold one of the model's concurrency slots"""
+        stats = self._model_stats(model)
+        semaphore = self._semaphore(model)
+
+        stats["waiting"] += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            stats["waiting"] -= 1
+
+        stats["in_flight"] += 1
+        try:
+            yield
+        finally:
+            semaphore.release()
+            stats["in_flight"] -= 1
+
+    def _model_stats(self, model: str) -> Dict[str, float]:
+        if model not in self._stats:
+            self._stats[model] = {
+                "requests": 0,
+                "errors": 0,
+                "in_flight": 0,
+                "waiting": 0,
+                "total_latency_ms": 0.0,
+            }
+        return self._stats[model]
+
+    async def _call(
+        self,
+        fn,
+        endpoint: str = "chat",
+        priority: Priority = Priority.INTERACTIVE,
+        estimated_tokens: int = 0,
+        hold_slot: bool = True,
+        **kwargs
+    ):
+        """
+        Run an OpenAI call under its endpoint policy, the rate limiter and the model's concurrency limit
+
+        Args:
+            fn: Async OpenAI SDK method to call
+            endpoint: Call policy name (timeouts, retries, hedging)
+            priority: Priority class used by the rate limiter
+            estimated_tokens: Tokens to reserve from the TPM budget
+            hold_slot: Take a model concurrency slot for the call; False when the caller
+                already holds one for longer than the call (streams)
+            **kwargs: Arguments for the SDK method; "model" picks the limiter
+
+        Returns:
+            Whatever the SDK method returns
+        """
+        model = kwargs["model"]
+        stats = self._model_stats(model)
+
+        async def attempt():
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(estimated_tokens, priority)
+
+            async with self._model_slot(model) if hold_slot else contextlib.nullcontext():
+                started = time.perf_counter()
+                try:
+                    return await fn(**kwargs)
+                except BaseException:
+                    stats["errors"] += 1
+                    raise
+                finally:
+                    stats["requests"] += 1
+                    stats["total_latency_ms"] += (time.perf_counter() - started) * 1000
+
+        return await self.policies.run(endpoint, attempt)
+
+    async def chat_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        cache: bool = False,
+        cache_ttl: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        endpoint: str = "chat",
+        **kwargs
+    ) -> ChatCompletion:
+        """
+        Create a chat completion
+
+        Args:
+            model: Chat model to use
+            messages: Chat messages
+            cache: Serve byte-identical requests from the response cache
+            cache_ttl: Override the cache's default TTL in seconds
+            priority: Rate limiter priority class
+            endpoint: Call policy name, e.g. "question" or "analysis"
+            **kwargs: Extra arguments passed through to chat.completions.create
+
+        Returns:
+            The ChatCompletion response
+        """
+        cache_key = None
+        if cache and self.cache is not None:
+            cache_key = make_cache_key(
+                model,
+                messages,
+                kwargs.get("temperature"),
+                kwargs.get("response_format")
+            )
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return ChatCompletion.model_validate_json(cached)
+
+        estimated = estimate_tokens(messages, kwargs.get("max_tokens"))
+        response = await self._call(
+            self.client.chat.completions.create,
+            endpoint=endpoint,
+            priority=priority,
+            estimated_tokens=estimated,
+            model=model,
+            messages=messages,
+            **kwargs
+        )
+
+        if self.rate_limiter is not None and response.usage is not None:
+            await self.rate_limiter.record_usage(estimated, response.usage.total_tokens)
+
+        if cache_key is not None:
+            await self.cache.set(cache_key, response.model_dump_json(), cache_ttl)
+
+        return response
+
+    async def stream_chat_completion(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        priority: Priority = Priority.INTERACTIVE,
+        endpoint: str = "chat",
+        **kwargs
+    ) -> AsyncIterator[Tuple[str, Optional[CompletionUsage]]]:
+        """
+        Stream a chat completion
+
+        The call policy covers opening the stream. The stream holds one of the model's
+        concurrency slots until it is closed, and the rate limiter is corrected with the
+        reported usage when it closes, or keeps the estimate if the stream ended early.
+        While tokens are consumed, each chunk must arrive within the policy's per-attempt
+        timeout and the whole stream must finish within its deadline; otherwise the stream
+        is closed and asyncio.TimeoutError is raised.
+
+        Args:
+            model: Chat model to use
+            messages: Chat messages
+            priority: Rate limiter priority class
+            endpoint: Call policy name
+            **kwargs: Extra arguments passed through to chat.completions.create
+
+        Yields:
+            Tuples of (text delta, usage); usage is only set on the final chunk
+        """
+        estimated = estimate_tokens(messages, kwargs.get("max_tokens"))
+        policy = self.policies.policy(endpoint)
+        deadline = asyncio.get_running_loop().time() + policy.deadline
+        async with self._model_slot(model):
+            stream = await self._call(
+                self.client.chat.completions.create,
+                endpoint=endpoint,
+                priority=priority,
+                estimated_tokens=estimated,
+                hold_slot=False,
+                model=model,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True},
+                **kwargs
+            )
+
+            usage = None
+            chunks = stream.__aiter__()
+            try:
+                while True:
+                    # A stalled stream must not hang the caller: bound the wait for every chunk
+                    chunk_deadline = min(deadline, asyncio.get_running_loop().time() + policy.timeout)
+                    try:
+                        async with asyncio.timeout_at(chunk_deadline):
+                            chunk = await chunks.__anext__()
+                    except StopAsyncIteration:
+                        break
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if chunk.usage is not None:
+                        usage = chunk.usage
+                    yield delta or "", chunk.usage
+            finally:
+                await stream.close()
+                if self.rate_limiter is not None:
+                    # Without a final usage chunk (closed early, cancelled) the estimate stands
+                    await self.rate_limiter.record_usage(estimated, usage.total_tokens if usage else None)
+
+    async def transcribe(
+        self,
+        file,
+        model: str = "whisper-1",
+        priority: Priority = Priority.INTERACTIVE,
+        **kwargs
+    ) -> str:
+        """
+        Transcribe audio with Whisper
+
+        Args:
+            file: File-like object or (filename, bytes) tuple
+            model: Transcription model to use
+            priority: Rate limiter priority class
+
+        Returns:
+            The transcript text
+        """
+        kwargs.setdefault("response_format", "text")
+        transcription = await self._call(
+            self.client.audio.transcriptions.create,
+            endpoint="transcription",
+            priority=priority,
+            model=model,
+            file=file,
+            **kwargs
+        )
+        return transcription if isinstance(transcription, str) else transcription.text
+
+    async def speech(
+        self,
+        text: str,
+        model: str = "tts-1",
+        voice: str = "alloy",
+        response_format: str = "opus",
+        priority: Priority = Priority.INTERACTIVE
+    ) -> bytes:
+        """
+        Synthesize speech
+
+        Args:
+            text: Text to speak
+            model: TTS model to use
+            voice: Voice name
+            response_format: Audio container/codec
+            priority: Rate limiter priority class
+
+        Returns:
+            Encoded audio bytes
+        """
+        response = await self._call(
+            self.client.audio.speech.create,
+            endpoint="tts",
+            priority=priority,
+            model=model,
+            voice=voice,
+            input=text,
+            response_format=response_format
+        )
+        return response.content
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-model request counters and limits"""
+        models = {}
+        for model, stats in self._stats.items():
+            completed = stats["requests"] or 1
+            models[model] = {
+                **stats,
+                "limit": self.model_limits.get(model, self.default_limit),
+                "avg_latency_ms": round(stats["total_latency_ms"] / completed, 1),
+            }
+        return {
+            "models": models,
+            "cache": self.cache.get_stats() if self.cache is not None else None,
+            "rate_limiter": self.rate_limiter.get_stats() if self.rate_limiter is not None else None,
+            "policies": self.policies.get_stats(),
+        }
+
+    async def close(self):
+        """Close the pooled HTTP connection"""
+        await self.client.close()
+
+
+# Singleton instance
+_llm_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Get or create LLM gateway singleton"""
+    global _llm_gateway
+    if _llm_gateway is None:
+        _llm_gateway = LLMGateway()
+    return _llm_gateway
@@ -0,0 +1,76 @@
+"""
+Map-Reduce Service
+
+Concurrent map step for report generation. Each item is mapped under a concurrency cap,
+every result is handed to a persistence callback as soon as it completes (so a crashed
+run can resume from what was saved), and progress is reported after each item.
+"""
+
+import os
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAP_CONCURRENCY = 8
+
+
+@dataclass
+class MapProgress:
+    """Progress of a map step"""
+    total: int
+    completed: int = 0
+    failed: int = 0
+
+    @property
+    def done(self) -> int:
+        return self.completed + self.failed
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+async def run_map(
+    items: Dict[str, Any],
+    mapper: Callable[[str, Any], Awaitable[Any]],
+    max_concurrency: Optional[int] = None,
+    on_result: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+    on_progress: Optional[Callable[[MapProgress], Awaitable[None]]] = None
+) -> Dict[str, Any]:
+    """
+    Map every item concurrently
+
+    Args:
+        items: Inputs keyed by id (e.g. session id -> turns)
+        mapper: Produces the result for one item
+        max_concurrency: Max mappers in flight (MAP_REDUCE_CONCURRENCY, default 8)
+        on_result: Called with (key, result) as each item completes, e.g. to persist it
+        on_progress: Called after each item completes or fails
+
+    Returns:
+        Results keyed by id; failed items are logged and left out
+    """
+    max_concurrency = max_concurrency or int(os.getenv("MAP_REDUCE_CONCURRENCY", DEFAULT_MAP_CONCURRENCY))
+    limiter = asyncio.Semaphore(max_concurrency)
+    progress = MapProgress(total=len(items))
+    results: Dict[str, Any] = {}
+
+    async def map_one(key: str, item: Any):
+        async with limiter:
+            try:
+                result = await mapper(key, item)
+                if on_result is not None:
+                    await on_result(key, result)
+                results[key] = result
+                progress.completed += 1
+            except Exception as e:
+                progress.failed += 1
+                logger.warning("Map step failed for %s: %s", key, e)
+
+        if on_progress is not None:
+            await on_progress(progress)
+
+    await asyncio.gather(*(map_one(key, item) for key, item in items.items()))
+    return results
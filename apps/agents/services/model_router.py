@@ -0,0 +1,155 @@
+"""
+Model Router Service
+
+Picks the model tier for each question-agent turn. Routine follow-ups go to a fast model;
+the large model is used only when the quality agent flagged the previous turn as shallow
+or off-topic. Routing is configured per study via `studies.interview_config.model_routing`,
+and latency and cost are recorded per tier so the thresholds can be tuned.
+"""
+
+from typing import Dict, Any, Optional, Tuple, List
+
+
+DEFAULT_ROUTING: Dict[str, Any] = {
+    "enabled": True,
+    "fast_model": "gpt-4o-mini",
+    "large_model": "gpt-4",
+    # Quality agent flags that escalate the next question to the large model
+    "escalate_flags": ["too_short", "off_topic", "generic"],
+    # Escalate when any of these quality scores (0-100) falls below the threshold
+    "escalate_below": {"depth": 40, "relevance": 50},
+}
+
+# USD per 1M tokens (input, output)
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4": (30.0, 60.0),
+    "gpt-4-turbo": (10.0, 30.0),
+    "gpt-4o": (2.5, 10.0),
+    "gpt-4o-mini": (0.15, 0.6),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """
+    Estimate the USD cost of a completion
+
+    Returns:
+        Cost in USD, or None for models without known pricing
+    """
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        return None
+    input_price, output_price = pricing
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+class ModelRouter:
+    """Chooses fast or large tier per turn and keeps per-tier latency and cost"""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def resolve_config(self, interview_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge a study's routing overrides onto the defaults
+
+        Args:
+            interview_config: The study's `interview_config` JSON (may be None)
+
+        Returns:
+            Effective routing configuration
+        """
+        overrides = (interview_config or {}).get("model_routing") or {}
+        config = {**DEFAULT_ROUTING, **overrides}
+        config["escalate_below"] = {
+            **DEFAULT_ROUTING["escalate_below"],
+            **(overrides.get("escalate_below") or {}),
+        }
+        return config
+
+    def choose(
+        self,
+        config: Dict[str, Any],
+        last_quality: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, str, str]:
+        """
+        Pick the tier for the next question
+
+        Args:
+            config: Effective routing configuration from resolve_config
+            last_quality: Quality agent output for the previous turn (flags and *_score fields)
+
+        Returns:
+            Tuple of (tier, model, reason)
+        """
+        if not config.get("enabled", True):
+            return "large", config["large_model"], "routing disabled"
+
+        if not last_quality:
+            return "fast", config["fast_model"], "no quality signal"
+
+        flags: List[str] = last_quality.get("flags") or []
+        escalate_flags = [f for f in flags if f in config["escalate_flags"]]
+        if escalate_flags:
+            return "large", config["large_model"], f"flagged {', '.join(escalate_flags)}"
+
+        for dimension, threshold in config["escalate_below"].items():
+            score = last_quality.get(f"{dimension}_score")
+            if score is not None and float(score) < threshold:
+                return "large", config["large_model"], f"{dimension} score {score} < {threshold}"
+
+        return "fast", config["fast_model"], "routine follow-up"
+
+    def record(self, tier: str, model: str, latency_ms: float, usage=None):
+        """
+        Record one routed call
+
+        Args:
+            tier: "fast" or "large"
+            model: Model actually used
+            latency_ms: Wall-clock latency of the call
+            usage: CompletionUsage from the response, if available
+        """
+        if tier not in self._stats:
+            self._stats[tier] = {
+                "calls": 0,
+                "total_latency_ms": 0.0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "cost_usd": 0.0,
+            }
+
+        stats = self._stats[tier]
+        stats["calls"] += 1
+        stats["total_latency_ms"] += latency_ms
+
+        if usage is not None:
+            stats["prompt_tokens"] += usage.prompt_tokens
+            stats["completion_tokens"] += usage.completion_tokens
+            cost = estimate_cost(model, usage.prompt_tokens, usage.completion_tokens)
+            if cost is not None:
+                stats["cost_usd"] += cost
+
+    def get_stats(self) -> Dict[str, Any]:
+        tiers = {}
+        for tier, stats in self._stats.items():
+            calls = stats["calls"] or 1
+            tiers[tier] = {
+                **stats,
+                "cost_usd": round(stats["cost_usd"], 6),
+                "avg_latency_ms": round(stats["total_latency_ms"] / calls, 1),
+                "avg_cost_usd": round(stats["cost_usd"] / calls, 6),
+            }
+        return {"tiers": tiers}
+
+
+# Singleton instance
+_model_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Get or create model router singleton"""
+    global _model_router
+    if _model_router is None:
+        _model_router = ModelRouter()
+    return _model_router
@@ -0,0 +1,131 @@
+"""
+Overview State Service
+
+Intermediate aggregates of a study overview, persisted in `study_reports.report_data` so the
+next run only folds in sessions that are new or whose summary changed. Each session's
+contribution (summary fingerprint, sentiment, themes, counts) is kept so a changed or
+removed session can be subtracted from the running tallies exactly.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+from services.summarizer import summary_fingerprint
+
+# Quotes kept in the running sample and offered to the final report prompt
+QUOTE_POOL_LIMIT = 40
+QUOTES_PER_SESSION = 2
+
+SENTIMENTS = ["positive", "neutral", "negative", "mixed"]
+
+
+def _theme_key(theme: Any) -> str:
+    return str(theme).strip().lower()
+
+
+@dataclass
+class OverviewState:
+    """Running aggregates for one study's overview"""
+    sentiment_counts: Dict[str, int] = field(default_factory=lambda: {s: 0 for s in SENTIMENTS})
+    theme_counts: Dict[str, int] = field(default_factory=dict)
+    quotes: List[Dict[str, str]] = field(default_factory=list)
+    findings: List[str] = field(default_factory=list)
+    sessions: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_report_data(cls, report_data: Optional[Dict[str, Any]]) -> "OverviewState":
+        """Restore the state saved with a previous report (empty when there is none)"""
+        aggregates = (report_data or {}).get("aggregates") or {}
+        state = cls(
+            theme_counts=dict(aggregates.get("theme_counts") or {}),
+            quotes=list(aggregates.get("quotes") or []),
+            findings=list(aggregates.get("findings") or []),
+            sessions=dict((report_data or {}).get("sessions") or {}),
+        )
+        state.sentiment_counts.update(aggregates.get("sentiment_counts") or {})
+        return state
+
+    def to_report_data(self) -> Dict[str, Any]:
+        """State to store alongside the report in report_data"""
+        return {
+            "aggregates": {
+                "sentiment_counts": self.sentiment_counts,
+                "theme_counts": self.theme_counts,
+                "quotes": self.quotes,
+                "findings": self.findings,
+            },
+            "sessions": self.sessions,
+        }
+
+    def diff(self, summaries: Dict[str, Dict[str, Any]]) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Compare current summaries with the sessions already folded in
+
+        Args:
+            summaries: Current interview summaries keyed by session id
+
+        Returns:
+            (added, changed, removed) session ids
+        """
+        added = [sid for sid in summaries if sid not in self.sessions]
+        changed = [
+            sid for sid, summary in summaries.items()
+            if sid in self.sessions and self.sessions[sid]["fingerprint"] != summary_fingerprint(summary)
+        ]
+        removed = [sid for sid in self.sessions if sid not in summaries]
+        return added, changed, removed
+
+    def add(self, session_id: str, summary: Dict[str, Any]):
+        """Fold one session's summary into the tallies and quote sample"""
+        sentiment = summary.get("sentiment") or "neutral"
+        themes = sorted({_theme_key(t) for t in summary.get("themes") or [] if t})
+
+        if sentiment in self.sentiment_counts:
+            self.sentiment_counts[sentiment] += 1
+        for theme in themes:
+            self.theme_counts[theme] = self.theme_counts.get(theme, 0) + 1
+
+        for quote in (summary.get("notable_quotes") or [])[:QUOTES_PER_SESSION]:
+            if len(self.quotes) >= QUOTE_POOL_LIMIT:
+                break
+            self.quotes.append({"quote": str(quote), "session_id": session_id})
+
+        self.sessions[session_id] = {
+            "fingerprint": summary_fingerprint(summary),
+            "sentiment": sentiment,
+            "themes": themes,
+            "insights": len(summary.get("key_insights") or []),
+            "positive_feedback": len(summary.get("positive_feedback") or []),
+            "negative_feedback": len(summary.get("negative_feedback") or []),
+        }
+
+    def remove(self, session_id: str):
+        """Subtract a previously folded-in session from the tallies and quote sample"""
+        contribution = self.sessions.pop(session_id, None)
+        if contribution is None:
+            return
+
+        sentiment = contribution.get("sentiment")
+        if sentiment in self.sentiment_counts:
+            self.sentiment_counts[sentiment] = max(0, self.sentiment_counts[sentiment] - 1)
+        for theme in contribution.get("themes") or []:
+            count = self.theme_counts.get(theme, 0) - 1
+            if count > 0:
+                self.theme_counts[theme] = count
+            else:
+                self.theme_counts.pop(theme, None)
+
+        self.quotes = [q for q in self.quotes if q.get("session_id") != session_id]
+
+    def top_themes(self, limit: int) -> List[Tuple[str, int]]:
+        return Counter(self.theme_counts).most_common(limit)
+
+    def totals(self) -> Dict[str, int]:
+        """Totals across every folded-in session, for report metadata"""
+        return {
+            "total_interviews": len(self.sessions),
+            "total_insights": sum(s.get("insights", 0) for s in self.sessions.values()),
+            "unique_themes": len(self.theme_counts),
+            "total_positive_feedback": sum(s.get("positive_feedback", 0) for s in self.sessions.values()),
+            "total_negative_feedback": sum(s.get("negative_feedback", 0) for s in self.sessions.values()),
+        }
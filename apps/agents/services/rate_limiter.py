@@ -0,0 +1,304 @@
+"""
+Rate Limiter Service
+
+Token-bucket limiter for OpenAI traffic with priority classes. Requests-per-minute and
+tokens-per-minute budgets are shared by the whole process (or by every worker when
+Redis coordination is enabled), and waiting callers are served strictly by priority so
+live interview turns always go ahead of batch analytics.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import logging
+from enum import IntEnum
+from typing import Dict, Any, Optional, List
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Priority classes, lower value is served first"""
+    REALTIME = 0     # Live interview turns: question generation, TTS, transcription
+    INTERACTIVE = 1  # Dashboard requests a user is waiting on
+    BATCH = 2        # Bulk summarization and report generation
+
+
+# Fraction of each bucket that only REALTIME traffic may dip into
+DEFAULT_RESERVE_FRACTION = {
+    Priority.REALTIME: 0.0,
+    Priority.INTERACTIVE: 0.1,
+    Priority.BATCH: 0.25,
+}
+
+
+def estimate_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    """
+    Rough token estimate for a chat request (prompt at ~4 characters per token plus the completion cap)
+
+    Args:
+        messages: Chat messages
+        max_tokens: Completion token cap, if any
+
+    Returns:
+        Estimated total tokens
+    """
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in messages)
+    return prompt_chars // 4 + (max_tokens or 500)
+
+
+class LocalBuckets:
+    """RPM and TPM token buckets held in this process"""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.capacity = {"requests": float(rpm), "tokens": float(tpm)}
+        self.level = dict(self.capacity)
+        self.rate = {name: cap / 60.0 for name, cap in self.capacity.items()}
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        for name in self.level:
+            self.level[name] = min(self.capacity[name], self.level[name] + elapsed * self.rate[name])
+
+    async def try_acquire(self, tokens: int, reserve_fraction: float) -> float:
+        """
+        Take one request and `tokens` tokens if both buckets allow it
+
+        Returns:
+            0 when acquired, otherwise the number of seconds to wait before retrying
+        """
+        self._refill()
+        wanted = {"requests": 1.0, "tokens": float(min(tokens, self.capacity["tokens"]))}
+
+        wait = 0.0
+        for name, amount in wanted.items():
+            floor = min(self.capacity[name], amount + self.capacity[name] * reserve_fraction)
+            needed = floor - self.level[name]
+            if needed > 0:
+                wait = max(wait, needed / self.rate[name])
+
+        if wait > 0:
+            return wait
+
+        for name, amount in wanted.items():
+            self.level[name] -= amount
+        return 0.0
+
+    async def adjust_tokens(self, delta: int):
+        """Charge (positive) or refund (negative) tokens once actual usage is known"""
+        self._refill()
+        self.level["tokens"] = min(self.capacity["tokens"], self.level["tokens"] - delta)
+
+
+# Atomically refills and takes from both buckets. Returns 0 on success or the wait in ms.
+_REDIS_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local rpm = tonumber(ARGV[2])
+local tpm = tonumber(ARGV[3])
+local tokens = math.min(tonumber(ARGV[4]), tpm)
+local reserve = tonumber(ARGV[5])
+
+local function level(key, capacity)
+    local state = redis.call('HMGET', key, 'level', 'ts')
+    local current = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    return math.min(capacity, current + (now - ts) * capacity / 60000.0)
+end
+
+local req_level = level(KEYS[1], rpm)
+local tok_level = level(KEYS[2], tpm)
+
+local req_needed = math.min(rpm, 1 + rpm * reserve) - req_level
+local tok_needed = math.min(tpm, tokens + tpm * reserve) - tok_level
+local wait = 0
+if req_needed > 0 then wait = math.max(wait, req_needed * 60000.0 / rpm) end
+if tok_needed > 0 then wait = math.max(wait, tok_needed * 60000.0 / tpm) end
+
+if wait > 0 then
+    return math.ceil(wait)
+end
+
+redis.call('HSET', KEYS[1], 'level', req_level - 1, 'ts', now)
+redis.call('HSET', KEYS[2], 'level', tok_level - tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+redis.call('PEXPIRE', KEYS[2], 120000)
+return 0
+"""
+
+
+# Refills the token bucket, then charges (positive) or refunds (negative) the adjustment
+_REDIS_ADJUST_SCRIPT = """
+local now = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local delta = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'level', 'ts')
+local current = tonumber(state[1]) or tpm
+local ts = tonumber(state[2]) or now
+local level = math.min(tpm, current + (now - ts) * tpm / 60000.0)
+
+redis.call('HSET', KEYS[1], 'level', math.min(tpm, level - delta), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return 0
+"""
+
+
+class RedisBuckets:
+    """RPM and TPM token buckets shared across workers through Redis"""
+
+    def __init__(self, url: str, rpm: int, tpm: int, prefix: str = "chorus:openai-rate:"):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.rpm = rpm
+        self.tpm = tpm
+        self.keys = [f"{prefix}requests", f"{prefix}tokens"]
+        self._acquire = self.redis.register_script(_REDIS_ACQUIRE_SCRIPT)
+        self._adjust = self.redis.register_script(_REDIS_ADJUST_SCRIPT)
+
+    async def try_acquire(self, tokens: int, reserve_fraction: float) -> float:
+        now_ms = int(time.time() * 1000)
+        wait_ms = await self._acquire(
+            keys=self.keys,
+            args=[now_ms, self.rpm, self.tpm, tokens, reserve_fraction]
+        )
+        return int(wait_ms) / 1000.0
+
+    async def adjust_tokens(self, delta: int):
+        """Charge (positive) or refund (negative) tokens once actual usage is known"""
+        await self._adjust(keys=[self.keys[1]], args=[int(time.time() * 1000), self.tpm, delta])
+
+
+class PriorityRateLimiter:
+    """Grants rate-limit capacity to waiting callers in priority order"""
+
+    def __init__(self, buckets, reserve_fraction: Optional[Dict[Priority, float]] = None):
+        """
+        Initialize the limiter
+
+        Args:
+            buckets: LocalBuckets or RedisBuckets
+            reserve_fraction: Per-priority share of capacity kept free for higher classes
+        """
+        self.buckets = buckets
+        self.reserve_fraction = reserve_fraction or DEFAULT_RESERVE_FRACTION
+        self._waiters: List = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stats = {
+            p.name.lower(): {"granted": 0, "waited": 0, "total_wait_ms": 0.0}
+            for p in Priority
+        }
+
+    async def _try_acquire(self, tokens: int, priority: Priority) -> float:
+        try:
+            return await self.buckets.try_acquire(tokens, self.reserve_fraction[priority])
+        except Exception as e:
+            # Never stall traffic because the coordination store is unavailable
+            logger.warning("Rate limiter backend failed, letting request through: %s", e)
+            return 0.0
+
+    async def acquire(self, tokens: int, priority: Priority = Priority.INTERACTIVE):
+        """
+        Wait until the request may be sent
+
+        Args:
+            tokens: Estimated tokens the request will consume
+            priority: Priority class of the caller
+        """
+        stats = self._stats[priority.name.lower()]
+
+        # Fast path: nobody is queued and there is capacity
+        if not self._waiters and await self._try_acquire(tokens, priority) == 0:
+            stats["granted"] += 1
+            return
+
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), tokens, future))
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        await future
+
+        stats["granted"] += 1
+        stats["waited"] += 1
+        stats["total_wait_ms"] += (time.perf_counter() - started) * 1000
+
+    async def _dispatch(self):
+        """Serve the highest-priority waiter as soon as the buckets allow"""
+        while self._waiters:
+            priority, _, tokens, future = self._waiters[0]
+            if future.done():
+                # Caller was cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+
+            wait = await self._try_acquire(tokens, priority)
+            if wait > 0:
+                # Sleep until capacity frees up or a new (possibly higher priority) caller arrives
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=min(wait, 1.0))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+
+    async def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Correct the token bucket once the response reports real usage"""
+        if actual_tokens is None or actual_tokens == estimated_tokens:
+            return
+        try:
+            await self.buckets.adjust_tokens(actual_tokens - estimated_tokens)
+        except Exception as e:
+            logger.warning("Rate limiter usage adjustment failed: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        queued: Dict[str, int] = {}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                name = Priority(priority).name.lower()
+                queued[name] = queued.get(name, 0) + 1
+        return {
+            "backend": "redis" if isinstance(self.buckets, RedisBuckets) else "memory",
+            "queued": queued,
+            "priorities": self._stats,
+        }
+
+
+def create_rate_limiter() -> Optional[PriorityRateLimiter]:
+    """
+    Build the limiter from environment configuration
+
+    OPENAI_RPM and OPENAI_TPM set the budgets (the limiter is disabled when neither is set).
+    OPENAI_RATE_LIMIT_BACKEND=redis shares the budget across workers via REDIS_URL.
+
+    Returns:
+        A PriorityRateLimiter, or None when rate limiting is disabled
+    """
+    rpm = os.getenv("OPENAI_RPM")
+    tpm = os.getenv("OPENAI_TPM")
+    if not rpm and not tpm:
+        return None
+
+    rpm = int(rpm or 10_000)
+    tpm = int(tpm or 10_000_000)
+
+    redis_url = os.getenv("REDIS_URL")
+    if os.getenv("OPENAI_RATE_LIMIT_BACKEND", "memory").lower() == "redis" and redis_url:
+        buckets = RedisBuckets(redis_url, rpm, tpm)
+    else:
+        buckets = LocalBuckets(rpm, tpm)
+
+    return PriorityRateLimiter(buckets)
@@ -0,0 +1,295 @@
+"""
+Report Jobs Service
+
+Background execution of long report generations (study overview, aggregate summary).
+A job is a study_reports row: it is created in 'generating' status, a worker from the
+"report_jobs" task pool runs it, and its progress and result are written to the row so
+any API worker can answer a poll. Progress events and partial results are also fanned
+out in-process to server-sent-event subscribers of the worker running the job.
+
+A job that runs longer than REPORT_JOB_TIMEOUT fails. While a worker holds a job, queued
+or running, it refreshes the row's heartbeat_at; a 'generating' row whose heartbeat stopped
+belongs to a dead worker and is marked failed by whichever worker reads it next.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Set, Tuple, Callable, Awaitable, AsyncIterator
+from services.task_pool import get_task_pool
+from services import database as db
+
+logger = logging.getLogger(__name__)
+
+# Min seconds between progress writes to the job row
+PROGRESS_WRITE_INTERVAL = 2.0
+
+# Finished jobs stay in memory this long so late subscribers still get the result
+FINISHED_JOB_RETENTION = 600
+
+# Partial results kept for replay to late subscribers; older ones are dropped
+MAX_REPLAY_EVENTS = 500
+
+DEFAULT_JOB_TIMEOUT = 1800
+
+# Seconds between heartbeats of a held job, and without one before its row is reaped
+HEARTBEAT_INTERVAL = 15
+HEARTBEAT_TIMEOUT = 90
+
+TERMINAL_EVENTS = ("completed", "failed")
+
+
+class ReportJob:
+    """A running report job and its event stream"""
+
+    def __init__(self, job_id: str, report_type: str, target_id: str):
+        self.id = job_id
+        self.report_type = report_type
+        self.target_id = target_id
+        self.status = "generating"
+        self.progress: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Recent partial results and the final event, replayed to late subscribers
+        self._events: deque = deque(maxlen=MAX_REPLAY_EVENTS)
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._seq = 0
+        self._last_progress_write = 0.0
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_EVENTS
+
+    def _publish(self, event: str, data: Any, replay: bool = True) -> Dict[str, Any]:
+        self._seq += 1
+        entry = {"id": self._seq, "event": event, "data": data}
+        if replay:
+            self._events.append(entry)
+        for queue in self._subscribers:
+            queue.put_nowait(entry)
+        return entry
+
+    async def update(self, **progress):
+        """
+        Record progress, notify subscribers and (throttled) persist it to the job row
+
+        Args:
+            **progress: Fields merged into the job's progress, e.g. phase="map", completed=3
+        """
+        self.progress.update(progress)
+        self._publish("progress", dict(self.progress), replay=False)
+
+        now = time.monotonic()
+        if now - self._last_progress_write >= PROGRESS_WRITE_INTERVAL or "phase" in progress:
+            self._last_progress_write = now
+            try:
+                await db.update_study_report(self.id, {"progress": self.progress})
+            except Exception as e:
+                logger.warning("Could not persist progress for job %s: %s", self.id, e)
+
+    def partial(self, name: str, data: Any):
+        """Publish a partial result, e.g. one interview summary as soon as it is ready"""
+        self._publish("partial", {"name": name, "data": data})
+
+    def finish(self, result: Dict[str, Any]):
+        self.status, self.result = "completed", result
+        self._publish("completed", result)
+
+    def fail(self, error: str):
+        self.status, self.error = "failed", error
+        self._publish("failed", {"error": error})
+
+    async def subscribe(self, keepalive: float = 15.0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the job's events: the current progress and earlier partial results first,
+        then live events until the job completes or fails. Yields a "ping" event when
+        nothing happened for `keepalive` seconds.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        history = list(self._events)
+        self._subscribers.add(queue)
+        try:
+            if self.progress:
+                yield {"id": self._seq, "event": "progress", "data": dict(self.progress)}
+            for entry in history:
+                yield entry
+            if self.done:
+                return
+
+            while True:
+                try:
+                    entry = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield {"id": self._seq, "event": "ping", "data": {}}
+                    continue
+                yield entry
+                if entry["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            self._subscribers.discard(queue)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.id,
+            "reportType": self.report_type,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+# Result payload for the client, and the study_reports columns to store on completion
+JobRunner = Callable[[ReportJob], Awaitable[Tuple[Dict[str, Any], Dict[str, Any]]]]
+
+# Jobs running (or recently finished) on this worker
+_jobs: Dict[str, ReportJob] = {}
+
+
+def get_report_job(job_id: str) -> Optional[ReportJob]:
+    return _jobs.get(job_id)
+
+
+def _find_running(report_type: str, target_id: str) -> Optional[ReportJob]:
+    for job in _jobs.values():
+        if job.report_type == report_type and job.target_id == target_id and not job.done:
+            return job
+    return None
+
+
+def job_timeout() -> float:
+    """Seconds a report job may run (REPORT_JOB_TIMEOUT)"""
+    return float(os.getenv("REPORT_JOB_TIMEOUT", DEFAULT_JOB_TIMEOUT))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+async def _heartbeat(job: ReportJob):
+    """Keep the job row's heartbeat fresh while this worker holds the job"""
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        try:
+            await db.update_study_report(job.id, {"heartbeat_at": _now()})
+        except Exception as e:
+            logger.warning("Could not refresh heartbeat of job %s: %s", job.id, e)
+
+
+async def reap_stale_job(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Mark a job row failed if its worker stopped holding it
+
+    Live workers refresh heartbeat_at and time jobs out themselves, so a row still
+    generating without a recent heartbeat belongs to a worker that died; without this,
+    readers of the row would wait on it forever. Rows from before heartbeats fall back
+    to generation_started_at and the job timeout.
+
+    Returns:
+        The row, updated if it was reaped
+    """
+    if row.get("status") != "generating" or row["id"] in _jobs:
+        return row
+
+    if row.get("heartbeat_at"):
+        seen_at, limit = row["heartbeat_at"], HEARTBEAT_TIMEOUT
+    else:
+        seen_at, limit = row.get("generation_started_at"), job_timeout()
+    if not seen_at:
+        return row
+
+    seen = datetime.fromisoformat(seen_at)
+    now = datetime.now(timezone.utc) if seen.tzinfo else datetime.now()
+    if (now - seen).total_seconds() < limit:
+        return row
+
+    reaped = {
+        "status": "failed",
+        "error": "Report generation did not finish in time",
+        "generation_completed_at": _now()
+    }
+    await db.update_study_report(row["id"], reaped)
+    logger.warning("Marked stale report job %s failed", row["id"])
+    return {**row, **reaped}
+
+
+async def _run(job: ReportJob, runner: JobRunner):
+    try:
+        # The job may have waited in the pool; its run time counts from here
+        await db.update_study_report(job.id, {"generation_started_at": _now(), "heartbeat_at": _now()})
+        async with asyncio.timeout(job_timeout()):
+            result, row = await runner(job)
+        await db.update_study_report(job.id, {
+            **row,
+            "status": "completed",
+            "progress": job.progress,
+            "generation_completed_at": _now()
+        })
+        job.finish(result)
+    except Exception as e:
+        if isinstance(e, TimeoutError):
+            error = "Report generation did not finish in time"
+        else:
+            error = str(getattr(e, "detail", None) or e)
+        logger.warning("Report job %s failed: %s", job.id, error)
+        job.fail(error)
+        try:
+            await db.update_study_report(job.id, {
+                "status": "failed",
+                "error": error,
+                "progress": job.progress,
+                "generation_completed_at": _now()
+            })
+        except Exception as update_error:
+            logger.warning("Could not mark job %s failed: %s", job.id, update_error)
+    finally:
+        if job._heartbeat is not None:
+            job._heartbeat.cancel()
+        asyncio.get_running_loop().call_later(FINISHED_JOB_RETENTION, _jobs.pop, job.id, None)
+
+
+async def start_report_job(
+    report_type: str,
+    runner: JobRunner,
+    study_id: Optional[str] = None,
+    research_question_id: Optional[str] = None
+) -> ReportJob:
+    """
+    Create a job row and run it in the background
+
+    Args:
+        report_type: "overview" or "aggregate"
+        runner: Generates the report, reporting progress through the job
+        study_id: Study the report belongs to
+        research_question_id: Research question the report belongs to (aggregate summaries)
+
+    Returns:
+        The job. If the same report is already generating on this worker, that job is
+        returned instead of starting a duplicate.
+    """
+    target_id = study_id or research_question_id
+    running = _find_running(report_type, target_id)
+    if running is not None:
+        return running
+
+    row = await db.insert_next_study_report({
+        "study_id": study_id,
+        "research_question_id": research_question_id,
+        "report_type": report_type,
+        "status": "generating",
+        "report_data": {},
+        "generation_started_at": _now(),
+        "heartbeat_at": _now()
+    })
+    if not row:
+        raise RuntimeError("Could not create report job")
+
+    job = ReportJob(row["id"], report_type, target_id)
+    _jobs[job.id] = job
+    job._heartbeat = asyncio.create_task(_heartbeat(job))
+    get_task_pool("report_jobs").submit(_run(job, runner))
+    return job
@@ -0,0 +1,139 @@
+"""
+Report Reducer Service
+
+Hierarchical reduction of interview summaries for study reports. Summaries are rendered as
+compact text blocks; while the blocks do not fit one prompt's token budget they are packed
+into budget-sized batches and each batch is synthesized into a single block, level by level,
+so every interview contributes to the final report at a bounded per-call size.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional
+from services.llm_gateway import get_llm_gateway
+from services.rate_limiter import Priority
+from services.tokens import count_tokens, pack_by_tokens
+
+logger = logging.getLogger(__name__)
+
+REDUCE_MODEL = "gpt-4o"
+DEFAULT_PROMPT_TOKEN_BUDGET = 12000
+MIN_PROMPT_TOKEN_BUDGET = 4000
+DEFAULT_REDUCE_CONCURRENCY = 4
+
+SYNTHESIS_SYSTEM_PROMPT = """You are an expert research analyst combining findings from several qualitative interviews.
+You will receive a batch of interview findings. Each block is either one interview summary
+or an earlier synthesis of several interviews (its "Interviews:" line says how many).
+
+Merge the batch into one synthesis that preserves everything a final study report would need:
+- Keep distinct insights, pain points and praise; merge duplicates instead of dropping them
+- Track how many interviews support each theme, counting across blocks
+- Keep the most revealing verbatim quotes
+
+Return JSON:
+{
+  "key_insights": [<insights>],
+  "themes": [{"name": "<theme>", "interviews": <count>}],
+  "positive_feedback": [<positive points>],
+  "negative_feedback": [<negative points>],
+  "notable_quotes": [<quotes>]
+}"""
+
+
+def _lines(prefix: str, items: List[Any]) -> List[str]:
+    return [f"{prefix}{item}" for item in items or []]
+
+
+def render_summary_block(summary: Dict[str, Any]) -> str:
+    """Render one interview summary as a findings block"""
+    lines = ["Interviews: 1", f"Sentiment: {summary.get('sentiment') or 'unknown'}"]
+    lines += ["Insights:"] + _lines("- ", summary.get("key_insights"))
+    lines += ["Themes:"] + _lines("- ", summary.get("themes"))
+    lines += ["Positive:"] + _lines("+ ", summary.get("positive_feedback"))
+    lines += ["Negative:"] + _lines("- ", summary.get("negative_feedback"))
+    lines += ["Quotes:"] + _lines("> ", summary.get("notable_quotes"))
+    return "\n".join(lines)
+
+
+def render_synthesis_block(synthesis: Dict[str, Any], interviews: int) -> str:
+    """Render an intermediate synthesis as a findings block"""
+    themes = [
+        f"{t.get('name')} ({t.get('interviews', '?')} interviews)" if isinstance(t, dict) else t
+        for t in synthesis.get("themes") or []
+    ]
+    lines = [f"Interviews: {interviews}"]
+    lines += ["Insights:"] + _lines("- ", synthesis.get("key_insights"))
+    lines += ["Themes:"] + _lines("- ", themes)
+    lines += ["Positive:"] + _lines("+ ", synthesis.get("positive_feedback"))
+    lines += ["Negative:"] + _lines("- ", synthesis.get("negative_feedback"))
+    lines += ["Quotes:"] + _lines("> ", synthesis.get("notable_quotes"))
+    return "\n".join(lines)
+
+
+def _interview_count(block: str) -> int:
+    first_line = block.split("\n", 1)[0]
+    try:
+        return int(first_line.split(":", 1)[1])
+    except (IndexError, ValueError):
+        return 1
+
+
+async def _synthesize(batch: List[str]) -> str:
+    interviews = sum(_interview_count(block) for block in batch)
+    response = await get_llm_gateway().chat_completion(
+        model=REDUCE_MODEL,
+        messages=[
+            {"role": "system", "content": SYNTHESIS_SYSTEM_PROMPT},
+            {"role": "user", "content": "\n\n---\n\n".join(batch)}
+        ],
+        temperature=0.3,
+        max_tokens=1500,
+        response_format={"type": "json_object"},
+        cache=True,
+        priority=Priority.BATCH,
+        endpoint="analysis"
+    )
+    return render_synthesis_block(json.loads(response.choices[0].message.content), interviews)
+
+
+async def reduce_blocks(
+    blocks: List[str],
+    budget: Optional[int] = None,
+    max_concurrency: Optional[int] = None
+) -> List[str]:
+    """
+    Reduce findings blocks until they fit in one prompt
+
+    Args:
+        blocks: Findings blocks (see render_summary_block)
+        budget: Token budget for the blocks of one call (OVERVIEW_PROMPT_TOKEN_BUDGET)
+        max_concurrency: Batch syntheses in flight at once (OVERVIEW_REDUCE_CONCURRENCY)
+
+    Returns:
+        Blocks whose combined size fits the budget
+    """
+    budget = max(MIN_PROMPT_TOKEN_BUDGET, budget or int(
+        os.getenv("OVERVIEW_PROMPT_TOKEN_BUDGET", DEFAULT_PROMPT_TOKEN_BUDGET)
+    ))
+    limiter = asyncio.Semaphore(max_concurrency or int(
+        os.getenv("OVERVIEW_REDUCE_CONCURRENCY", DEFAULT_REDUCE_CONCURRENCY)
+    ))
+
+    async def reduce_batch(batch: List[str]) -> str:
+        # A lone small block is carried to the next level as is; it will pair up there.
+        # Large lone blocks are still synthesized so every level shrinks.
+        if len(batch) == 1 and count_tokens(batch[0]) <= budget // 2:
+            return batch[0]
+        async with limiter:
+            return await _synthesize(batch)
+
+    level = 0
+    while sum(count_tokens(block) for block in blocks) > budget:
+        batches = pack_by_tokens(blocks, budget)
+        level += 1
+        logger.info("Reduce level %d: %d blocks -> %d batches", level, len(blocks), len(batches))
+        blocks = list(await asyncio.gather(*(reduce_batch(batch) for batch in batches)))
+
+    return blocks
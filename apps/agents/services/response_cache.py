@@ -0,0 +1,206 @@
+"""
+Response Cache Service
+
+Content-addressed cache for deterministic LLM calls. Responses are keyed on a hash
+of (model, messages, temperature, response_format), so byte-identical prompts such as
+repeated summary and overview requests are served without calling OpenAI again.
+
+Two backends are available: an in-process LRU (default) and Redis (shared across workers).
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def make_cache_key(
+    model: str,
+    messages: List[Dict[str, Any]],
+    temperature: Optional[float] = None,
+    response_format: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a stable cache key for a chat completion request
+
+    Args:
+        model: Chat model
+        messages: Chat messages
+        temperature: Sampling temperature
+        response_format: Requested response format
+
+    Returns:
+        Hex SHA-256 digest of the canonical request
+    """
+    canonical = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": response_format,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class InMemoryLRUBackend:
+    """In-process LRU backend bounded by entry count and total payload size"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: int):
+        if key in self._entries:
+            self._remove(key)
+
+        size = len(value)
+        if size > self.max_bytes:
+            return
+
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self.total_bytes += size
+
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str):
+        value, _ = self._entries.pop(key)
+        self.total_bytes -= len(value)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "evictions": self.evictions,
+        }
+
+
+class RedisBackend:
+    """Redis backend shared by every worker; eviction is left to Redis' maxmemory policy"""
+
+    def __init__(self, url: str, prefix: str = "chorus:llm-cache:"):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.redis.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self.redis.set(self.prefix + key, value, ex=ttl)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+class ResponseCache:
+    """Cache front-end that tracks hit rates and never fails the underlying call"""
+
+    def __init__(self, backend, default_ttl: int = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the cache
+
+        Args:
+            backend: Storage backend exposing async get/set
+            default_ttl: TTL in seconds used when a call does not specify one
+        """
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Response cache read failed: %s", e)
+            return None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        try:
+            await self.backend.set(key, value, ttl or self.default_ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Response cache write failed: %s", e)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.get_stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def create_response_cache() -> Optional[ResponseCache]:
+    """
+    Build the cache from environment configuration
+
+    LLM_CACHE_BACKEND selects "memory" (default), "redis" or "off".
+    LLM_CACHE_TTL_SECONDS, LLM_CACHE_MAX_ENTRIES and LLM_CACHE_MAX_BYTES tune it.
+
+    Returns:
+        A ResponseCache, or None when caching is disabled
+    """
+    backend_name = os.getenv("LLM_CACHE_BACKEND", "memory").lower()
+    if backend_name == "off":
+        return None
+
+    ttl = int(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+    redis_url = os.getenv("REDIS_URL")
+
+    if backend_name == "redis" and redis_url:
+        backend = RedisBackend(redis_url)
+    else:
+        if backend_name == "redis":
+            logger.warning("LLM_CACHE_BACKEND=redis but REDIS_URL is not set; using in-memory cache")
+        backend = InMemoryLRUBackend(
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+        )
+
+    return ResponseCache(backend, default_ttl=ttl)
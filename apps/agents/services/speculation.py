@@ -0,0 +1,189 @@
+"""
+Speculation Service
+
+Speculative next-question generation for voice interviews. While the participant is still
+answering, partial audio is transcribed and a candidate follow-up question (with its TTS
+audio) is prepared in the background. When the final transcript arrives the candidate is
+committed if the answer did not diverge materially from the partial one, and discarded
+otherwise.
+
+Speculative calls run below REALTIME priority so they never delay the live turn, and each
+answer gets at most SPECULATION_MAX_PER_ANSWER speculations. A candidate still generating
+when the answer ends is waited on for at most SPECULATION_RESOLVE_WAIT seconds, and not at
+all if its partial transcript already diverged. Off unless SPECULATION_ENABLED is set.
+"""
+
+import os
+import re
+import asyncio
+import difflib
+import logging
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+from services.audio_frames import PCM_BYTES_PER_SECOND
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIMILARITY = 0.8
+DEFAULT_TRIGGER_SECONDS = 2.0
+DEFAULT_MAX_PER_ANSWER = 2
+DEFAULT_RESOLVE_WAIT = 0.5
+
+_stats: Dict[str, int] = {
+    "started": 0,
+    "completed": 0,
+    "committed": 0,
+    "discarded": 0,
+    "failed": 0,
+}
+
+
+def get_speculation_stats() -> Dict[str, Any]:
+    """Process-wide speculation counters and hit rate"""
+    resolved = _stats["committed"] + _stats["discarded"]
+    return {
+        **_stats,
+        "hit_rate": round(_stats["committed"] / resolved, 3) if resolved else 0.0,
+    }
+
+
+def _words(text: str):
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+
+def transcript_similarity(partial: str, final: str) -> float:
+    """
+    How closely the final transcript matches the one a candidate was built from
+
+    Returns:
+        Ratio in [0, 1]; 1 means the participant said nothing new
+    """
+    partial_words, final_words = _words(partial), _words(final)
+    if not partial_words or not final_words:
+        return 0.0
+    return difflib.SequenceMatcher(None, partial_words, final_words).ratio()
+
+
+class SpeculativeTurn:
+    """Background candidate generation for one participant answer"""
+
+    def __init__(
+        self,
+        transcribe: Callable[[bytes], Awaitable[str]],
+        generate: Callable[[str], Awaitable[Tuple[str, bytes]]],
+        min_similarity: Optional[float] = None,
+        trigger_seconds: Optional[float] = None,
+        max_per_answer: Optional[int] = None,
+        resolve_wait: Optional[float] = None
+    ):
+        """
+        Initialize speculation for a session
+
+        Args:
+            transcribe: Transcribes raw PCM16 audio to text
+            generate: Builds (question text, TTS audio) from a partial answer transcript
+            min_similarity: Similarity needed to commit a candidate (SPECULATION_MIN_SIMILARITY)
+            trigger_seconds: New audio needed before speculating again (SPECULATION_TRIGGER_SECONDS)
+            max_per_answer: Speculations started per answer at most (SPECULATION_MAX_PER_ANSWER)
+            resolve_wait: Seconds to wait for an in-flight candidate (SPECULATION_RESOLVE_WAIT)
+        """
+        self.transcribe = transcribe
+        self.generate = generate
+        self.enabled = os.getenv("SPECULATION_ENABLED", "false").lower() == "true"
+        self.min_similarity = min_similarity or float(
+            os.getenv("SPECULATION_MIN_SIMILARITY", DEFAULT_MIN_SIMILARITY)
+        )
+        trigger_seconds = trigger_seconds or float(
+            os.getenv("SPECULATION_TRIGGER_SECONDS", DEFAULT_TRIGGER_SECONDS)
+        )
+        self.trigger_bytes = int(trigger_seconds * PCM_BYTES_PER_SECOND)
+        self.max_per_answer = max_per_answer or int(
+            os.getenv("SPECULATION_MAX_PER_ANSWER", DEFAULT_MAX_PER_ANSWER)
+        )
+        self.resolve_wait = resolve_wait if resolve_wait is not None else float(
+            os.getenv("SPECULATION_RESOLVE_WAIT", DEFAULT_RESOLVE_WAIT)
+        )
+        self.reset()
+
+    def reset(self):
+        """Forget the candidate from the previous answer"""
+        task = getattr(self, "_task", None)
+        if task is not None and not task.done():
+            task.cancel()
+        self._speculated_at = 0
+        self._speculations = 0
+        self._task: Optional[asyncio.Task] = None
+        # Partial transcript the in-flight speculation is generating from, once known
+        self._pending_transcript: Optional[str] = None
+        self._candidate: Optional[Tuple[str, str, bytes]] = None
+
+    def add_audio(self, answer_audio: memoryview):
+        """
+        Start a speculation once enough new answer audio arrived
+
+        Args:
+            answer_audio: Raw PCM16 audio of the whole answer so far (the session's answer
+                buffer); copied only when a speculation starts
+        """
+        if not self.enabled:
+            return
+
+        if self._task is not None and not self._task.done():
+            return
+        if self._speculations >= self.max_per_answer:
+            return
+        if len(answer_audio) - self._speculated_at < self.trigger_bytes:
+            return
+
+        self._speculated_at = len(answer_audio)
+        self._speculations += 1
+        self._pending_transcript = None
+        self._task = asyncio.create_task(self._speculate(bytes(answer_audio)))
+        _stats["started"] += 1
+
+    async def _speculate(self, audio: bytes):
+        try:
+            partial_transcript = await self.transcribe(audio)
+            if not partial_transcript.strip():
+                return
+            self._pending_transcript = partial_transcript
+            question_text, audio_bytes = await self.generate(partial_transcript)
+            self._candidate = (partial_transcript, question_text, audio_bytes)
+            _stats["completed"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _stats["failed"] += 1
+            logger.warning("Speculative question generation failed: %s", e)
+
+    async def resolve(self, final_transcript: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Commit or discard the candidate against the final transcript
+
+        Args:
+            final_transcript: The full transcript of the participant's answer
+
+        Returns:
+            (question text, TTS audio) when the candidate is still valid, otherwise None
+        """
+        if self._task is not None and not self._task.done():
+            pending = self._pending_transcript
+            if pending is None or transcript_similarity(pending, final_transcript) >= self.min_similarity:
+                # A candidate that can still be committed is usually closer to done than a
+                # fresh generation; one from a diverged answer is cancelled by reset() below
+                await asyncio.wait({self._task}, timeout=self.resolve_wait)
+
+        candidate = self._candidate
+        self.reset()
+
+        if candidate is None:
+            return None
+
+        partial_transcript, question_text, audio_bytes = candidate
+        similarity = transcript_similarity(partial_transcript, final_transcript)
+        if similarity >= self.min_similarity:
+            _stats["committed"] += 1
+            return question_text, audio_bytes
+
+        _stats["discarded"] += 1
+        logger.info("Discarded speculative question (similarity %.2f < %.2f)", similarity, self.min_similarity)
+        return None
@@ -0,0 +1,110 @@
+"""
+Speech Pipeline Service
+
+Turns a stream of question text deltas into a stream of synthesized audio chunks.
+Text is cut at sentence boundaries and each sentence is sent to TTS as soon as it is
+complete, so the participant hears the first sentence while the rest of the question
+is still being generated and synthesized.
+"""
+
+import re
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, List, Tuple
+
+# Sentence terminator, optional closing quotes/brackets, then whitespace
+SENTENCE_END = re.compile(r"([.!?]+[\"')\]]*)\s+")
+
+# Fragments shorter than this are merged into the next sentence ("Hi. ", "Ok. ")
+MIN_SENTENCE_CHARS = 12
+
+
+def split_sentences(buffer: str, min_chars: int = MIN_SENTENCE_CHARS) -> Tuple[List[str], str]:
+    """
+    Cut complete sentences off the front of a text buffer
+
+    Args:
+        buffer: Accumulated text
+        min_chars: Minimum length of an emitted sentence
+
+    Returns:
+        Tuple of (complete sentences, remaining partial text)
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(buffer):
+        candidate = buffer[start:match.end(1)].strip()
+        if len(candidate) < min_chars:
+            continue
+        sentences.append(candidate)
+        start = match.end()
+    return sentences, buffer[start:]
+
+
+def clean_segment(text: str) -> str:
+    """Strip the stray quotes models sometimes wrap questions in"""
+    return text.strip().strip('"\'')
+
+
+async def stream_speech(
+    text_deltas: AsyncIterator[str],
+    synthesize: Callable[[str], Awaitable[bytes]],
+    on_audio: Callable[[int, str, bytes], Awaitable[None]],
+    max_parallel: int = 2
+) -> str:
+    """
+    Synthesize text incrementally and deliver audio in order
+
+    Args:
+        text_deltas: Text as it is generated
+        synthesize: TTS function returning encoded audio for a text segment
+        on_audio: Called with (sequence number, segment text, audio) in sentence order
+        max_parallel: Max TTS requests in flight at once
+
+    Returns:
+        The full generated text
+    """
+    limiter = asyncio.Semaphore(max_parallel)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def synthesize_limited(segment: str) -> bytes:
+        async with limiter:
+            return await synthesize(segment)
+
+    async def deliver():
+        seq = 0
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            segment, task = item
+            await on_audio(seq, segment, await task)
+            seq += 1
+
+    def schedule(segment: str):
+        segment = clean_segment(segment)
+        if segment:
+            queue.put_nowait((segment, asyncio.create_task(synthesize_limited(segment))))
+
+    deliverer = asyncio.create_task(deliver())
+    parts: List[str] = []
+    buffer = ""
+    try:
+        async for delta in text_deltas:
+            parts.append(delta)
+            buffer += delta
+            sentences, buffer = split_sentences(buffer)
+            for sentence in sentences:
+                schedule(sentence)
+
+        schedule(buffer)
+        queue.put_nowait(None)
+        await deliverer
+    except BaseException:
+        deliverer.cancel()
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                item[1].cancel()
+        raise
+
+    return clean_segment("".join(parts))
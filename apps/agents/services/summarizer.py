@@ -0,0 +1,89 @@
+"""
+Summarizer Service
+
+Per-interview summarization shared by the Summary Agent and the Overview Agent's map step,
+so both produce (and persist) the same summary shape for a session.
+"""
+
+import json
+import hashlib
+from typing import Dict, Any
+from services.llm_gateway import get_llm_gateway
+from services.rate_limiter import Priority
+
+SUMMARY_MODEL = "gpt-4o"
+
+SUMMARY_FIELDS = [
+    "key_insights",
+    "sentiment",
+    "themes",
+    "notable_quotes",
+    "positive_feedback",
+    "negative_feedback",
+    "summary_text",
+]
+
+SUMMARY_SYSTEM_PROMPT = """You are an expert at analyzing qualitative research interviews.
+Analyze the following interview and provide:
+
+1. Key Insights: 3-5 most important takeaways
+2. Sentiment: Overall participant sentiment (positive, neutral, negative, mixed)
+3. Themes: Main topics/themes discussed
+4. Notable Quotes: 2-3 most interesting or revealing quotes
+5. Positive Feedback: Things the participant liked, praised, or expressed satisfaction about
+6. Negative Feedback: Things the participant disliked, complained about, or expressed frustration with
+7. Summary: A concise paragraph summarizing the interview
+
+Return your analysis as JSON with this structure:
+{
+  "key_insights": [<list of insights>],
+  "sentiment": "<sentiment>",
+  "themes": [<list of themes>],
+  "notable_quotes": [<list of quotes>],
+  "positive_feedback": [<list of positive points>],
+  "negative_feedback": [<list of negative points>],
+  "summary_text": "<summary paragraph>"
+}"""
+
+
+async def summarize_transcript(transcript: str, priority: Priority = Priority.INTERACTIVE) -> Dict[str, Any]:
+    """
+    Summarize one interview
+
+    Args:
+        transcript: Assembled Q/A transcript of the session (see services/transcripts.py)
+        priority: Rate limiter priority (BATCH for bulk report generation)
+
+    Returns:
+        Dictionary with the SUMMARY_FIELDS keys
+    """
+    response = await get_llm_gateway().chat_completion(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": f"Interview:\n\n{transcript}"}
+        ],
+        temperature=0.5,
+        max_tokens=1000,
+        response_format={"type": "json_object"},
+        cache=True,
+        priority=priority,
+        endpoint="analysis"
+    )
+
+    return json.loads(response.choices[0].message.content)
+
+
+def summary_fingerprint(summary: Dict[str, Any]) -> str:
+    """Stable hash of a summary's content, used to detect sessions whose summary changed"""
+    content = {field: summary.get(field) or None for field in SUMMARY_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def summary_row(session_id: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the interview_summaries row for a summary"""
+    row = {field: summary[field] for field in SUMMARY_FIELDS if field in summary}
+    row["session_id"] = session_id
+    row["summary_text"] = summary.get("summary_text") or ""
+    row["agent_model_version"] = SUMMARY_MODEL
+    return row
@@ -0,0 +1,354 @@
+"""
+Summary Queue Service
+
+Summarizes sessions in the background as soon as interviews end, so per-session summaries
+already exist when a study report is requested and report generation is left with the
+reduce step. Interview routers enqueue the session id; a fixed pool of worker tasks started
+with the app drains the queue, so at most SUMMARY_WORKERS summaries run at once per process.
+
+Two backends are available: an in-process queue (default) and a Redis list shared by every
+worker, which also keeps pending sessions across restarts. Failed summaries are retried
+after a backoff delay.
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import asyncio
+import logging
+from typing import Dict, Any, Optional, List, Set
+from services.rate_limiter import Priority
+from services.summarizer import summarize_transcript, summary_row
+from services.transcripts import load_session_transcript
+from services import database as db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+MAX_ATTEMPTS = 3
+
+# Seconds a worker blocks on an empty Redis queue before checking for shutdown
+POP_TIMEOUT = 5
+
+# Retry n waits RETRY_DELAY * 2**(n-1) seconds
+RETRY_DELAY = 30
+
+# Redis consumers refresh their heartbeat and promote due retries this often; a consumer
+# whose heartbeat is older than CONSUMER_TTL is dead and its in-flight jobs are requeued
+MAINTENANCE_INTERVAL = 5
+CONSUMER_TTL = 30
+
+
+def retry_delay(attempt: int) -> float:
+    """Seconds to wait before running `attempt` (2 = first retry)"""
+    return RETRY_DELAY * 2 ** (attempt - 2)
+
+
+class InMemoryQueue:
+    """Per-process queue; pending sessions are lost if the process stops"""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pending: Set[str] = set()
+
+    async def push(self, session_id: str, attempt: int = 1, delay: float = 0) -> bool:
+        if attempt == 1 and session_id in self._pending:
+            return False
+        self._pending.add(session_id)
+        job = {"session_id": session_id, "attempt": attempt}
+        if delay > 0:
+            asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, job)
+        else:
+            self._queue.put_nowait(job)
+        return True
+
+    async def pop(self) -> Optional[Dict[str, Any]]:
+        job = await self._queue.get()
+        self._pending.discard(job["session_id"])
+        return job
+
+    async def ack(self, job: Dict[str, Any]):
+        pass
+
+    async def maintain(self):
+        pass
+
+    async def size(self) -> int:
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "memory"}
+
+
+# Marks the session pending and queues the job (or schedules it when delayed) in one step.
+# New sessions already pending are rejected; retries always go through.
+_REDIS_PUSH_SCRIPT = """
+local session_id = ARGV[1]
+local job = ARGV[2]
+local attempt = tonumber(ARGV[3])
+local due = tonumber(ARGV[4])
+
+local added = redis.call('SADD', KEYS[2], session_id)
+if added == 0 and attempt == 1 then
+    return 0
+end
+
+if due > 0 then
+    redis.call('ZADD', KEYS[3], due, job)
+else
+    redis.call('LPUSH', KEYS[1], job)
+end
+return 1
+"""
+
+
+# Moves retries that are due from the delayed set onto the queue
+_REDIS_PROMOTE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, job in ipairs(due) do
+    redis.call('ZREM', KEYS[1], job)
+    redis.call('LPUSH', KEYS[2], job)
+end
+return #due
+"""
+
+
+# Requeues every in-flight job of a dead consumer
+_REDIS_REQUEUE_SCRIPT = """
+local moved = 0
+while redis.call('RPOPLPUSH', KEYS[1], KEYS[2]) do
+    moved = moved + 1
+end
+redis.call('SREM', KEYS[3], ARGV[1])
+return moved
+"""
+
+
+class RedisQueue:
+    """
+    Redis list shared by every worker; a set de-duplicates sessions already queued
+
+    A popped job moves to this process's processing list until it is acknowledged, so a
+    job in flight when the process dies is requeued by another consumer once this one's
+    heartbeat expires. Delayed retries wait in a sorted set scored by due time.
+    """
+
+    def __init__(self, url: str, key: str = "chorus:summary-queue"):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.key = key
+        self.pending_key = key + ":pending"
+        self.delayed_key = key + ":delayed"
+        self.consumers_key = key + ":consumers"
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.processing_key = self._processing_key(self.consumer)
+        self._push = self.redis.register_script(_REDIS_PUSH_SCRIPT)
+        self._promote = self.redis.register_script(_REDIS_PROMOTE_SCRIPT)
+        self._requeue = self.redis.register_script(_REDIS_REQUEUE_SCRIPT)
+
+    def _processing_key(self, consumer: str) -> str:
+        return f"{self.key}:processing:{consumer}"
+
+    def _heartbeat_key(self, consumer: str) -> str:
+        return f"{self.key}:alive:{consumer}"
+
+    async def push(self, session_id: str, attempt: int = 1, delay: float = 0) -> bool:
+        job = json.dumps({"session_id": session_id, "attempt": attempt})
+        due = int((time.time() + delay) * 1000) if delay > 0 else 0
+        added = await self._push(
+            keys=[self.key, self.pending_key, self.delayed_key],
+            args=[session_id, job, attempt, due]
+        )
+        return bool(added)
+
+    async def pop(self) -> Optional[Dict[str, Any]]:
+        item = await self.redis.blmove(self.key, self.processing_key, POP_TIMEOUT, "RIGHT", "LEFT")
+        if item is None:
+            return None
+        job = json.loads(item)
+        job["raw"] = item
+        await self.redis.srem(self.pending_key, job["session_id"])
+        return job
+
+    async def ack(self, job: Dict[str, Any]):
+        """Drop a finished (or rescheduled) job from the processing list"""
+        await self.redis.lrem(self.processing_key, 1, job["raw"])
+
+    async def maintain(self):
+        """Refresh this consumer's heartbeat, promote due retries and requeue dead consumers' jobs"""
+        await self.redis.set(self._heartbeat_key(self.consumer), 1, ex=CONSUMER_TTL)
+        await self.redis.sadd(self.consumers_key, self.consumer)
+        await self._promote(keys=[self.delayed_key, self.key], args=[int(time.time() * 1000)])
+
+        for member in await self.redis.smembers(self.consumers_key):
+            consumer = member.decode() if isinstance(member, bytes) else member
+            if consumer == self.consumer or await self.redis.exists(self._heartbeat_key(consumer)):
+                continue
+            moved = await self._requeue(
+                keys=[self._processing_key(consumer), self.key, self.consumers_key],
+                args=[consumer]
+            )
+            if moved:
+                logger.warning("Requeued %d summary jobs of stopped worker %s", moved, consumer)
+
+    async def size(self) -> int:
+        return await self.redis.llen(self.key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+async def summarize_session(session_id: str) -> bool:
+    """
+    Summarize and save one session unless it already has a summary
+
+    Returns:
+        True if a summary was generated, False if the session was skipped
+    """
+    if await db.list_interview_summaries([session_id]):
+        return False
+
+    transcript = await load_session_transcript(session_id)
+    if transcript is None:
+        return False
+
+    summary = await summarize_transcript(transcript.transcript, priority=Priority.BATCH)
+    await db.upsert_interview_summary(summary_row(session_id, summary))
+    return True
+
+
+class SummaryQueue:
+    """Queue front-end with a fixed pool of summarization workers"""
+
+    def __init__(self, backend, workers: int = DEFAULT_WORKERS):
+        """
+        Initialize the queue
+
+        Args:
+            backend: InMemoryQueue or RedisQueue
+            workers: Worker tasks started by start(); bounds concurrent summaries
+        """
+        self.backend = backend
+        self.workers = workers
+        self._tasks: List[asyncio.Task] = []
+        self._running = 0
+        self._stats = {"enqueued": 0, "duplicates": 0, "completed": 0, "skipped": 0, "retried": 0, "failed": 0}
+
+    async def enqueue(self, session_id: str):
+        """Queue a finished session for summarization; never raises"""
+        try:
+            if await self.backend.push(session_id):
+                self._stats["enqueued"] += 1
+            else:
+                self._stats["duplicates"] += 1
+        except Exception as e:
+            logger.warning("Could not enqueue summary for session %s: %s", session_id, e)
+
+    async def _work(self):
+        while True:
+            try:
+                job = await self.backend.pop()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Summary queue read failed: %s", e)
+                await asyncio.sleep(POP_TIMEOUT)
+                continue
+            if job is None:
+                continue
+
+            session_id, attempt = job["session_id"], job.get("attempt", 1)
+            self._running += 1
+            try:
+                if await summarize_session(session_id):
+                    self._stats["completed"] += 1
+                else:
+                    self._stats["skipped"] += 1
+            except Exception as e:
+                logger.warning("Summary for session %s failed (attempt %d): %s", session_id, attempt, e)
+                if attempt < MAX_ATTEMPTS:
+                    self._stats["retried"] += 1
+                    await self._retry(session_id, attempt + 1)
+                else:
+                    self._stats["failed"] += 1
+            finally:
+                self._running -= 1
+
+            try:
+                await self.backend.ack(job)
+            except Exception as e:
+                logger.warning("Could not acknowledge summary job for session %s: %s", session_id, e)
+
+    async def _retry(self, session_id: str, attempt: int):
+        try:
+            await self.backend.push(session_id, attempt, delay=retry_delay(attempt))
+        except Exception as e:
+            self._stats["failed"] += 1
+            logger.warning("Could not schedule summary retry for session %s: %s", session_id, e)
+
+    async def _maintain(self):
+        while True:
+            try:
+                await self.backend.maintain()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Summary queue maintenance failed: %s", e)
+            await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+    def start(self):
+        """Start the worker tasks (idempotent)"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._maintain())]
+            self._tasks += [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """
+        Stop the workers. Summaries in progress are abandoned: with Redis, another worker
+        requeues them once this process's heartbeat expires; otherwise they rerun on demand.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def get_stats(self) -> Dict[str, Any]:
+        try:
+            queued = await self.backend.size()
+        except Exception:
+            queued = None
+        return {
+            **self.backend.get_stats(),
+            **self._stats,
+            "workers": self.workers,
+            "running": self._running,
+            "queued": queued,
+        }
+
+
+# Singleton instance
+_summary_queue: Optional[SummaryQueue] = None
+
+
+def get_summary_queue() -> SummaryQueue:
+    """
+    Get or create the summary queue
+
+    SUMMARY_QUEUE_BACKEND selects "memory" (default) or "redis" (shared via REDIS_URL).
+    SUMMARY_WORKERS sets the number of workers per process.
+    """
+    global _summary_queue
+    if _summary_queue is None:
+        backend_name = os.getenv("SUMMARY_QUEUE_BACKEND", "memory").lower()
+        redis_url = os.getenv("REDIS_URL")
+        if backend_name == "redis" and redis_url:
+            backend = RedisQueue(redis_url)
+        else:
+            if backend_name == "redis":
+                logger.warning("SUMMARY_QUEUE_BACKEND=redis but REDIS_URL is not set; using in-process queue")
+            backend = InMemoryQueue()
+        _summary_queue = SummaryQueue(backend, workers=int(os.getenv("SUMMARY_WORKERS", DEFAULT_WORKERS)))
+    return _summary_queue
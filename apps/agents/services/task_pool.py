@@ -0,0 +1,102 @@
+"""
+Task Pool Service
+
+Bounded pool for fire-and-forget work that should not block a live interview turn,
+such as quality scoring. Submitted coroutines run as background tasks, at most
+`max_concurrency` at a time, and can be drained before a session shuts down.
+"""
+
+import os
+import asyncio
+import logging
+from typing import Dict, Any, Optional, Awaitable, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class TaskPool:
+    """Runs background coroutines with bounded concurrency"""
+
+    def __init__(self, name: str, max_concurrency: int):
+        """
+        Initialize the pool
+
+        Args:
+            name: Name used in logs and metrics
+            max_concurrency: Max coroutines running at once; the rest wait their turn
+        """
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks = set()
+        self._running = 0
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0}
+
+    def submit(self, coro: Awaitable[Any]) -> asyncio.Task:
+        """
+        Schedule a coroutine in the background
+
+        Args:
+            coro: Coroutine to run; its exceptions are logged, never raised to the submitter
+
+        Returns:
+            The task, so callers can wait on their own work
+        """
+        task = asyncio.create_task(self._run(coro))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self._stats["submitted"] += 1
+        return task
+
+    async def _run(self, coro: Awaitable[Any]) -> Any:
+        async with self._semaphore:
+            self._running += 1
+            try:
+                result = await coro
+                self._stats["completed"] += 1
+                return result
+            except Exception as e:
+                self._stats["failed"] += 1
+                logger.warning("%s task failed: %s", self.name, e)
+            finally:
+                self._running -= 1
+
+    async def drain(self, tasks: Optional[Iterable[asyncio.Task]] = None, timeout: Optional[float] = None):
+        """
+        Wait for submitted work to finish
+
+        Args:
+            tasks: Only wait for these tasks (default: everything in the pool)
+            timeout: Give up waiting after this many seconds; unfinished tasks keep running
+        """
+        pending = [t for t in (tasks if tasks is not None else self._tasks) if not t.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "max_concurrency": self.max_concurrency,
+            "running": self._running,
+            "queued": len(self._tasks) - self._running,
+        }
+
+
+# Named pool instances
+_pools: Dict[str, TaskPool] = {}
+
+
+def get_task_pool(name: str) -> TaskPool:
+    """
+    Get or create a named pool
+
+    Concurrency comes from `<NAME>_CONCURRENCY` (e.g. QUALITY_SCORING_CONCURRENCY), default 8.
+    """
+    if name not in _pools:
+        max_concurrency = int(os.getenv(f"{name.upper()}_CONCURRENCY", "8"))
+        _pools[name] = TaskPool(name, max_concurrency)
+    return _pools[name]
+
+
+def get_task_pool_stats() -> Dict[str, Any]:
+    return {name: pool.get_stats() for name, pool in _pools.items()}
@@ -0,0 +1,86 @@
+"""
+Token Counting Service
+
+Token counts and token-budgeted batching for prompts. Uses tiktoken when it is installed
+and falls back to a ~4 characters per token estimate otherwise.
+"""
+
+from functools import lru_cache
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=16)
+def _encoding(model: str):
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    Count the tokens in a piece of text
+
+    Args:
+        text: Text to count
+        model: Model whose tokenizer to use
+
+    Returns:
+        Token count (estimated when tiktoken is unavailable)
+    """
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4o") -> str:
+    """Cut text down to at most max_tokens tokens"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def pack_by_tokens(texts: List[str], budget: int, model: str = "gpt-4o") -> List[List[str]]:
+    """
+    Greedily group texts, in order, into batches whose combined size fits a token budget
+
+    Args:
+        texts: Texts to group
+        budget: Max tokens per batch; a single larger text is truncated to fit
+        model: Model whose tokenizer to use
+
+    Returns:
+        List of batches
+    """
+    batches: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+
+    for text in texts:
+        size = count_tokens(text, model)
+        if size > budget:
+            text = truncate_to_tokens(text, budget, model)
+            size = budget
+
+        if current and used + size > budget:
+            batches.append(current)
+            current, used = [], 0
+
+        current.append(text)
+        used += size
+
+    if current:
+        batches.append(current)
+    return batches
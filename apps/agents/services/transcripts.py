@@ -0,0 +1,76 @@
+"""
+Transcript Loader Service
+
+Streams per-session interview transcripts for a study, a research question or a single
+session. Transcripts are assembled in the database by the session_transcripts function
+("Q: ...\\nA: ..." per answered turn, in turn order, empty and [SKIPPED] answers left out)
+and read in pages keyed on session id, so only ready-to-use text crosses the network and
+memory is bounded by one page regardless of how many sessions there are.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, AsyncIterator
+from services import database as db
+
+
+@dataclass
+class SessionTranscript:
+    """Assembled transcript of one session"""
+    session_id: str
+    transcript: str
+    answered_turns: int
+    completed_at: Optional[str] = None
+
+
+async def iter_session_transcripts(
+    study_id: Optional[str] = None,
+    research_question_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    completed_only: bool = False,
+    completed_since: Optional[str] = None,
+    unsummarized_only: bool = False,
+    page_size: int = db.TRANSCRIPT_PAGE_SIZE
+) -> AsyncIterator[SessionTranscript]:
+    """
+    Stream transcripts session by session
+
+    Args:
+        study_id: Sessions of this study
+        research_question_id: Sessions of this research question
+        session_id: Just this session
+        completed_only: Only sessions with status 'completed'
+        completed_since: Only sessions completed at or after this timestamp
+        unsummarized_only: Only sessions without a saved interview summary
+        page_size: Sessions fetched per call
+
+    Yields:
+        One SessionTranscript per session with at least one answered turn, ordered by session id
+    """
+    if not (study_id or research_question_id or session_id):
+        raise ValueError("A study, research question or session is required")
+
+    params: Dict[str, Any] = {
+        "p_study_id": study_id,
+        "p_research_question_id": research_question_id,
+        "p_session_id": session_id,
+        "p_completed_only": completed_only,
+        "p_completed_since": completed_since,
+        "p_unsummarized_only": unsummarized_only,
+    }
+
+    async for page in db.iter_session_transcript_pages(params, page_size):
+        for row in page:
+            yield SessionTranscript(
+                session_id=row["session_id"],
+                transcript=row["transcript"] or "",
+                answered_turns=row.get("answered_turns") or 0,
+                completed_at=row.get("completed_at")
+            )
+
+
+async def load_session_transcript(session_id: str) -> Optional[SessionTranscript]:
+    """Transcript of one session, or None if it has no answered turns"""
+    result = None
+    async for transcript in iter_session_transcripts(session_id=session_id):
+        result = transcript
+    return result
@@ -0,0 +1,187 @@
+"""
+Voice Activity Detection Service
+
+CPU-only voice activity detection and end-of-turn detection over the 24kHz PCM16 answer
+stream of the simple interview. Each chunk is cut into 20ms frames and features are
+computed for all frames at once with NumPy:
+
+    energy     frame RMS in dBFS, compared to an adaptive noise floor
+    band ratio share of spectral energy in the 80-4000Hz voice band
+    flatness   spectral flatness; noise is flat, voiced speech is peaky
+
+A turn ends once the participant has spoken and then stayed silent for the silence
+threshold. The threshold adapts per participant: pauses inside their answers (silences
+followed by more speech) are tracked, so fast talkers get short endpoints and people who
+pause to think are not cut off.
+"""
+
+import os
+from typing import Optional
+import numpy as np
+from services.audio_frames import SAMPLE_RATE
+
+FRAME_MS = 20
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+SPEECH_STARTED = "speech_started"
+END_OF_TURN = "end_of_turn"
+
+# Frame classification
+ENERGY_MARGIN_DB = 10.0  # Above the noise floor
+MIN_SPEECH_DB = -50.0  # Absolute floor, dBFS
+MIN_BAND_RATIO = 0.5
+MAX_FLATNESS = 0.5
+NOISE_FLOOR_START_DB = -60.0
+NOISE_FLOOR_ALPHA = 0.05
+
+# Turn segmentation
+SPEECH_START_FRAMES = 3  # Consecutive speech frames before speech counts as started
+MIN_TURN_SPEECH_MS = 300  # Speech needed before a turn can end
+MIN_PAUSE_MS = 150  # Shorter gaps are not counted as pauses
+PAUSE_EMA_ALPHA = 0.3
+PAUSE_FACTOR = 2.0  # Silence threshold as a multiple of the participant's typical pause
+
+DEFAULT_SILENCE_MS = 800
+DEFAULT_MIN_SILENCE_MS = 500
+DEFAULT_MAX_SILENCE_MS = 2000
+
+_window = np.hanning(FRAME_SAMPLES).astype(np.float32)
+_freqs = np.fft.rfftfreq(FRAME_SAMPLES, 1 / SAMPLE_RATE)
+_speech_band = (_freqs >= 80) & (_freqs <= 4000)
+
+
+def frame_features(samples: np.ndarray):
+    """
+    Per-frame features of a block of frames
+
+    Args:
+        samples: (frames, FRAME_SAMPLES) float32 samples in [-1, 1]
+
+    Returns:
+        Tuple of (energy dBFS, speech band ratio, spectral flatness), one value per frame
+    """
+    energy_db = 10 * np.log10(np.mean(samples ** 2, axis=1) + 1e-10)
+    power = np.abs(np.fft.rfft(samples * _window, axis=1)) ** 2 + 1e-12
+    total = power.sum(axis=1)
+    band_ratio = power[:, _speech_band].sum(axis=1) / total
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / (total / power.shape[1])
+    return energy_db, band_ratio, flatness
+
+
+class VoiceActivityDetector:
+    """End-of-turn detection for one participant; keeps its adaptation across turns"""
+
+    def __init__(
+        self,
+        silence_ms: Optional[int] = None,
+        min_silence_ms: Optional[int] = None,
+        max_silence_ms: Optional[int] = None
+    ):
+        """
+        Initialize the detector
+
+        Args:
+            silence_ms: Silence that ends a turn before the participant's pauses are known (VAD_SILENCE_MS)
+            min_silence_ms: Lower bound of the adaptive threshold (VAD_MIN_SILENCE_MS)
+            max_silence_ms: Upper bound of the adaptive threshold (VAD_MAX_SILENCE_MS)
+        """
+        self.min_silence_ms = min_silence_ms or int(os.getenv("VAD_MIN_SILENCE_MS", DEFAULT_MIN_SILENCE_MS))
+        self.max_silence_ms = max_silence_ms or int(os.getenv("VAD_MAX_SILENCE_MS", DEFAULT_MAX_SILENCE_MS))
+        self.initial_silence_ms = silence_ms or int(os.getenv("VAD_SILENCE_MS", DEFAULT_SILENCE_MS))
+        self.noise_floor_db = NOISE_FLOOR_START_DB
+        self.pause_ms: Optional[float] = None  # EMA of the participant's pauses inside answers
+        self.start_turn()
+
+    @property
+    def silence_ms(self) -> int:
+        """Silence that currently ends a turn"""
+        if self.pause_ms is None:
+            target = self.initial_silence_ms
+        else:
+            target = self.pause_ms * PAUSE_FACTOR
+        return int(min(max(target, self.min_silence_ms), self.max_silence_ms))
+
+    def start_turn(self):
+        """Reset per-turn state; call when the participant starts answering"""
+        self._remainder = np.zeros(0, dtype=np.int16)
+        self._frame = 0  # Frames processed this turn
+        self._speech_run = 0  # Consecutive speech frames
+        self._last_speech_frame = 0  # Last frame of confirmed speech
+        self.in_speech = False
+        self.speech_ms = 0
+        self.ended = False
+
+    def process(self, chunk: bytes) -> Optional[str]:
+        """
+        Feed the next chunk of the answer
+
+        Args:
+            chunk: Raw 24kHz mono PCM16 audio
+
+        Returns:
+            SPEECH_STARTED the first time speech is detected in the turn, END_OF_TURN once the
+            participant has been silent long enough after speaking, otherwise None
+        """
+        if self.ended:
+            return None
+
+        pcm = np.frombuffer(chunk, dtype=np.int16, count=len(chunk) // 2)
+        if self._remainder.size:
+            pcm = np.concatenate([self._remainder, pcm])
+        frames = pcm.size // FRAME_SAMPLES
+        self._remainder = pcm[frames * FRAME_SAMPLES:].copy()
+        if frames == 0:
+            return None
+
+        samples = pcm[:frames * FRAME_SAMPLES].reshape(frames, FRAME_SAMPLES).astype(np.float32) / 32768
+        energy_db, band_ratio, flatness = frame_features(samples)
+        is_speech = (
+            (energy_db > max(self.noise_floor_db + ENERGY_MARGIN_DB, MIN_SPEECH_DB))
+            & (band_ratio > MIN_BAND_RATIO)
+            & (flatness < MAX_FLATNESS)
+        )
+
+        # Track the noise floor on non-speech frames; drop immediately to quieter frames
+        noise = energy_db[~is_speech]
+        if noise.size:
+            self.noise_floor_db = min(
+                float(noise.min()),
+                (1 - NOISE_FLOOR_ALPHA) * self.noise_floor_db + NOISE_FLOOR_ALPHA * float(noise.mean())
+            )
+
+        event = None
+        for speech in is_speech:
+            self._frame += 1
+            if not speech:
+                self._speech_run = 0
+                silence_ms = (self._frame - self._last_speech_frame) * FRAME_MS
+                if self.in_speech and self.speech_ms >= MIN_TURN_SPEECH_MS and silence_ms >= self.silence_ms:
+                    self.ended = True
+                    return END_OF_TURN
+                continue
+
+            # Short blips (clicks, breaths) do not count as speech
+            self._speech_run += 1
+            if self._speech_run < SPEECH_START_FRAMES:
+                continue
+            if self._speech_run == SPEECH_START_FRAMES:
+                run_start = self._frame - SPEECH_START_FRAMES + 1
+                if not self.in_speech:
+                    self.in_speech = True
+                    event = SPEECH_STARTED
+                else:
+                    self._record_pause((run_start - self._last_speech_frame - 1) * FRAME_MS)
+                self.speech_ms += FRAME_MS * SPEECH_START_FRAMES
+            else:
+                self.speech_ms += FRAME_MS
+            self._last_speech_frame = self._frame
+        return event
+
+    def _record_pause(self, pause_ms: int):
+        """A silence inside the answer ended with more speech"""
+        if pause_ms < MIN_PAUSE_MS:
+            return
+        if self.pause_ms is None:
+            self.pause_ms = float(pause_ms)
+        else:
+            self.pause_ms = (1 - PAUSE_EMA_ALPHA) * self.pause_ms + PAUSE_EMA_ALPHA * pause_ms
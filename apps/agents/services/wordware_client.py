@@ -3,24 +3,31 @@ Wordware AI Client Service
 
 This module provides a client for interacting with Wordware AI's API.
 Wordware allows you to create AI agents (WordApps) that can be called via API.
+One pooled HTTP/2 connection is kept alive for the whole process, and WordApp output
+streams are parsed line by line as they arrive instead of being buffered.
 """
 
 import os
 import httpx
 import json
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import logging
+from typing import Dict, Any, Optional, List, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONNECTIONS = 10
 
 
 class WordwareClient:
     """Client for interacting with Wordware AI API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, max_connections: Optional[int] = None):
         """
         Initialize Wordware client
         
         Args:
             api_key: Wordware API key. If not provided, will use WORDWARE_API_KEY env var
+            max_connections: Size of the HTTP connection pool (WORDWARE_MAX_CONNECTIONS)
         """
         self.api_key = api_key or os.getenv("WORDWARE_API_KEY")
         if not self.api_key:
@@ -28,70 +35,93 @@ class WordwareClient:
         
         self.base_url = "https://app.wordware.ai/api"
         self.timeout = 120.0  # 2 minutes timeout for long-running analysis
+        self.max_connections = max_connections or int(
+            os.getenv("WORDWARE_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)
+        )
+        self._http_client: Optional[httpx.AsyncClient] = None
     
-    async def run_wordapp(
-        self, 
-        app_id: str, 
-        inputs: Dict[str, Any], 
+    def _client(self) -> httpx.AsyncClient:
+        """Shared keep-alive client, created on first use"""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json"
+                },
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=10.0),
+                http2=True
+            )
+        return self._http_client
+    
+    async def stream_wordapp(
+        self,
+        app_id: str,
+        inputs: Dict[str, Any],
         version: str = "^1.0"
-    ) -> Dict[str, Any]:
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Run a Wordware WordApp
+        Run a Wordware WordApp and yield its stream events as they arrive
         
         Args:
             app_id: The ID of the deployed WordApp
             inputs: Dictionary of inputs for the WordApp
             version: Version of the WordApp to use (default: ^1.0 for latest minor version)
             
-        Returns:
-            Dictionary containing the WordApp response
+        Yields:
+            Each parsed JSON line of the response stream; lines that are not JSON are skipped
         """
-        url = f"{self.base_url}/released-app/{app_id}/run"
-        
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "inputs": inputs,
             "version": version
         }
         
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(url, json=payload, headers=headers)
+        async with self._client().stream("POST", f"/released-app/{app_id}/run", json=payload) as response:
+            if response.is_error:
+                await response.aread()
             response.raise_for_status()
             
-            # Wordware returns streaming responses, we'll collect all chunks
-            result = await self._collect_streaming_response(response)
-            return result
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    # Wordware sends JSON chunks
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.debug("Skipping non-JSON Wordware stream line")
     
-    async def _collect_streaming_response(self, response: httpx.Response) -> Dict[str, Any]:
+    async def run_wordapp(
+        self, 
+        app_id: str, 
+        inputs: Dict[str, Any], 
+        version: str = "^1.0"
+    ) -> Dict[str, Any]:
         """
-        Collect and parse streaming response from Wordware
+        Run a Wordware WordApp
         
         Args:
-            response: The HTTP response object
+            app_id: The ID of the deployed WordApp
+            inputs: Dictionary of inputs for the WordApp
+            version: Version of the WordApp to use (default: ^1.0 for latest minor version)
             
         Returns:
-            Parsed response data
+            The last stream event, which typically contains the final output
         """
-        collected_data = []
-        
-        async for line in response.aiter_lines():
-            if line.strip():
-                try:
-                    # Wordware sends JSON chunks
-                    chunk = json.loads(line)
-                    collected_data.append(chunk)
-                except json.JSONDecodeError:
-                    continue
-        
-        # Return the last chunk which typically contains the final output
-        if collected_data:
-            return collected_data[-1]
-        
-        return {}
+        # Only the latest event is kept, so memory stays constant however long the stream
+        result: Dict[str, Any] = {}
+        async for event in self.stream_wordapp(app_id, inputs, version):
+            result = event
+        return result
+    
+    async def close(self):
+        """Close the shared connection pool"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
     
     async def generate_aggregate_summary(
         self,
@@ -152,3 +182,9 @@ def get_wordware_client() -> WordwareClient:
     if _wordware_client is None:
         _wordware_client = WordwareClient()
     return _wordware_client
+
+
+async def close_wordware_client():
+    """Close the singleton's connection pool if it was ever created"""
+    if _wordware_client is not None:
+        await _wordware_client.close()
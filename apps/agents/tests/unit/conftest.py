@@ -0,0 +1,11 @@
+"""
+Unit tests for the agents services. Unlike the scripts in tests/, they need no running
+server, database or API keys:
+
+    python -m pytest tests/unit
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
@@ -0,0 +1,84 @@
+import json
+import asyncio
+from types import SimpleNamespace
+from services import aggregate_analyzer
+from services.aggregate_analyzer import _merge_chunks, _percentage
+
+
+class FakeGateway:
+    def __init__(self, output):
+        self.output = output
+        self.prompts = []
+
+    async def chat_completion(self, **kwargs):
+        self.prompts.append(kwargs["messages"][-1]["content"])
+        message = SimpleNamespace(content=json.dumps(self.output))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+CHUNKS = [
+    {
+        "sessions": 10,
+        "statistics": [
+            {"description": "Carry a bottle all day", "count": 4},
+            {"description": "Refill at work", "count": 3},
+        ],
+        "pros": ["Durable"],
+        "cons": ["Heavy"],
+    },
+    {
+        "sessions": 30,
+        "statistics": [{"description": "Use a bottle for hours", "count": 15}],
+        "pros": ["Eco-friendly"],
+        "cons": [],
+    },
+]
+
+
+def merge(output, monkeypatch):
+    gateway = FakeGateway(output)
+    monkeypatch.setattr(aggregate_analyzer, "get_llm_gateway", lambda: gateway)
+    return asyncio.run(_merge_chunks("Do you use a water bottle?", CHUNKS)), gateway
+
+
+def test_percentages_are_weighted_by_sessions(monkeypatch):
+    result, gateway = merge({
+        "statistics": [
+            {"description": "Use a bottle for hours", "sources": ["c0s0", "c1s0"]},
+            {"description": "Refill at work", "sources": ["c0s1"]},
+        ],
+        "pros": ["Durable", "Eco-friendly"],
+        "cons": ["Heavy"],
+    }, monkeypatch)
+
+    # (4 + 15) of 40 sessions, not the mean of 40% and 50%
+    assert result["statistics"] == [
+        {"percentage": "48%", "description": "Use a bottle for hours"},
+        {"percentage": "8%", "description": "Refill at work"},
+    ]
+    assert "c0s0: Carry a bottle all day (4/10 interviews)" in gateway.prompts[0]
+
+
+def test_one_statistic_per_chunk_counts_towards_a_group(monkeypatch):
+    result, _ = merge({
+        "statistics": [{"description": "Bottle habits", "sources": ["c0s0", "c0s1"]}],
+    }, monkeypatch)
+
+    # Both sources are from chunk 0: the larger count is used instead of 4 + 3
+    assert result["statistics"] == [{"percentage": "10%", "description": "Bottle habits"}]
+
+
+def test_groups_without_known_sources_are_dropped(monkeypatch):
+    result, _ = merge({
+        "statistics": [{"description": "Invented", "sources": ["c9s9", "bogus"]}],
+    }, monkeypatch)
+
+    assert result["statistics"] == []
+    # Pros and cons fall back to the concatenated chunk lists
+    assert result["pros"] == ["Durable", "Eco-friendly"]
+    assert result["cons"] == ["Heavy"]
+
+
+def test_percentage_of_no_sessions():
+    assert _percentage(0, 0) == "0%"
+    assert _percentage(1, 3) == "33%"
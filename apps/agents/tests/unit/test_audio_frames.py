@@ -0,0 +1,90 @@
+import asyncio
+import base64
+import json
+import pytest
+from starlette.websockets import WebSocket
+from services.audio_frames import (
+    AudioChannel, AudioFormat, AudioFrame, FrameError, FrameKind,
+    FRAME_HEADER, FRAME_VERSION, decode_frame, encode_frame,
+)
+
+
+def test_frame_round_trip():
+    frame = AudioFrame(FrameKind.AUDIO_CHUNK, b"\x01\x02\x03", AudioFormat.OPUS, seq=70000)
+    data = encode_frame(frame)
+
+    assert len(data) == FRAME_HEADER.size + 3
+    assert data[:4] == bytes([FRAME_VERSION, FrameKind.AUDIO_CHUNK, AudioFormat.OPUS, 0])
+    assert decode_frame(data) == frame
+
+
+def test_empty_payload_round_trip():
+    frame = AudioFrame(FrameKind.AUDIO, b"")
+    assert decode_frame(encode_frame(frame)) == frame
+
+
+@pytest.mark.parametrize("data", [
+    b"\x01\x02",                                              # shorter than the header
+    bytes([FRAME_VERSION + 1, 1, 1, 0]) + bytes(4),           # unknown version
+    bytes([FRAME_VERSION, 99, 1, 0]) + bytes(4),              # unknown kind
+    bytes([FRAME_VERSION, 1, 99, 0]) + bytes(4),              # unknown format
+])
+def test_malformed_frames_are_rejected(data):
+    with pytest.raises(FrameError):
+        decode_frame(data)
+
+
+def channel(framing, inbound):
+    """Accepted channel whose client sends `inbound`; returns (channel, sent messages)"""
+    events = [{"type": "websocket.connect"}] + inbound + [{"type": "websocket.disconnect", "code": 1000}]
+    sent = []
+
+    async def receive():
+        return events.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    websocket = WebSocket({"type": "websocket", "path": "/", "headers": []}, receive, send)
+    return websocket, AudioChannel(websocket, framing), sent
+
+
+def test_binary_and_json_receive_the_same_message():
+    audio = b"\x00\x01" * 100
+
+    async def run():
+        ws_bin, binary, _ = channel("binary", [
+            {"type": "websocket.receive", "bytes": encode_frame(AudioFrame(FrameKind.AUDIO_PARTIAL, audio, seq=4))}
+        ])
+        ws_json, text, _ = channel("json", [{
+            "type": "websocket.receive",
+            "text": json.dumps({"type": "audio_partial", "seq": 4, "data": base64.b64encode(audio).decode()})
+        }])
+        await ws_bin.accept()
+        await ws_json.accept()
+        return await binary.receive(), await text.receive()
+
+    from_binary, from_json = asyncio.run(run())
+    assert from_binary == {"type": "audio_partial", "audio": audio, "seq": 4}
+    assert {k: from_json[k] for k in ("type", "audio", "seq")} == from_binary
+
+
+def test_send_audio_in_negotiated_framing():
+    async def run():
+        ws_bin, binary, sent_bin = channel("binary", [])
+        ws_json, text, sent_json = channel("json", [])
+        await ws_bin.accept()
+        await ws_json.accept()
+        await binary.send_audio(FrameKind.AUDIO_COMPLETE, b"abc", AudioFormat.OPUS)
+        await text.send_audio(FrameKind.AUDIO_COMPLETE, b"abc", AudioFormat.OPUS)
+        return sent_bin[-1], sent_json[-1]
+
+    bin_message, json_message = asyncio.run(run())
+    assert decode_frame(bin_message["bytes"]) == AudioFrame(FrameKind.AUDIO_COMPLETE, b"abc", AudioFormat.OPUS)
+    payload = json.loads(json_message["text"])
+    assert payload == {"type": "audio_complete", "seq": 0, "data": base64.b64encode(b"abc").decode(), "format": "opus"}
+
+
+def test_unknown_framing_falls_back_to_json():
+    _, audio_channel, _ = channel("protobuf", [])
+    assert audio_channel.framing == "json"
@@ -0,0 +1,119 @@
+import asyncio
+import httpx
+import openai
+import pytest
+from services import call_policy
+from services.call_policy import CallPolicy, PolicyRunner, is_retryable
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(call_policy.random, "uniform", lambda low, high: 0.0)
+
+
+def rate_limit_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, request=request)
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+def flaky(failures, error_factory, result="ok"):
+    calls = {"count": 0}
+
+    async def call():
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise error_factory()
+        return result
+
+    return call, calls
+
+
+def test_is_retryable():
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(rate_limit_error())
+    assert not is_retryable(ValueError("bad request"))
+
+
+def test_retries_transient_errors():
+    runner = PolicyRunner({"chat": CallPolicy(max_retries=2)})
+    call, calls = flaky(2, rate_limit_error)
+
+    assert asyncio.run(runner.run("chat", call)) == "ok"
+    assert calls["count"] == 3
+    assert runner.get_stats()["chat"]["retries"] == 2
+
+
+def test_gives_up_after_max_retries():
+    runner = PolicyRunner({"chat": CallPolicy(max_retries=1)})
+    call, calls = flaky(5, rate_limit_error)
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(runner.run("chat", call))
+    assert calls["count"] == 2
+    assert runner.get_stats()["chat"]["failures"] == 1
+
+
+def test_does_not_retry_permanent_errors():
+    runner = PolicyRunner({"chat": CallPolicy(max_retries=3)})
+    call, calls = flaky(1, lambda: ValueError("bad request"))
+
+    with pytest.raises(ValueError):
+        asyncio.run(runner.run("chat", call))
+    assert calls["count"] == 1
+
+
+def test_attempt_timeout_is_retried():
+    runner = PolicyRunner({"chat": CallPolicy(timeout=0.05, deadline=5, max_retries=1)})
+    calls = {"count": 0}
+
+    async def call():
+        calls["count"] += 1
+        if calls["count"] == 1:
+            await asyncio.sleep(1)
+        return "ok"
+
+    assert asyncio.run(runner.run("chat", call)) == "ok"
+    assert runner.get_stats()["chat"]["timeouts"] == 1
+
+
+def test_hedge_fires_for_slow_attempt_and_wins():
+    policy = CallPolicy(timeout=2, hedge=True, hedge_min_samples=3, hedge_min_delay=0.01)
+    runner = PolicyRunner({"chat": policy})
+    for _ in range(3):
+        runner._tracker("chat").record(0.02)
+
+    calls = {"count": 0}
+
+    async def call():
+        calls["count"] += 1
+        if calls["count"] == 1:
+            await asyncio.sleep(1)
+            return "primary"
+        return "hedge"
+
+    assert asyncio.run(runner.run("chat", call)) == "hedge"
+    stats = runner.get_stats()["chat"]
+    assert (stats["hedges_fired"], stats["hedges_won"]) == (1, 1)
+
+
+def test_no_hedge_before_enough_samples():
+    policy = CallPolicy(timeout=2, hedge=True, hedge_min_samples=20, hedge_min_delay=0.01)
+    runner = PolicyRunner({"chat": policy})
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return "ok"
+
+    assert asyncio.run(runner.run("chat", call)) == "ok"
+    assert runner.get_stats()["chat"]["hedges_fired"] == 0
+
+
+def test_env_overrides(monkeypatch):
+    monkeypatch.setenv("LLM_CALL_POLICIES", '{"question": {"timeout": 5, "hedge": false}, "custom": {"max_retries": 0}}')
+    runner = PolicyRunner()
+
+    assert runner.policy("question").timeout == 5
+    assert runner.policy("question").hedge is False
+    assert runner.policy("custom").max_retries == 0
+    assert runner.policy("unknown") == runner.policy("chat")
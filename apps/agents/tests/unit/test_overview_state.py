@@ -0,0 +1,59 @@
+from services.overview_state import OverviewState, QUOTES_PER_SESSION
+
+
+def summary(sentiment="positive", themes=("Pricing",), quotes=("q1", "q2", "q3"), insights=("i1",)):
+    return {
+        "sentiment": sentiment,
+        "themes": list(themes),
+        "notable_quotes": list(quotes),
+        "key_insights": list(insights),
+        "positive_feedback": ["p"],
+        "negative_feedback": [],
+    }
+
+
+def test_diff_finds_added_changed_and_removed_sessions():
+    state = OverviewState()
+    state.add("a", summary())
+    state.add("b", summary())
+    state.add("c", summary())
+
+    added, changed, removed = state.diff({
+        "a": summary(),
+        "b": summary(sentiment="negative"),
+        "d": summary(),
+    })
+
+    assert (added, changed, removed) == (["d"], ["b"], ["c"])
+
+
+def test_diff_is_empty_when_nothing_changed():
+    state = OverviewState()
+    state.add("a", summary())
+    assert state.diff({"a": summary()}) == ([], [], [])
+
+
+def test_diff_survives_a_save_and_restore():
+    state = OverviewState()
+    state.add("a", summary())
+    restored = OverviewState.from_report_data(state.to_report_data())
+
+    assert restored.diff({"a": summary()}) == ([], [], [])
+    assert restored.diff({"a": summary(themes=("Shipping",))}) == ([], ["a"], [])
+
+
+def test_add_and_remove_keep_tallies_consistent():
+    state = OverviewState()
+    state.add("a", summary(themes=("Pricing", " pricing ", "Shipping")))
+    state.add("b", summary(sentiment="negative", themes=("Pricing",)))
+
+    assert state.theme_counts == {"pricing": 2, "shipping": 1}
+    assert state.sentiment_counts["positive"] == 1
+    assert len([q for q in state.quotes if q["session_id"] == "a"]) == QUOTES_PER_SESSION
+
+    state.remove("a")
+
+    assert state.theme_counts == {"pricing": 1}
+    assert state.sentiment_counts["positive"] == 0
+    assert all(q["session_id"] == "b" for q in state.quotes)
+    assert state.totals()["total_interviews"] == 1
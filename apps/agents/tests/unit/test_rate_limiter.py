@@ -0,0 +1,125 @@
+import asyncio
+import pytest
+from services import rate_limiter
+from services.rate_limiter import LocalBuckets, PriorityRateLimiter, Priority, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def test_estimate_tokens():
+    messages = [{"role": "user", "content": "x" * 400}]
+    assert estimate_tokens(messages, max_tokens=50) == 150
+    assert estimate_tokens(messages) == 600
+
+
+def test_bucket_grants_until_empty_then_reports_wait(clock):
+    buckets = LocalBuckets(rpm=60, tpm=6000)
+
+    async def run():
+        assert await buckets.try_acquire(3000, 0.0) == 0
+        assert await buckets.try_acquire(3000, 0.0) == 0
+        # Empty token bucket refills at 100 tokens/s
+        return await buckets.try_acquire(1000, 0.0)
+
+    assert asyncio.run(run()) == pytest.approx(10.0)
+
+
+def test_bucket_refills_over_time(clock):
+    buckets = LocalBuckets(rpm=60, tpm=6000)
+
+    async def run():
+        await buckets.try_acquire(6000, 0.0)
+        clock.now += 10
+        return await buckets.try_acquire(1000, 0.0)
+
+    assert asyncio.run(run()) == 0
+
+
+def test_reserve_keeps_capacity_for_higher_priorities(clock):
+    buckets = LocalBuckets(rpm=60, tpm=1000)
+
+    async def run():
+        await buckets.try_acquire(700, 0.0)
+        # 300 tokens left: batch (25% reserved) must wait, realtime may use them
+        batch_wait = await buckets.try_acquire(100, 0.25)
+        realtime_wait = await buckets.try_acquire(100, 0.0)
+        return batch_wait, realtime_wait
+
+    batch_wait, realtime_wait = asyncio.run(run())
+    assert batch_wait > 0
+    assert realtime_wait == 0
+
+
+def test_adjust_tokens_refills_before_charging(clock):
+    buckets = LocalBuckets(rpm=60, tpm=6000)
+
+    async def run():
+        await buckets.try_acquire(6000, 0.0)
+        clock.now += 30
+        # 3000 tokens refilled; a 1000-token refund must not be lost to a stale level
+        await buckets.adjust_tokens(-1000)
+        return buckets.level["tokens"]
+
+    assert asyncio.run(run()) == pytest.approx(4000)
+
+
+def test_waiters_are_served_in_priority_order():
+    class ScriptedBuckets:
+        """Refuses until released, then grants one request per call"""
+        def __init__(self):
+            self.open = False
+
+        async def try_acquire(self, tokens, reserve_fraction):
+            return 0.0 if self.open else 0.01
+
+        async def adjust_tokens(self, delta):
+            pass
+
+    async def run():
+        buckets = ScriptedBuckets()
+        limiter = PriorityRateLimiter(buckets)
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire(10, priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.create_task(call("batch", Priority.BATCH)),
+            asyncio.create_task(call("interactive", Priority.INTERACTIVE)),
+            asyncio.create_task(call("realtime", Priority.REALTIME)),
+        ]
+        await asyncio.sleep(0.05)
+        assert order == []
+        buckets.open = True
+        await asyncio.gather(*tasks)
+        return order, limiter.get_stats()
+
+    order, stats = asyncio.run(run())
+    assert order == ["realtime", "interactive", "batch"]
+    assert stats["priorities"]["batch"]["waited"] == 1
+
+
+def test_backend_failure_lets_requests_through():
+    class BrokenBuckets:
+        async def try_acquire(self, tokens, reserve_fraction):
+            raise ConnectionError("redis down")
+
+    async def run():
+        limiter = PriorityRateLimiter(BrokenBuckets())
+        await asyncio.wait_for(limiter.acquire(10, Priority.BATCH), timeout=1)
+
+    asyncio.run(run())
@@ -0,0 +1,69 @@
+import asyncio
+from services import report_reducer
+from services.report_reducer import (
+    MIN_PROMPT_TOKEN_BUDGET, reduce_blocks, render_summary_block, render_synthesis_block, _interview_count,
+)
+from services.tokens import count_tokens
+
+
+def summary(i: int, insight_words: int = 120):
+    return {
+        "sentiment": "positive",
+        "key_insights": [f"Insight {i}: " + "detail " * insight_words],
+        "themes": ["pricing", "shipping"],
+        "positive_feedback": ["fast delivery"],
+        "negative_feedback": ["fees"],
+        "notable_quotes": [f"quote {i}"],
+    }
+
+
+def fake_synthesis(calls, in_flight):
+    async def synthesize(batch):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        calls.append(len(batch))
+        interviews = sum(_interview_count(block) for block in batch)
+        return render_synthesis_block({"key_insights": [f"merged {len(batch)} blocks"]}, interviews)
+
+    return synthesize
+
+
+def test_blocks_carry_interview_counts():
+    assert _interview_count(render_summary_block(summary(1))) == 1
+    assert _interview_count(render_synthesis_block({"themes": [{"name": "pricing", "interviews": 3}]}, 7)) == 7
+    assert _interview_count("no header") == 1
+
+
+def test_reduces_until_blocks_fit_the_budget(monkeypatch):
+    calls, in_flight = [], {"now": 0, "max": 0}
+    monkeypatch.setattr(report_reducer, "_synthesize", fake_synthesis(calls, in_flight))
+    blocks = [render_summary_block(summary(i)) for i in range(40)]
+    assert sum(count_tokens(b) for b in blocks) > MIN_PROMPT_TOKEN_BUDGET
+
+    reduced = asyncio.run(reduce_blocks(blocks, budget=MIN_PROMPT_TOKEN_BUDGET, max_concurrency=2))
+
+    assert sum(count_tokens(b) for b in reduced) <= MIN_PROMPT_TOKEN_BUDGET
+    assert sum(_interview_count(b) for b in reduced) == 40
+    assert calls and in_flight["max"] <= 2
+
+
+def test_blocks_within_budget_are_returned_unchanged(monkeypatch):
+    calls, in_flight = [], {"now": 0, "max": 0}
+    monkeypatch.setattr(report_reducer, "_synthesize", fake_synthesis(calls, in_flight))
+    blocks = [render_summary_block(summary(i, insight_words=5)) for i in range(3)]
+
+    assert asyncio.run(reduce_blocks(blocks, budget=MIN_PROMPT_TOKEN_BUDGET)) == blocks
+    assert calls == []
+
+
+def test_oversized_single_block_is_synthesized(monkeypatch):
+    calls, in_flight = [], {"now": 0, "max": 0}
+    monkeypatch.setattr(report_reducer, "_synthesize", fake_synthesis(calls, in_flight))
+    block = render_summary_block(summary(0, insight_words=10000))
+
+    reduced = asyncio.run(reduce_blocks([block], budget=MIN_PROMPT_TOKEN_BUDGET))
+
+    assert calls == [1]
+    assert count_tokens(reduced[0]) <= MIN_PROMPT_TOKEN_BUDGET
@@ -0,0 +1,68 @@
+import asyncio
+from services.response_cache import make_cache_key, InMemoryLRUBackend, ResponseCache
+
+MESSAGES = [{"role": "system", "content": "Summarize."}, {"role": "user", "content": "Hello"}]
+
+
+def test_key_is_stable_across_dict_ordering():
+    reordered = [{"content": m["content"], "role": m["role"]} for m in MESSAGES]
+    assert make_cache_key("gpt-4o", MESSAGES, 0.3) == make_cache_key("gpt-4o", reordered, 0.3)
+
+
+def test_key_depends_on_every_request_field():
+    base = make_cache_key("gpt-4o", MESSAGES, 0.3, {"type": "json_object"})
+    assert len(base) == 64
+    assert make_cache_key("gpt-4o-mini", MESSAGES, 0.3, {"type": "json_object"}) != base
+    assert make_cache_key("gpt-4o", MESSAGES[:1], 0.3, {"type": "json_object"}) != base
+    assert make_cache_key("gpt-4o", MESSAGES, 0.7, {"type": "json_object"}) != base
+    assert make_cache_key("gpt-4o", MESSAGES, 0.3) != base
+
+
+def test_lru_evicts_least_recently_used():
+    async def run():
+        backend = InMemoryLRUBackend(max_entries=2)
+        await backend.set("a", "1", ttl=60)
+        await backend.set("b", "2", ttl=60)
+        await backend.get("a")
+        await backend.set("c", "3", ttl=60)
+        return [await backend.get(k) for k in "abc"], backend.evictions
+
+    assert asyncio.run(run()) == (["1", None, "3"], 1)
+
+
+def test_lru_bounds_total_bytes():
+    async def run():
+        backend = InMemoryLRUBackend(max_bytes=10)
+        await backend.set("a", "x" * 6, ttl=60)
+        await backend.set("b", "y" * 6, ttl=60)
+        await backend.set("c", "z" * 11, ttl=60)
+        return await backend.get("a"), await backend.get("b"), await backend.get("c"), backend.total_bytes
+
+    assert asyncio.run(run()) == (None, "y" * 6, None, 6)
+
+
+def test_cache_counts_hits_and_survives_backend_errors():
+    class BrokenBackend:
+        async def get(self, key):
+            raise ConnectionError("down")
+
+        async def set(self, key, value, ttl):
+            raise ConnectionError("down")
+
+        def get_stats(self):
+            return {"backend": "broken"}
+
+    async def run():
+        cache = ResponseCache(InMemoryLRUBackend())
+        await cache.set("k", "v")
+        assert await cache.get("k") == "v"
+        assert await cache.get("missing") is None
+
+        broken = ResponseCache(BrokenBackend())
+        await broken.set("k", "v")
+        assert await broken.get("k") is None
+        return cache.get_stats(), broken.errors
+
+    stats, errors = asyncio.run(run())
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert errors == 2
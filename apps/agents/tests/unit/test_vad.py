@@ -0,0 +1,98 @@
+import numpy as np
+from services.audio_frames import SAMPLE_RATE
+from services.vad import VoiceActivityDetector, SPEECH_STARTED, END_OF_TURN, FRAME_MS
+
+CHUNK_MS = 100
+
+
+def voiced(ms: int, amplitude: float = 0.3) -> bytes:
+    """Harmonic tone in the voice band, a stand-in for voiced speech"""
+    t = np.arange(SAMPLE_RATE * ms // 1000) / SAMPLE_RATE
+    wave = sum(np.sin(2 * np.pi * f * t) / (i + 1) for i, f in enumerate((180, 360, 540, 720)))
+    return (wave / np.abs(wave).max() * amplitude * 32767).astype(np.int16).tobytes()
+
+
+def noise(ms: int, amplitude: float = 0.001) -> bytes:
+    rng = np.random.default_rng(0)
+    samples = rng.normal(0, amplitude, SAMPLE_RATE * ms // 1000)
+    return (samples * 32767).astype(np.int16).tobytes()
+
+
+def feed(vad: VoiceActivityDetector, audio: bytes):
+    """Feed audio in 100ms chunks; returns (event, ms into the audio) for every event"""
+    events = []
+    size = SAMPLE_RATE * 2 * CHUNK_MS // 1000
+    for offset in range(0, len(audio), size):
+        event = vad.process(audio[offset:offset + size])
+        if event:
+            events.append((event, (offset + size) * 1000 // (SAMPLE_RATE * 2)))
+    return events
+
+
+def test_silence_is_not_speech():
+    vad = VoiceActivityDetector(silence_ms=800)
+    assert feed(vad, noise(3000)) == []
+    assert not vad.in_speech
+
+
+def test_turn_ends_after_silence():
+    vad = VoiceActivityDetector(silence_ms=800, min_silence_ms=500, max_silence_ms=2000)
+    events = feed(vad, noise(500) + voiced(1500) + noise(2000))
+
+    assert [e for e, _ in events] == [SPEECH_STARTED, END_OF_TURN]
+    speech_at, end_at = events[0][1], events[1][1]
+    assert speech_at <= 700
+    # 500ms lead-in + 1500ms speech + 800ms silence, within one chunk
+    assert 2800 <= end_at <= 2800 + CHUNK_MS
+
+
+def test_short_speech_does_not_end_turn():
+    vad = VoiceActivityDetector(silence_ms=500, min_silence_ms=500)
+    events = feed(vad, noise(300) + voiced(200) + noise(2000))
+    assert END_OF_TURN not in [e for e, _ in events]
+
+
+def test_clicks_do_not_start_speech():
+    vad = VoiceActivityDetector(silence_ms=500, min_silence_ms=500)
+    click = voiced(FRAME_MS)
+    audio = b"".join(noise(300) + click for _ in range(5))
+    assert feed(vad, audio) == []
+
+
+def answer_with_pauses(pause_ms: int) -> bytes:
+    return voiced(600) + noise(pause_ms) + voiced(600) + noise(pause_ms) + voiced(600)
+
+
+def test_threshold_adapts_to_participant_pauses():
+    fast = VoiceActivityDetector(silence_ms=1000, min_silence_ms=500, max_silence_ms=3000)
+    slow = VoiceActivityDetector(silence_ms=1000, min_silence_ms=500, max_silence_ms=3000)
+
+    assert [e for e, _ in feed(fast, noise(300) + answer_with_pauses(300) + noise(3000))] == [SPEECH_STARTED, END_OF_TURN]
+    assert [e for e, _ in feed(slow, noise(300) + answer_with_pauses(900) + noise(3000))] == [SPEECH_STARTED, END_OF_TURN]
+
+    # Twice the typical pause, clamped to [min, max]
+    assert 500 <= fast.silence_ms <= 700
+    assert 1700 <= slow.silence_ms <= 1900
+
+
+def test_start_turn_resets_turn_but_keeps_adaptation():
+    vad = VoiceActivityDetector(silence_ms=1000, min_silence_ms=500, max_silence_ms=3000)
+    feed(vad, answer_with_pauses(900) + noise(3000))
+    adapted = vad.silence_ms
+    assert vad.ended and adapted > 1000
+
+    vad.start_turn()
+    assert not vad.ended and not vad.in_speech
+    assert vad.silence_ms == adapted
+    assert [e for e, _ in feed(vad, voiced(600))] == [SPEECH_STARTED]
+
+
+def test_odd_chunk_sizes_are_reassembled():
+    vad = VoiceActivityDetector(silence_ms=800)
+    audio = noise(300) + voiced(1000) + noise(1500)
+    events = []
+    for offset in range(0, len(audio), 1234):
+        event = vad.process(audio[offset:offset + 1234])
+        if event:
+            events.append(event)
+    assert events == [SPEECH_STARTED, END_OF_TURN]
@@ -0,0 +1,14 @@
+-- =============================================================================
+-- Migration: 007_interview_summary_fields
+-- Description: Adds the structured fields produced by the Summary Agent to
+--              interview_summaries so per-session summaries can be persisted and
+--              reused by the Overview Agent.
+-- =============================================================================
+
+ALTER TABLE interview_summaries
+ADD COLUMN IF NOT EXISTS key_insights      JSONB DEFAULT '[]',
+ADD COLUMN IF NOT EXISTS sentiment         TEXT,
+ADD COLUMN IF NOT EXISTS themes            JSONB DEFAULT '[]',
+ADD COLUMN IF NOT EXISTS notable_quotes    JSONB DEFAULT '[]',
+ADD COLUMN IF NOT EXISTS positive_feedback JSONB DEFAULT '[]',
+ADD COLUMN IF NOT EXISTS negative_feedback JSONB DEFAULT '[]';
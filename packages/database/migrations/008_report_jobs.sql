@@ -0,0 +1,32 @@
+-- =============================================================================
+-- Migration: 008_report_jobs
+-- Description: Lets study_reports rows double as report generation jobs. A job row
+--              is created in 'generating' status, its worker records progress and a
+--              heartbeat on the row, and the result lands in report_data. Aggregate
+--              summary jobs belong to a research question rather than a study.
+-- =============================================================================
+
+ALTER TABLE study_reports
+ALTER COLUMN study_id DROP NOT NULL,
+ADD COLUMN IF NOT EXISTS report_type          TEXT DEFAULT 'overview',
+ADD COLUMN IF NOT EXISTS research_question_id UUID REFERENCES research_questions(id) ON DELETE CASCADE,
+ADD COLUMN IF NOT EXISTS progress             JSONB NOT NULL DEFAULT '{}',
+ADD COLUMN IF NOT EXISTS error                TEXT,
+ADD COLUMN IF NOT EXISTS heartbeat_at         TIMESTAMPTZ;
+
+-- Every job targets a study or a research question
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'study_reports_target_check'
+          AND conrelid = 'study_reports'::regclass
+    ) THEN
+        ALTER TABLE study_reports
+        ADD CONSTRAINT study_reports_target_check
+            CHECK (study_id IS NOT NULL OR research_question_id IS NOT NULL);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_reports_question ON study_reports(research_question_id);
+CREATE INDEX IF NOT EXISTS idx_reports_generating ON study_reports(status) WHERE status = 'generating';
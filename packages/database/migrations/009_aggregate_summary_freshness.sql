@@ -0,0 +1,12 @@
+-- =============================================================================
+-- Migration: 009_aggregate_summary_freshness
+-- Description: Records which sessions an aggregate summary covers so the Aggregate
+--              Summary Agent can tell a fresh summary from a stale one, and keeps
+--              the per-chunk counts so new sessions can be merged in incrementally.
+-- =============================================================================
+
+ALTER TABLE research_question_aggregate_summaries
+ADD COLUMN IF NOT EXISTS session_count             INTEGER,
+ADD COLUMN IF NOT EXISTS last_session_completed_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS session_ids               JSONB DEFAULT '[]',
+ADD COLUMN IF NOT EXISTS chunk_results             JSONB DEFAULT '[]';
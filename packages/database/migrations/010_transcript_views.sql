@@ -0,0 +1,25 @@
+-- =============================================================================
+-- Migration: 010_transcript_views
+-- Description: Server-side joins for the agents' transcript loader. Sessions are
+--              resolved to their study and research question in the database, so
+--              agents select a study's or research question's sessions directly
+--              instead of walking assignments -> sessions with growing IN (...) lists.
+-- =============================================================================
+
+-- Written by the interview agents when a session ends
+ALTER TABLE interview_sessions
+ADD COLUMN IF NOT EXISTS completed_at TIMESTAMPTZ;
+
+-- SESSIONS BY RESEARCH QUESTION
+-- A session belongs to a research question directly (006) or through its assignment
+CREATE OR REPLACE VIEW research_question_sessions AS
+SELECT
+    s.id AS session_id,
+    s.study_id,
+    COALESCE(s.research_question_id, rqa.research_question_id) AS research_question_id,
+    s.status,
+    s.completed_at
+FROM interview_sessions s
+LEFT JOIN research_question_assignments rqa ON rqa.id = s.assignment_id;
+
+CREATE INDEX IF NOT EXISTS idx_sessions_study_status ON interview_sessions(study_id, status);
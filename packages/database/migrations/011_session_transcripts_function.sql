@@ -0,0 +1,53 @@
+-- =============================================================================
+-- Migration: 011_session_transcripts_function
+-- Description: Assembles interview transcripts in the database. Returns one
+--              "Q: ...\nA: ..." transcript per session, turns ordered by turn_index,
+--              with empty and [SKIPPED] answers left out, so the agents receive
+--              ready-to-use text instead of every qa_turns column. Pages are keyed
+--              on session_id (p_after_session_id + p_limit).
+-- =============================================================================
+
+CREATE OR REPLACE FUNCTION session_transcripts(
+    p_study_id              UUID DEFAULT NULL,
+    p_research_question_id  UUID DEFAULT NULL,
+    p_session_id            UUID DEFAULT NULL,
+    p_completed_only        BOOLEAN DEFAULT FALSE,
+    p_completed_since       TIMESTAMPTZ DEFAULT NULL,
+    p_unsummarized_only     BOOLEAN DEFAULT FALSE,
+    p_after_session_id      UUID DEFAULT NULL,
+    p_limit                 INTEGER DEFAULT 200
+)
+RETURNS TABLE (
+    session_id      UUID,
+    completed_at    TIMESTAMPTZ,
+    answered_turns  INTEGER,
+    transcript      TEXT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        rs.session_id,
+        rs.completed_at,
+        COUNT(*)::INTEGER AS answered_turns,
+        string_agg(
+            'Q: ' || t.question_text || E'\nA: ' || t.answer_transcript,
+            E'\n\n' ORDER BY t.turn_index
+        ) AS transcript
+    FROM research_question_sessions rs
+    JOIN qa_turns t ON t.session_id = rs.session_id
+    WHERE (p_study_id IS NULL OR rs.study_id = p_study_id)
+      AND (p_research_question_id IS NULL OR rs.research_question_id = p_research_question_id)
+      AND (p_session_id IS NULL OR rs.session_id = p_session_id)
+      AND (NOT p_completed_only OR rs.status = 'completed')
+      AND (p_completed_since IS NULL OR rs.completed_at >= p_completed_since)
+      AND (NOT p_unsummarized_only OR NOT EXISTS (
+          SELECT 1 FROM interview_summaries su WHERE su.session_id = rs.session_id
+      ))
+      AND (p_after_session_id IS NULL OR rs.session_id > p_after_session_id)
+      AND t.answer_transcript IS NOT NULL
+      AND t.answer_transcript <> ''
+      AND t.answer_transcript <> '[SKIPPED]'
+    GROUP BY rs.session_id, rs.completed_at
+    ORDER BY rs.session_id
+    LIMIT p_limit;
+$$;